@@ -1,7 +1,9 @@
 # app.py
-from flask import Flask, render_template, request, redirect, url_for, flash, Response
-from src.scholar import ScholarScraper
+from flask import Flask, render_template, request, redirect, url_for, flash, Response, jsonify
+from src.metrics import METRICS, METRICS_ENDPOINT
 from data_handler import DataHandler
+from contextlib import nullcontext
+import threading
 import time
 import json
 
@@ -10,14 +12,13 @@ app.secret_key = 'your_secure_secret_key'
 data_handler = DataHandler()
 progress = 0
 processed_papers = []
+search_index = None  # opened on the first search
+# Scrape jobs share the progress globals, METRICS and the profiler, so they run one at a time
+job_lock = threading.Lock()
 
 @app.route('/', methods=['GET', 'POST'])
 def index():
     if request.method == 'POST':
-        global progress, processed_papers
-        progress = 0
-        processed_papers = []
-        
         query = request.form['query']
         num_pages = request.form['num_pages']
         
@@ -31,12 +32,25 @@ def index():
             flash("Please enter a valid number for pages.", "error")
             return redirect(url_for('index'))
         
-        # Start scraping process
-        scraper = ScholarScraper(query=query, num_pages=num_pages)
-        results = scraper.scrape(callback=update_progress)
+        # Start scraping process (imported here so worker boot stays light)
+        from src.scholar import ScholarScraper
+        from src.profiling import PROFILING, profiled
+        with job_lock:
+            global progress, processed_papers
+            progress = 0
+            processed_papers = []
+            # The report and /metrics cover this job only
+            METRICS.reset()
+            # With "app" set under "profiling" in config.json, every job writes its own profile
+            with profiled() if PROFILING.get('app', False) else nullcontext():
+                scraper = ScholarScraper(query=query, num_pages=num_pages)
+                results = scraper.scrape(callback=update_progress)
 
-        # Save results and calculate statistics
-        data_handler.save_to_excel(results, "scholar_results.xlsx")
+                # Save results and calculate statistics
+                with METRICS.timer('excel_export'):
+                    data_handler.save_to_excel(results, "scholar_results.xlsx")
+            get_search_index().store.add_dataframe(results)
+            METRICS.write_report()
         # Process the statistics
         stats_text = data_handler.calculate_statistics(results)
         
@@ -132,6 +146,40 @@ def progress_stream():
         
     return Response(generate(), mimetype='text/event-stream')
 
+def get_search_index():
+    global search_index
+    if search_index is None:
+        from src.search import SearchIndex
+        search_index = SearchIndex()
+    return search_index
+
+@app.route('/search')
+def search():
+    """BM25 search over every stored scrape: /search?q=...&limit=20&offset=0&source=...&year_from=...&year_to=..."""
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': "Missing query parameter 'q'."}), 400
+    limit = min(request.args.get('limit', 20, type=int), 100)
+    offset = request.args.get('offset', 0, type=int)
+    start = time.perf_counter()
+    results = get_search_index().search(
+        query, limit=limit, offset=offset,
+        source=request.args.get('source') or None,
+        year_from=request.args.get('year_from', type=int),
+        year_to=request.args.get('year_to', type=int)
+    )
+    return jsonify({
+        'query': query,
+        'results': results,
+        'took_ms': round((time.perf_counter() - start) * 1000, 2),
+    })
+
+if METRICS_ENDPOINT:
+    @app.route('/metrics')
+    def metrics():
+        """Expose run timers and counters for Prometheus scraping."""
+        return Response(METRICS.to_prometheus(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/download')
 def download_results():
     try:
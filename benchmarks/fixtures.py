@@ -0,0 +1,252 @@
+# fixtures.py
+"""
+Replay corpus for the offline benchmarks.
+
+Responses are stored as plain files under `<root>/<host>/<path>`, with the
+query string folded into a short hash, so a corpus recorded from live sites
+(`record`) and the deterministic synthetic one (`build_corpus`) share one layout.
+"""
+import hashlib
+import json
+import os
+import random
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+BENCH_QUERY = "adversarial multi-agent reinforcement learning"
+SCHOLAR_PAGES = 5
+
+RELEVANT_SENTENCE = ("We study adversarial attacks on multi-agent reinforcement learning "
+                     "and propose a robust defense for cooperative MARL agents.")
+FILLER_SENTENCES = [
+    "We present a new method for large-scale image classification.",
+    "Our approach improves sample efficiency on standard benchmarks.",
+    "Experiments show consistent gains over strong baselines.",
+    "We analyse the convergence of stochastic optimisation under mild assumptions.",
+    "The proposed architecture reduces memory usage during training.",
+    "We release code and data to support reproducibility.",
+]
+
+# Publisher hosts linked from Scholar hits, with the page shape each scraper expects
+PUBLISHERS = {
+    'arxiv.org': ('/abs/2101.{n:05d}', '<blockquote class="abstract">Abstract: {abstract}</blockquote>'),
+    'ieeexplore.ieee.org': ('/document/{n}', '<meta property="og:description" content="{abstract}">'),
+    'link.springer.com': ('/article/10.1007/s{n}', '<div id="Abs1-content"><p>{abstract}</p></div>'),
+    'proceedings.mlr.press': ('/v139/paper{n}.html', '<div class="abstract">{abstract}</div>'),
+    'proceedings.neurips.cc': ('/paper/2020/hash/{n}-Abstract.html', '<div class="abstract"><p>{abstract}</p></div>'),
+    'www.mdpi.com': ('/2076-3417/{n}', '<div class="art-abstract"><p>{abstract}</p></div>'),
+    'dl.acm.org': ('/doi/10.1145/{n}', '<div class="abstractSection"><p>{abstract}</p></div>'),
+    'ojs.aaai.org': ('/index.php/AAAI/article/view/{n}',
+                     '<article class="obj_article_details"><section class="item abstract">'
+                     '<h2 class="label">Abstract</h2>{abstract}</section></article>'),
+    'jair.org': ('/index.php/jair/article/view/{n}', '<div class="article-abstract">{abstract}</div>'),
+    'jmlr.org': ('/papers/v22/{n}.html', '<div class="abstract">{abstract}</div>'),
+    'ijcai.org': ('/proceedings/2021/{n}', '<div class="abstract">{abstract}</div>'),
+    'www.researchgate.net': ('/publication/{n}', '<p>{abstract}</p>'),
+}
+
+def fixture_path(root, url):
+    """Map a URL to the file holding its recorded response."""
+    parts = urlsplit(url)
+    path = parts.path or '/'
+    if path.endswith('/'):
+        path += 'index.html'
+    if parts.query:
+        query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+        path += '@' + hashlib.sha1(query.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(root, parts.netloc.lower(), path.lstrip('/'))
+
+def write_fixture(root, url, body):
+    path = fixture_path(root, url)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(body if isinstance(body, bytes) else body.encode('utf-8'))
+
+def record(root, urls, **kwargs):
+    """Save live responses for `urls` into the corpus layout."""
+    import requests
+    for url in urls:
+        response = requests.get(url, timeout=30, **kwargs)
+        if response.status_code == 200:
+            write_fixture(root, url, response.content)
+
+##### Synthetic corpus
+def make_abstract(rng, relevant):
+    sentences = rng.sample(FILLER_SENTENCES, 3)
+    if relevant:
+        sentences.insert(rng.randrange(len(sentences) + 1), RELEVANT_SENTENCE)
+    return ' '.join(sentences)
+
+# PMLR bibliographies keep their LaTeX: the first paper of every volume has a
+# protected title and an abstract with math, font commands, escapes and an accent.
+# (bib text, the text clean_latex should make of it)
+LATEX_ABSTRACT = (r"We bound the regret by $O(\sqrt{n})$ with a \textit{Hoeffding} inequality on the entries "
+                  r"$a_{ij}$ of the payoff matrix, for 95\% of the {N}ash equilibria found by Schr\"{o}dinger's method.",
+                  r"We bound the regret by $O(\sqrt{n})$ with a Hoeffding inequality on the entries "
+                  r"$a_{ij}$ of the payoff matrix, for 95% of the Nash equilibria found by Schrodinger's method.")
+
+def html_page(title, body, head=''):
+    return f'<html><head><title>{title}</title>{head}</head><body><h1>{title}</h1>{body}</body></html>'
+
+def minimal_pdf(lines):
+    """A single-page PDF with one text line per entry, readable by PyPDF2."""
+    def escape(text):
+        return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+    text = ' '.join(f"({escape(line)}) '" for line in lines)
+    stream = f"BT /F1 9 Tf 40 760 Td 11 TL {text} ET".encode('latin-1', 'replace')
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        b"/Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return pdf
+
+def wrap(text, width=90):
+    lines, line = [], ''
+    for word in text.split():
+        if len(line) + len(word) + 1 > width:
+            lines.append(line)
+            line = word
+        else:
+            line = f"{line} {word}".strip()
+    return lines + [line] if line else lines
+
+def build_scholar(root, rng, papers):
+    from src.utils import detect_source
+    hosts = list(PUBLISHERS)
+    n = 0
+    for page in range(SCHOLAR_PAGES):
+        hits = []
+        for _ in range(10):
+            n += 1
+            host = hosts[n % len(hosts)]
+            path, template = PUBLISHERS[host]
+            link = f"https://{host}{path.format(n=1000 + n)}"
+            relevant = rng.random() < 0.3
+            title = f"Scholar paper {n} on {'adversarial MARL' if relevant else 'learning systems'}"
+            abstract = make_abstract(rng, relevant)
+            write_fixture(root, link, html_page(title, template.format(abstract=abstract)))
+            hits.append(f'<div class="gs_ri"><h3 class="gs_rt"><a href="{link}">{title}</a></h3>'
+                        f'<div class="gs_a">A Author, B Author - {detect_source(link)}, {2018 + n % 7}</div></div>')
+            papers.append({'Title': title, 'URL': link, 'Abstract': abstract, 'Source': detect_source(link), 'Year': 2018 + n % 7})
+        url = "https://scholar.google.com/scholar?" + urlencode({'q': BENCH_QUERY, 'start': page * 10, 'hl': 'en'})
+        write_fixture(root, url, html_page('Google Scholar', ''.join(hits)))
+
+def build_venues(root, rng, papers_per_year, years):
+    from src.venues import VENUES
+    from src.venues_scrapers import ICLRScraper
+    from src.openreview import OpenReviewClient
+
+    openreview = OpenReviewClient()
+
+    for year in years:
+        # AAMAS: contents table linking to PDFs
+        rows = []
+        for i in range(papers_per_year):
+            relevant = rng.random() < 0.3
+            title = f"AAMAS {year} paper {i}"
+            pdf_url = f"https://www.ifaamas.org/Proceedings/aamas{year}/pdfs/p{i}.pdf"
+            lines = [title, 'Anonymous Authors', 'ABSTRACT'] + wrap(make_abstract(rng, relevant)) + ['KEYWORDS', 'agents', '1 INTRODUCTION']
+            write_fixture(root, pdf_url, minimal_pdf(lines))
+            rows.append(f'<tr><td><a href="../pdfs/p{i}.pdf">{title}</a></td></tr>')
+        index_url = VENUES['AAMAS']['proceedings_url_template'].format(year=year)
+        write_fixture(root, index_url, html_page(f'AAMAS {year}', '<table>' + ''.join(rows) + '</table>'))
+
+        # IJCAI: paper wrappers with a Details link per paper
+        wrappers = []
+        for i in range(papers_per_year):
+            title = f"IJCAI {year} paper {i}"
+            detail_url = f"https://www.ijcai.org/proceedings/{year}/{i}"
+            abstract = make_abstract(rng, rng.random() < 0.3)
+            head = f'<meta name="citation_title" content="{title}">'
+            write_fixture(root, detail_url, html_page(title, f'<div class="col-md-12">{abstract}</div>', head))
+            wrappers.append(f'<div class="paper_wrapper"><div class="details"><a href="/proceedings/{year}/{i}">Details</a></div></div>')
+        index_url = VENUES['IJCAI']['proceedings_url_template'].format(year=year)
+        write_fixture(root, index_url, html_page(f'IJCAI {year}', ''.join(wrappers)))
+
+        # PMLR venues: volume index, volume bibliography and one abs page per paper
+        for venue in ('AISTATS', 'ICML'):
+            volume = VENUES[venue]['year_mapping'][str(year)]
+            papers = []
+            entries = []
+            for i in range(papers_per_year):
+                title = bib_title = f"{venue} {year} paper {i}"
+                abs_url = f"https://proceedings.mlr.press/v{volume}/paper{i}.html"
+                abstract = bib_abstract = make_abstract(rng, rng.random() < 0.3)
+                if i == 0:
+                    bib_title = f"{{{venue}}} {year} paper {i}"
+                    bib_abstract = f"{LATEX_ABSTRACT[0]} {abstract}"
+                    abstract = f"{LATEX_ABSTRACT[1]} {abstract}"
+                body = (f'<div id="abstract">{abstract}</div>'
+                        f'<div id="info">Proceedings of {venue}, PMLR {volume}, {year}.</div>')
+                write_fixture(root, abs_url, html_page(title, body))
+                papers.append(f'<div class="paper"><p class="title">{title}</p>'
+                              f'<p class="links"><a href="/v{volume}/paper{i}.html">abs</a></p></div>')
+                entries.append(f"@InProceedings{{pmlr-v{volume}-paper{i},\n  title = \t {{{bib_title}}},\n  year = \t {{{year}}},\n"
+                               f"  url = \t {{{abs_url}}},\n  abstract = \t {{{bib_abstract}}}\n}}\n")
+            index_url = VENUES[venue]['proceedings_url_template'].format(volume=volume)
+            write_fixture(root, index_url, html_page(f'PMLR {volume}', ''.join(papers)))
+            write_fixture(root, VENUES[venue]['bibliography_url_template'].format(volume=volume), '\n'.join(entries))
+
+        # ICLR: DBLP search API listing, OpenReview notes API in bulk, and one OpenReview page per paper
+        index_url = VENUES['ICLR']['proceedings_url_template'].format(year=year)
+        write_fixture(root, index_url, '{}')
+        hits = []
+        notes = []
+        for i in range(papers_per_year):
+            title = f"ICLR {year} paper {i}"
+            forum_url = f"https://openreview.net/forum?id=iclr{year}p{i}"
+            abstract = make_abstract(rng, rng.random() < 0.3)
+            head = f'<meta name="citation_abstract" content="{abstract}">'
+            write_fixture(root, forum_url, html_page(title, '', head))
+            hits.append({'info': {'title': title, 'ee': forum_url, 'year': str(year)}})
+            content = {'title': title, 'abstract': abstract, 'venue': f"ICLR {year} poster"}
+            if year >= openreview.v2_from_year:
+                content = {field: {'value': value} for field, value in content.items()}
+            notes.append({'id': f"iclr{year}p{i}", 'forum': f"iclr{year}p{i}", 'content': content})
+        write_fixture(root, openreview.notes_url(year), json.dumps({'notes': notes, 'count': len(notes)}))
+        scraper = ICLRScraper('ICLR', VENUES['ICLR'])
+        api_url = (f"{scraper.base_api_url}?q={scraper.construct_search_query(year)}"
+                   f"&h={scraper.batch_size}&f=0&format=json")
+        listing = {'result': {'hits': {'@total': str(len(hits)), 'hit': hits}}}
+        write_fixture(root, api_url, json.dumps(listing))
+
+def fingerprint(papers_per_year=20, seed=0):
+    """What a synthetic corpus was built from: this builder's source, the settings and the crawled years."""
+    from src.venues_scrapers import START_YEAR, END_YEAR
+    with open(os.path.realpath(__file__), 'rb') as f:
+        builder = hashlib.sha1(f.read()).hexdigest()
+    return {'builder': builder, 'papers_per_year': papers_per_year, 'seed': seed, 'years': [START_YEAR, END_YEAR]}
+
+def is_current(root, papers_per_year=20, seed=0):
+    """Whether `root` holds a synthetic corpus built by this builder with these settings."""
+    try:
+        with open(os.path.join(root, 'fingerprint.json')) as f:
+            return json.load(f) == fingerprint(papers_per_year, seed)
+    except (OSError, ValueError):
+        return False
+
+def build_corpus(root, papers_per_year=20, seed=0):
+    """Write the synthetic corpus under `root` and return the Scholar papers as records."""
+    from src.venues_scrapers import START_YEAR, END_YEAR
+    rng = random.Random(seed)
+    papers = []
+    build_scholar(root, rng, papers)
+    build_venues(root, rng, papers_per_year, range(START_YEAR, END_YEAR + 1))
+    with open(os.path.join(root, 'papers.json'), 'w') as f:
+        json.dump(papers, f)
+    # Written last, so an interrupted build is not taken for a complete one
+    with open(os.path.join(root, 'fingerprint.json'), 'w') as f:
+        json.dump(fingerprint(papers_per_year, seed), f)
+    return papers
@@ -0,0 +1,200 @@
+# micro.py
+"""
+Micro-benchmarks for the per-paper CPU hot paths.
+
+Times cold import of the package surface, keyword matching, title cleaning, year and source detection, every
+publisher's abstract parser on saved HTML, PDF abstract extraction on saved
+PDFs, and `DataHandler.calculate_statistics` on synthetic frames.
+
+Usage (from the repository root):
+    python -m benchmarks.micro
+    python -m benchmarks.micro --compare benchmarks/results/micro-<old>.json
+"""
+import argparse
+import datetime as dt
+import glob
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import timeit
+
+from .replay import REPO_ROOT, git_revision
+
+def bench(name, func, repeat=5):
+    """Time `func` with enough loops per run to smooth out timer resolution."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    times = [total / number for total in timer.repeat(repeat=repeat, number=number)]
+    result = {
+        'name': name,
+        'loops': number,
+        'min': min(times),
+        'median': statistics.median(times),
+        'stdev': statistics.stdev(times) if len(times) > 1 else 0.0,
+    }
+    print(f"{name:<50} {result['median'] * 1e6:14.2f} us/op  (min {result['min'] * 1e6:.2f}, {number} loops)")
+    return result
+
+def synthetic_frame(rows, seed=0):
+    import numpy as np
+    import pandas as pd
+    rng = np.random.default_rng(seed)
+    sources = np.array(['arXiv', 'IEEE', 'Springer', 'ACM', 'MLR', 'NeurIPS', 'Other: a.org', 'Other: b.com'])
+    abstracts = np.where(rng.random(rows) < 0.7, 'An abstract.', None)
+    return pd.DataFrame({
+        'title': [f'Paper {i}' for i in range(rows)],
+        'abstract': abstracts,
+        'source': sources[rng.integers(0, len(sources), rows)],
+    })
+
+def string_benchmarks(repeat):
+    from src.venues_scrapers import BaseScraper
+    from src.venues import VENUES
+    from src.utils import extract_year, detect_source
+    from .fixtures import RELEVANT_SENTENCE, FILLER_SENTENCES, PUBLISHERS
+
+    scraper = BaseScraper('IJCAI', VENUES['IJCAI'])
+    relevant_title = 'Robust Cooperative Multi-Agent Reinforcement Learning under Attack'
+    other_title = 'Efficient Transformers for Long Documents'
+    relevant_abstract = ' '.join(FILLER_SENTENCES[:3] + [RELEVANT_SENTENCE])
+    other_abstract = ' '.join(FILLER_SENTENCES * 2)
+    messy_title = '  Robust _x000D_\n  Multi-Agent\t\tLearning  _x000D_ '
+    citation = 'A Author, B Author - Advances in Neural Information Processing Systems, 2021 - proceedings.neurips.cc'
+    urls = [f"https://{host}{path.format(n=1234)}" for host, (path, _) in PUBLISHERS.items()]
+
+    return [
+        bench('paper_contains_keywords[relevant]', lambda: scraper.paper_contains_keywords(relevant_title, relevant_abstract), repeat),
+        bench('paper_contains_keywords[non-relevant]', lambda: scraper.paper_contains_keywords(other_title, other_abstract), repeat),
+        bench('clean_title', lambda: scraper.clean_title(messy_title), repeat),
+        bench('extract_year', lambda: extract_year(citation), repeat),
+        bench(f'detect_source[x{len(urls)}]', lambda: [detect_source(url) for url in urls], repeat),
+    ]
+
+def parser_benchmarks(corpus, repeat):
+    from bs4 import BeautifulSoup
+    from src.scholar import ScholarScraper
+    from src.venues_scrapers import AAMASScraper
+    from src.venues import VENUES
+    from src.utils import detect_source
+    from .fixtures import PUBLISHERS
+
+    results = []
+    scrapers = ScholarScraper().scrapers
+    for host, (path, _) in PUBLISHERS.items():
+        source = detect_source(f"https://{host}/")
+        # Only the paper pages linked from Scholar, not proceedings indexes on the same host
+        prefix = path.split('{')[0].lstrip('/')
+        pages = sorted(glob.glob(os.path.join(corpus, host, prefix + '*')))
+        if source not in scrapers or not pages:
+            continue
+        with open(pages[0], 'rb') as f:
+            html = f.read().decode('utf-8', 'replace')
+        scraper = scrapers[source]
+        results.append(bench(f'parse_abstract[{source}]',
+                             lambda: scraper.parse_abstract(BeautifulSoup(html, 'html.parser')), repeat))
+
+    pdfs = sorted(glob.glob(os.path.join(corpus, 'www.ifaamas.org', '**', '*.pdf'), recursive=True))
+    if pdfs:
+        with open(pdfs[0], 'rb') as f:
+            pdf_content = f.read()
+        scraper = AAMASScraper('AAMAS', VENUES['AAMAS'])
+        results.append(bench('parse_abstract_from_pdf[AAMAS]', lambda: scraper.parse_abstract_from_pdf(pdf_content), repeat))
+    return results
+
+def statistics_benchmarks(sizes, repeat):
+    sys.path.insert(0, REPO_ROOT)
+    from data_handler import DataHandler
+
+    handler = DataHandler()
+    results = []
+    for rows in sizes:
+        frame = synthetic_frame(rows)
+        results.append(bench(f'calculate_statistics[{rows} rows]', lambda: handler.calculate_statistics(frame), repeat))
+    return results
+
+def import_benchmarks(repeat):
+    """Cold import time of the package surface, each sample in a fresh interpreter."""
+    results = []
+    for module in ('src', 'src.config', 'src.main', 'src.scholar', 'src.venues', 'src.llm_agent', 'app'):
+        code = f"import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+        times = []
+        for _ in range(repeat):
+            completed = subprocess.run([sys.executable, '-c', code], cwd=REPO_ROOT, capture_output=True, text=True)
+            if completed.returncode != 0:
+                break
+            times.append(float(completed.stdout.strip()))
+        if not times:
+            print(f"{'import[' + module + ']':<50} {'failed':>14}")
+            continue
+        result = {
+            'name': f'import[{module}]',
+            'loops': 1,
+            'min': min(times),
+            'median': statistics.median(times),
+            'stdev': statistics.stdev(times) if len(times) > 1 else 0.0,
+        }
+        print(f"{result['name']:<50} {result['median'] * 1e6:14.2f} us/op  (min {result['min'] * 1e6:.2f}, cold)")
+        results.append(result)
+    return results
+
+def compare(results, previous_file, threshold):
+    """Print the change against an earlier report; return the names that regressed."""
+    with open(previous_file) as f:
+        previous = {entry['name']: entry for entry in json.load(f)['results']}
+    regressions = []
+    print(f"\nCompared with {previous_file}:")
+    for entry in results:
+        before = previous.get(entry['name'])
+        if not before:
+            continue
+        ratio = entry['median'] / before['median']
+        flag = ''
+        if ratio > 1 + threshold:
+            flag = '  REGRESSION'
+            regressions.append(entry['name'])
+        print(f"{entry['name']:<50} {ratio:6.2f}x{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Micro-benchmarks for per-paper CPU hot paths')
+    parser.add_argument('--corpus', default=os.path.join(REPO_ROOT, 'benchmarks', 'corpus'),
+                        help='Fixture corpus with saved HTML/PDF (built if missing)')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000],
+                        help='Row counts for the calculate_statistics frames')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', default=os.path.join(REPO_ROOT, 'benchmarks', 'results'))
+    parser.add_argument('--compare', help='Earlier micro-benchmark report to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10, help='Slowdown ratio reported as a regression')
+    args = parser.parse_args()
+
+    sys.path.insert(0, REPO_ROOT)
+    if not os.path.exists(os.path.join(args.corpus, 'papers.json')):
+        from .fixtures import build_corpus
+        print(f"Building synthetic corpus in {args.corpus} ...")
+        build_corpus(args.corpus)
+
+    results = import_benchmarks(args.repeat)
+    results += string_benchmarks(args.repeat)
+    results += parser_benchmarks(args.corpus, args.repeat)
+    results += statistics_benchmarks(args.sizes, args.repeat)
+
+    report = {
+        'revision': git_revision(),
+        'timestamp': dt.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'results': results,
+    }
+    os.makedirs(args.output, exist_ok=True)
+    output_file = os.path.join(args.output, f"micro-{report['revision']}.json")
+    with open(output_file, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Report saved to {output_file}")
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        raise SystemExit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,214 @@
+# replay.py
+"""
+Offline end-to-end benchmark.
+
+Replays the fixture corpus through a local HTTP stand-in and drives
+`ScholarScraper.scrape`, `VenueScraper.scrape_venues` and
+`AgentLLM.filter_papers` (against a stub model). Each scenario runs in a fresh
+interpreter so peak memory and the limiter/breaker state are per scenario.
+
+Usage (from the repository root):
+    python -m benchmarks.replay --latency 0.05 --error-rate 0.02
+
+`python benchmarks/replay.py` works as well.
+"""
+import argparse
+import datetime as dt
+import json
+import multiprocessing
+import os
+import platform
+import re
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import nullcontext
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+if not __package__:
+    # Run as a script: resolve the relative imports against the benchmarks package
+    sys.path.insert(0, REPO_ROOT)
+    __package__ = 'benchmarks'
+SCENARIOS = ['scholar', 'venues', 'llm']
+
+class StubInferenceClient:
+    """Stands in for `InferenceClient`: answers in the expected format after a fixed delay."""
+    PACKED_PAPER = re.compile(r'^Paper (\d+)\nTitle: (.*)\nAbstract: (.*)$', re.MULTILINE)
+
+    def __init__(self, latency=0.05):
+        self.latency = latency
+
+    def text_generation(self, prompt, return_full_text=False, **kwargs):
+        time.sleep(self.latency)
+        papers = self.PACKED_PAPER.findall(prompt)
+        if papers:
+            return '\n'.join(
+                json.dumps({'id': int(n), 'relevant': 'yes' if self.relevant(title + abstract) else 'no', 'why': 'stub verdict'})
+                for n, title, abstract in papers
+            )
+        return f"is_relevant: {'YES' if self.relevant(prompt) else 'NO'}\nexplanation: stub verdict"
+
+    @staticmethod
+    def relevant(text):
+        return 'multi-agent reinforcement learning' in text.lower()
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def run_scenario(name, args):
+    """Run one scenario in this process and return its measurements."""
+    sys.path.insert(0, REPO_ROOT)
+    from src.concurrency import SESSION
+    from src.metrics import METRICS
+    from src.profiling import profiled
+    from .replay_server import ReplayAdapter
+
+    adapter = ReplayAdapter(f"127.0.0.1:{args.port}", pool_connections=64, pool_maxsize=64)
+    SESSION.mount('http://', adapter)
+    SESSION.mount('https://', adapter)
+    if not args.real_sleeps:
+        # Fixed pacing and backoff sleeps are still accounted for, just not slept
+        METRICS.sleep = lambda seconds, source=None: METRICS.observe('sleep', seconds, source)
+
+    # Scrapers write their spreadsheets to ./results
+    workdir = tempfile.mkdtemp(prefix=f'bench-{name}-')
+    os.makedirs(os.path.join(workdir, 'results'))
+    os.chdir(workdir)
+
+    METRICS.reset()
+    # The work directory is removed afterwards, so profiles go next to the report
+    profile = profiled(os.path.join(args.output, 'profile', name)) if args.profile else nullcontext()
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    with profile:
+        if name == 'scholar':
+            from src.scholar import ScholarScraper
+            from .fixtures import BENCH_QUERY, SCHOLAR_PAGES
+            df = ScholarScraper(query=BENCH_QUERY, num_pages=SCHOLAR_PAGES).scrape()
+        elif name == 'venues':
+            from src.venues import VenueScraper
+            df = VenueScraper().scrape_venues()
+        elif name == 'llm':
+            import pandas as pd
+            from src.llm_agent import AgentLLM
+            with open(os.path.join(args.corpus, 'papers.json')) as f:
+                papers = json.load(f)
+            df = pd.DataFrame(papers * args.llm_repeat)
+            df = AgentLLM(model_url='stub', client=StubInferenceClient(args.llm_latency)).filter_papers(df)
+        else:
+            raise ValueError(f"Unknown scenario: {name}")
+    wall_time = time.perf_counter() - wall_start
+    cpu_time = time.process_time() - cpu_start
+
+    report = METRICS.summary()
+    counters = {}
+    for counter in report['counters']:
+        counters[counter['name']] = counters.get(counter['name'], 0) + counter['value']
+    sleep_time = sum(stage['total'] for stage in report['stages'] if stage['stage'] == 'sleep')
+    os.chdir(REPO_ROOT)
+    shutil.rmtree(workdir, ignore_errors=True)
+    return {
+        'scenario': name,
+        'papers': len(df),
+        'wall_time': wall_time,
+        'cpu_time': cpu_time,
+        'throughput': len(df) / wall_time if wall_time else None,
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'requests': counters.get('requests', 0),
+        'bytes': counters.get('bytes', 0),
+        'retries': counters.get('retries', 0),
+        'throttled': counters.get('throttled', 0),
+        'sleep_time': sleep_time,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline replay benchmark for the scraping pipeline')
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument('--corpus', default=os.path.join(REPO_ROOT, 'benchmarks', 'corpus'),
+                        help='Fixture corpus directory (built if missing)')
+    parser.add_argument('--papers-per-year', type=int, default=20, help='Papers per venue-year in the synthetic corpus')
+    parser.add_argument('--latency', type=float, default=0.05, help='Mean response latency of the stand-in (seconds)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 429')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After sent with injected 429s')
+    parser.add_argument('--llm-latency', type=float, default=0.05, help='Latency of the stub model per prompt')
+    parser.add_argument('--llm-repeat', type=int, default=4, help='Times the Scholar papers are repeated as LLM input')
+    parser.add_argument('--real-sleeps', action='store_true', help='Actually sleep fixed delays instead of only recording them')
+    parser.add_argument('--profile', action='store_true',
+                        help='Write per-stage profiles of each scenario to <output>/profile/<scenario> (slows the run down)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=os.path.join(REPO_ROOT, 'benchmarks', 'results'))
+    parser.add_argument('--child', choices=SCENARIOS, help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    args.output = os.path.abspath(args.output)
+
+    if args.child:
+        print(json.dumps(run_scenario(args.child, args)))
+        return
+
+    sys.path.insert(0, REPO_ROOT)
+    from .fixtures import build_corpus, is_current
+    from .replay_server import serve
+
+    if not is_current(args.corpus, args.papers_per_year, args.seed):
+        if os.path.exists(os.path.join(args.corpus, 'papers.json')):
+            # A synthetic corpus from another builder version or other settings
+            print(f"Corpus in {args.corpus} is out of date, rebuilding ...")
+            shutil.rmtree(args.corpus)
+        else:
+            print(f"Building synthetic corpus in {args.corpus} ...")
+        build_corpus(args.corpus, args.papers_per_year, args.seed)
+
+    ready = multiprocessing.Queue()
+    server = multiprocessing.Process(
+        target=serve,
+        args=(args.corpus, 0, args.latency, args.error_rate, args.retry_after, args.seed, ready),
+        daemon=True
+    )
+    server.start()
+    port = ready.get(timeout=30)
+
+    results = []
+    try:
+        for name in args.scenarios:
+            command = [sys.executable, '-m', 'benchmarks.replay', '--child', name, '--port', str(port),
+                       '--corpus', args.corpus, '--llm-latency', str(args.llm_latency),
+                       '--llm-repeat', str(args.llm_repeat)]
+            if args.real_sleeps:
+                command.append('--real-sleeps')
+            if args.profile:
+                command += ['--profile', '--output', args.output]
+            completed = subprocess.run(command, cwd=REPO_ROOT, capture_output=True, text=True)
+            if completed.returncode != 0:
+                print(completed.stderr, file=sys.stderr)
+                raise SystemExit(f"Scenario {name} failed")
+            result = json.loads(completed.stdout.strip().splitlines()[-1])
+            results.append(result)
+            print(f"{name:>8}: {result['papers']:6d} papers  {result['wall_time']:8.2f}s wall  "
+                  f"{result['cpu_time']:8.2f}s cpu  {result['throughput']:8.1f} papers/s  "
+                  f"{result['peak_rss_mb']:7.1f} MB peak  {int(result['requests'])} requests")
+    finally:
+        server.terminate()
+
+    report = {
+        'revision': git_revision(),
+        'timestamp': dt.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'settings': {key: getattr(args, key) for key in
+                     ('latency', 'error_rate', 'retry_after', 'llm_latency', 'llm_repeat', 'real_sleeps', 'seed', 'papers_per_year')},
+        'results': results,
+    }
+    os.makedirs(args.output, exist_ok=True)
+    output_file = os.path.join(args.output, f"replay-{report['revision']}.json")
+    with open(output_file, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Report saved to {output_file}")
+
+if __name__ == '__main__':
+    main()
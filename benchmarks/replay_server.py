@@ -0,0 +1,92 @@
+# replay_server.py
+"""
+Local HTTP stand-in that replays a fixture corpus.
+
+Every outgoing request of the scrapers is rewritten by `ReplayAdapter` to
+`http://<server>/<original host>/<original path>?<query>`, so the scrapers,
+limiters and circuit breakers all still see the real publisher hosts.
+"""
+import http.server
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+from requests.adapters import HTTPAdapter
+
+from .fixtures import fixture_path
+
+class ReplayHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        if server.latency:
+            time.sleep(server.latency * server.rng.uniform(0.5, 1.5))
+
+        with server.lock:
+            server.requests += 1
+            throttle = server.rng.random() < server.error_rate
+        if throttle:
+            self.respond(429, b'Too Many Requests', 'text/plain', {'Retry-After': str(server.retry_after)})
+            return
+
+        host, _, path = self.path.lstrip('/').partition('/')
+        path = fixture_path(server.root, f"http://{host}/{path}")
+        try:
+            with open(path, 'rb') as f:
+                body = f.read()
+        except OSError:
+            self.respond(404, b'Not Found', 'text/plain')
+            return
+
+        if body.startswith(b'%PDF'):
+            content_type = 'application/pdf'
+        elif body.lstrip().startswith(b'{'):
+            content_type = 'application/json'
+        else:
+            content_type = 'text/html; charset=utf-8'
+        self.respond(200, body, content_type)
+
+    def respond(self, status, body, content_type, headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def make_server(root, port=0, latency=0.0, error_rate=0.0, retry_after=1, seed=0):
+    """Create (but do not start) a threaded replay server for the corpus at `root`."""
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', port), ReplayHandler)
+    server.daemon_threads = True
+    server.root = root
+    server.latency = latency
+    server.error_rate = error_rate
+    server.retry_after = retry_after
+    server.rng = random.Random(seed)
+    server.lock = threading.Lock()
+    server.requests = 0
+    return server
+
+def serve(root, port, latency, error_rate, retry_after, seed, ready=None):
+    """Run a replay server until the process is terminated (multiprocessing target)."""
+    server = make_server(root, port, latency, error_rate, retry_after, seed)
+    if ready is not None:
+        ready.put(server.server_address[1])
+    server.serve_forever()
+
+class ReplayAdapter(HTTPAdapter):
+    """Transport adapter sending every request to the replay server instead of the live host."""
+    def __init__(self, address, **kwargs):
+        super().__init__(**kwargs)
+        self.address = address
+
+    def send(self, request, **kwargs):
+        parts = urlsplit(request.url)
+        request.url = f"http://{self.address}/{parts.netloc}{parts.path}" + (f"?{parts.query}" if parts.query else '')
+        return super().send(request, **kwargs)
@@ -1,11 +1,12 @@
 # data_handler.py
-import pandas as pd
+# pandas is imported inside the methods so the web app boots without it
 import json
 import os
 
 class DataHandler:
     def save_to_excel(self, data, filename):
         """Save results to an Excel file with specified filename."""
+        import pandas as pd
         df = pd.DataFrame(data)
         # check if results folder exists
         if not os.path.exists('results'):
@@ -14,6 +15,7 @@ class DataHandler:
     
     def load_from_excel(self, filename):
         """Load data from an Excel file into a DataFrame."""
+        import pandas as pd
         # check if results folder exists
         if not os.path.exists('results'):
             os.makedirs('results')
@@ -38,6 +40,7 @@ class DataHandler:
     # data_handler.py
     def calculate_statistics(self, data):
         """Calculate and return summary statistics as a string for display."""
+        import pandas as pd
         df = pd.DataFrame(data)
         output = []
         
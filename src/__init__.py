@@ -1,15 +1,36 @@
 # __init__.py
-from .scholar import ScholarScraper
-from .venues import VenueScraper
-from .llm_agent import AgentLLM
+# Names are resolved on first access, so importing the package (or one light
+# module such as `src.config`) does not pull in bs4, pandas, PyPDF2 or the HF client.
+import importlib
 
-from .scholar_scrapers import (
-    AbstractScraper, ArxivScraper, IeeeScraper, SpringerScraper,
-    MlrScraper, ACMScraper, NeuripsScraper, MdpiScraper, ScienceDirectScraper
-)
+_EXPORTS = {
+    'ScholarScraper': 'scholar',
+    'VenueScraper': 'venues',
+    'AgentLLM': 'llm_agent',
 
-from .venues_scrapers import (
-    AAMASScraper, AISTATSScraper, ICMLScraper, IJCAIScraper, ICLRScraper
-)
+    'AbstractScraper': 'scholar_scrapers', 'ArxivScraper': 'scholar_scrapers',
+    'IeeeScraper': 'scholar_scrapers', 'SpringerScraper': 'scholar_scrapers',
+    'MlrScraper': 'scholar_scrapers', 'ACMScraper': 'scholar_scrapers',
+    'NeuripsScraper': 'scholar_scrapers', 'MdpiScraper': 'scholar_scrapers',
+    'ScienceDirectScraper': 'scholar_scrapers',
 
-from .utils import user_cycle, detect_source, extract_year
+    'AAMASScraper': 'venues_scrapers', 'AISTATSScraper': 'venues_scrapers',
+    'ICMLScraper': 'venues_scrapers', 'IJCAIScraper': 'venues_scrapers',
+    'ICLRScraper': 'venues_scrapers',
+
+    'user_cycle': 'utils', 'detect_source': 'utils', 'extract_year': 'utils',
+    'get_config': 'config',
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module_name}', __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,226 @@
+# backfill.py
+import concurrent.futures
+import html
+import json
+import logging
+import os
+import re
+import threading
+import xml.etree.ElementTree as ET
+from urllib.parse import quote, urlencode
+
+import requests
+
+from .config import get_config
+from .concurrency import MAX_WORKERS
+from .keyword_filter import KeywordFilter
+from .merge import DOI_PATTERN, KEY_KINDS, paper_keys
+from .metrics import METRICS
+from .openreview import title_key
+from .resilience import resilient_get, save_skipped_urls
+from .utils import detect_source
+from .venues_scrapers import ABSTRACT_FAILED, ABSTRACT_NOT_FOUND, EXTENDED_ABSTRACT
+
+##### Load configuration
+config = get_config()
+
+BACKFILL = config.get('backfill', {})
+HEADERS = config.get('headers', {})
+
+# Values stored in place of an abstract
+MISSING_ABSTRACTS = {'', ABSTRACT_FAILED, ABSTRACT_NOT_FOUND, EXTENDED_ABSTRACT}
+ATOM = '{http://www.w3.org/2005/Atom}'
+
+def is_missing(abstract):
+    return not abstract or abstract.strip() in MISSING_ABSTRACTS
+
+def strip_markup(text):
+    """Plain text of a JATS/HTML abstract, without a leading 'Abstract' heading."""
+    text = html.unescape(re.sub(r'<[^>]+>', ' ', text))
+    text = ' '.join(text.split())
+    return re.sub(r'^abstract[\s.:]*', '', text, flags=re.IGNORECASE)
+
+def load_skipped_urls(path="./results/skipped_urls.json"):
+    """URLs earlier runs gave up on (see `save_skipped_urls`)."""
+    if not os.path.exists(path):
+        return set()
+    with open(path, 'r') as f:
+        return {entry['url'] for entry in json.load(f)}
+
+class Backfill:
+    """
+    Fills in missing abstracts of a paper store without crawling again.
+
+    Papers are first matched against the rest of the store: a copy of the same
+    paper (same DOI, canonical URL or title) under another link with an
+    abstract lends it. The remaining gaps are grouped by the first strategy
+    that applies and resolved concurrently, falling through to the next
+    strategy when one finds nothing:
+
+    - 'retry': the paper's own page again, when a scraper exists for it and the
+      earlier attempt failed rather than found nothing (it is listed in
+      skipped_urls.json or its PDF could not be read).
+    - 'doi': the Crossref metadata of the DOI in its URL.
+    - 'arxiv': an arXiv title search, accepted only on an exact title match.
+    """
+    def __init__(self, store, crossref_url=None, arxiv_url=None, arxiv_delay=None, workers=None, mailto=None):
+        self.store = store
+        self.crossref_url = (crossref_url or BACKFILL.get('crossref_url', 'https://api.crossref.org')).rstrip('/')
+        self.arxiv_url = arxiv_url or BACKFILL.get('arxiv_url', 'http://export.arxiv.org/api/query')
+        self.arxiv_delay = BACKFILL.get('arxiv_delay', 3.0) if arxiv_delay is None else arxiv_delay
+        self.workers = workers or MAX_WORKERS
+        self.mailto = mailto or BACKFILL.get('mailto')
+        self.skipped_urls = load_skipped_urls()
+        self._scholar = None
+        self._venue_scrapers = {}
+        self._lock = threading.Lock()
+        # arXiv asks API clients for one request every three seconds
+        self._arxiv_lock = threading.Lock()
+
+    ##### Strategy selection
+    def scraper_for(self, paper):
+        """(kind, scraper) able to fetch the paper's own page, or None."""
+        from .venues import VENUES, VENUE_SCRAPERS
+        source = paper['Source']
+        if source in VENUE_SCRAPERS:
+            with self._lock:
+                if source not in self._venue_scrapers:
+                    self._venue_scrapers[source] = VENUE_SCRAPERS[source](source, VENUES[source])
+            return 'venue', self._venue_scrapers[source]
+        with self._lock:
+            if self._scholar is None:
+                from .scholar import ScholarScraper
+                self._scholar = ScholarScraper()
+        if detect_source(paper['URL']) in self._scholar.scrapers:
+            return 'scholar', self._scholar
+        return None
+
+    def strategies(self, paper):
+        """The strategies that apply to one paper, in the order they are tried."""
+        url = paper['URL'] or ''
+        applicable = []
+        transient = url in self.skipped_urls or paper['Abstract'] == ABSTRACT_FAILED
+        if url.startswith('http') and transient and self.scraper_for(paper) is not None:
+            applicable.append('retry')
+        if re.search(DOI_PATTERN, url):
+            applicable.append('doi')
+        if paper['Title'] and title_key(paper['Title']):
+            applicable.append('arxiv')
+        return applicable
+
+    ##### Strategies
+    def retry(self, paper):
+        kind, scraper = self.scraper_for(paper)
+        if kind == 'scholar':
+            return scraper.fetch_abstract(detect_source(paper['URL']), paper['URL'])
+        details = scraper.extract_paper_details(scraper.paper_info(paper['Title'], paper['URL']), paper['Year'])
+        return details.abstract if details else None
+
+    def doi(self, paper):
+        doi = re.search(DOI_PATTERN, paper['URL']).group(1).rstrip('.')
+        params = f"?{urlencode({'mailto': self.mailto})}" if self.mailto else ''
+        response = resilient_get(f"{self.crossref_url}/works/{quote(doi, safe='/')}{params}", headers=HEADERS, timeout=15)
+        if response.status_code != 200:
+            return None
+        abstract = response.json().get('message', {}).get('abstract')
+        return strip_markup(abstract) if abstract else None
+
+    def arxiv(self, paper):
+        wanted = title_key(paper['Title'])
+        query = {'search_query': f'ti:"{wanted}"', 'max_results': 5}
+        with self._arxiv_lock:
+            response = resilient_get(f"{self.arxiv_url}?{urlencode(query)}", headers=HEADERS, timeout=30)
+            METRICS.sleep(self.arxiv_delay, 'arXiv API')
+        if response.status_code != 200:
+            return None
+        for entry in ET.fromstring(response.content).iter(f'{ATOM}entry'):
+            if title_key(entry.findtext(f'{ATOM}title', '')) == wanted:
+                return ' '.join(entry.findtext(f'{ATOM}summary', '').split()) or None
+        return None
+
+    def resolve(self, paper):
+        """(abstract, strategy) of the first strategy that finds one, or (None, None)."""
+        for strategy in self.strategies(paper):
+            try:
+                with METRICS.timer('backfill', strategy):
+                    abstract = getattr(self, strategy)(paper)
+            except (requests.RequestException, ValueError, ET.ParseError) as e:
+                logging.warning(f"Backfill {strategy} failed for {paper['URL'] or paper['Title']}: {e}")
+                continue
+            if not is_missing(abstract):
+                return abstract, strategy
+        return None, None
+
+    ##### Runs
+    def from_clusters(self, df, missing):
+        """Abstracts of stored copies of the same papers, as {row position: abstract}."""
+        keys = paper_keys(df)
+        abstracts = df['Abstract'].astype(object).to_numpy()
+        found = {}
+        for kind in KEY_KINDS:
+            known = {}
+            for position, key in enumerate(keys[kind]):
+                if key is not None and not missing[position]:
+                    known.setdefault(key, abstracts[position])
+            for position in missing.nonzero()[0]:
+                key = keys[kind][position]
+                if position not in found and key is not None and key in known:
+                    found[position] = known[key]
+        return found
+
+    def run(self, limit=None):
+        """
+        Fill the gaps of the whole store, looking up at most `limit` papers
+        online (each up to one request per strategy). Returns the filled rows
+        as a DataFrame with a 'Backfill' column.
+        """
+        df = self.store.to_dataframe(include_unmatched=True, with_keys=True).reset_index(drop=True)
+        missing = (df['Abstract'].isna() | df['Abstract'].str.strip().isin(MISSING_ABSTRACTS)).to_numpy(dtype=bool)
+        logging.info(f"{missing.sum()} of {len(df)} stored papers have no abstract.")
+
+        filled = {position: (abstract, 'cluster') for position, abstract in self.from_clusters(df, missing).items()}
+        rows = df.astype(object).where(df.notna(), None).to_dict('records')
+        pending = [position for position in missing.nonzero()[0] if position not in filled]
+        plans = {position: self.strategies(rows[position]) for position in pending}
+        pending = [position for position in pending if plans[position]][:limit]
+        groups = {}
+        for position in pending:
+            groups[plans[position][0]] = groups.get(plans[position][0], 0) + 1
+        logging.info(f"Backfill plan: {len(filled)} from duplicates, {groups} to resolve, "
+                     f"{int(missing.sum()) - len(filled) - len(pending)} without a strategy.")
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for position, (abstract, strategy) in zip(pending, executor.map(lambda p: self.resolve(rows[p]), pending)):
+                if abstract is not None:
+                    filled[position] = (abstract, strategy)
+        save_skipped_urls()
+
+        keyword_filter = KeywordFilter()
+        updates = {}
+        for position, (abstract, _) in filled.items():
+            row = rows[position]
+            # Venue papers were keyword-filtered without an abstract; decide again
+            match = None if row['keyword_match'] is None else keyword_filter.matches(row['Title'] or '', abstract)
+            updates[row['key']] = (abstract, match)
+        self.store.set_abstracts(updates)
+
+        result = df.iloc[sorted(filled)].drop(columns=['key', 'keyword_match']).copy()
+        result['Abstract'] = [filled[position][0] for position in sorted(filled)]
+        result['Backfill'] = [filled[position][1] for position in sorted(filled)]
+        counts = result['Backfill'].value_counts().to_dict()
+        METRICS.incr('abstracts_backfilled', None, len(result))
+        logging.info(f"Backfilled {len(result)} of {missing.sum()} missing abstracts: {counts}.")
+        return result
+
+def backfill_store(store, limit=None, results_file="./results/all_results.xlsx"):
+    """
+    Fill the missing abstracts of `store`, and of `results_file` when it
+    exists, so the LLM filter reads complete inputs.
+    """
+    import pandas as pd
+    from .merge import update
+    filled = Backfill(store).run(limit=limit)
+    if not filled.empty and os.path.exists(results_file):
+        update(pd.read_excel(results_file), filled, ['Abstract']).to_excel(results_file, index=False)
+        logging.info(f"Backfilled abstracts written into {results_file}.")
+    return filled
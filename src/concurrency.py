@@ -0,0 +1,130 @@
+# concurrency.py
+import threading
+import time
+import logging
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .config import get_config
+from .utils import parse_retry_after
+from .metrics import METRICS
+
+##### Load configuration
+config = get_config()
+
+CONCURRENCY = config.get('concurrency', {})
+MAX_WORKERS = CONCURRENCY.get('max_workers', 32)
+
+# Responses that mean the host wants us to slow down
+THROTTLE_STATUSES = {429, 503}
+
+##### Per-host limiter
+class AdaptiveLimiter:
+    """
+    AIMD (additive increase, multiplicative decrease) concurrency limit for one host.
+
+    The limit grows by roughly one slot per window of fast, successful responses
+    and is cut by `backoff_factor` on 429/503 responses or timeouts. A Retry-After
+    header additionally pauses the host until the requested time has passed.
+    """
+    def __init__(self, host, initial_limit=2, min_limit=1, max_limit=16,
+                 latency_target=3.0, backoff_factor=0.5):
+        self.host = host
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.backoff_factor = backoff_factor
+        self.limit = float(initial_limit)
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        """Block until a request slot is free and the host is not paused."""
+        with self._condition:
+            while True:
+                wait = self.blocked_until - time.monotonic()
+                if wait <= 0 and self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return
+                self._condition.wait(timeout=wait if wait > 0 else None)
+
+    def release(self):
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def on_success(self, latency):
+        """Grow the limit while the host answers within the latency target."""
+        with self._condition:
+            if latency > self.latency_target:
+                return
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            self._condition.notify_all()
+
+    def on_throttle(self, retry_after=None):
+        """Cut the limit after a 429/503/timeout and honour Retry-After."""
+        with self._condition:
+            now = time.monotonic()
+            # Requests already in flight see the same congestion, so cut once per window
+            if now - self._last_decrease >= self.latency_target:
+                self.limit = max(self.min_limit, self.limit * self.backoff_factor)
+                self._last_decrease = now
+                logging.warning(f"Throttled by {self.host}. Concurrency limit reduced to {int(self.limit)}.")
+            if retry_after:
+                self.blocked_until = max(self.blocked_until, now + retry_after)
+                logging.warning(f"{self.host} asked to retry after {retry_after:.1f} seconds.")
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+def get_limiter(url):
+    """Return the shared limiter for the host of `url`, creating it on first use."""
+    host = urlparse(url).netloc.lower()
+    with _limiters_lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            settings = {k: v for k, v in CONCURRENCY.items() if k != 'max_workers'}
+            limiter = AdaptiveLimiter(host, **settings)
+            _limiters[host] = limiter
+    return limiter
+
+##### Shared HTTP session
+# Keep-alive connections per host, sized to the largest limit a host can reach
+SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=CONCURRENCY.get('max_limit', 16))
+SESSION.mount('http://', _adapter)
+SESSION.mount('https://', _adapter)
+
+def throttled_get(url, **kwargs):
+    """GET `url` through the adaptive limiter of its host and feed back the outcome."""
+    limiter = get_limiter(url)
+    with METRICS.timer('rate_limit_wait', limiter.host):
+        limiter.acquire()
+    start = time.monotonic()
+    try:
+        response = SESSION.get(url, **kwargs)
+    except requests.Timeout:
+        METRICS.incr('timeouts', limiter.host)
+        limiter.on_throttle()
+        raise
+    finally:
+        limiter.release()
+    latency = time.monotonic() - start
+
+    # 'http_headers' is time to the response headers (connect, TLS and server time);
+    # the rest of 'http' is spent downloading the body
+    METRICS.incr('requests', limiter.host)
+    METRICS.incr('bytes', limiter.host, len(response.content))
+    METRICS.observe('http', latency, limiter.host)
+    METRICS.observe('http_headers', response.elapsed.total_seconds(), limiter.host)
+
+    if response.status_code in THROTTLE_STATUSES:
+        METRICS.incr('throttled', limiter.host)
+        limiter.on_throttle(parse_retry_after(response.headers.get('Retry-After')))
+    else:
+        limiter.on_success(latency)
+    return response
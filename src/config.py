@@ -0,0 +1,24 @@
+# config.py
+import functools
+import json
+import os
+
+current_dir = os.path.dirname(os.path.realpath(__file__))
+
+@functools.lru_cache(maxsize=None)
+def load_json(filename):
+    """Read one of the JSON configuration files next to this module, once per process."""
+    with open(os.path.join(current_dir, filename), 'r') as f:
+        return json.load(f)
+
+def get_config():
+    """Scraping, retry and LLM settings (config.json)."""
+    return load_json('config.json')
+
+def get_keywords():
+    """Keyword bags for lexical filtering (keywords.json)."""
+    return load_json('keywords.json')
+
+def get_venues():
+    """Venue scraping configurations (venues.json)."""
+    return load_json('venues.json')
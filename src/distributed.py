@@ -0,0 +1,189 @@
+# distributed.py
+import threading
+import concurrent.futures
+import logging
+import time
+
+from .scholar import ScholarScraper, SCHOLAR_QUERY, NUM_PAGES, SHARDING, scholar_shards
+from .venues import VENUES, VENUE_SCRAPERS, KEEP_ALL_VENUE_PAPERS
+from .venues_scrapers import START_YEAR, END_YEAR
+from .concurrency import MAX_WORKERS
+from .metrics import METRICS
+from .resilience import save_skipped_urls
+from .work_queue import default_owner
+from .records import as_record
+from .merge import dedupe
+
+# Kinds of work units in the shared queue
+TASK_SCHOLAR_PAGES = 'scholar_pages'  # a range of Scholar result pages, or one query shard
+TASK_ABSTRACTS = 'abstracts'          # a batch of Scholar hits whose abstracts need resolving
+TASK_VENUE_YEAR = 'venue_year'        # one venue for one year
+
+def plan_crawl(queue, mode='all', query=SCHOLAR_QUERY, num_pages=NUM_PAGES, pages_per_task=5, venues=VENUES):
+    """Split a crawl into leases in `queue`. Returns the number of new tasks."""
+    added = 0
+    if mode in ('scholar', 'all') and SHARDING.get('enabled', False):
+        # A shard is paged until its first empty page, so it stays one task
+        for subquery, window in scholar_shards(query):
+            payload = {'query': subquery, 'year_range': list(window), 'start': 0, 'end': num_pages}
+            added += queue.enqueue(TASK_SCHOLAR_PAGES, payload)
+    elif mode in ('scholar', 'all'):
+        for start in range(0, num_pages, pages_per_task):
+            payload = {'query': query, 'start': start, 'end': min(num_pages, start + pages_per_task)}
+            added += queue.enqueue(TASK_SCHOLAR_PAGES, payload)
+    if mode in ('venues', 'all'):
+        for venue_name in venues:
+            if venue_name not in VENUE_SCRAPERS:
+                continue
+            for year in range(START_YEAR, END_YEAR + 1):
+                added += queue.enqueue(TASK_VENUE_YEAR, {'venue': venue_name, 'year': year})
+    logging.info(f"Planned {added} new tasks. Queue status: {queue.counts()}")
+    return added
+
+class TaskInterrupted(Exception):
+    """Raised by a task that was stopped before it finished; it goes back to the queue."""
+
+class Heartbeat:
+    """Keeps a task's lease alive from a background thread while the task runs."""
+    def __init__(self, queue, task_id, owner, lease_seconds):
+        self.queue = queue
+        self.task_id = task_id
+        self.owner = owner
+        self.lease_seconds = lease_seconds
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._beat, daemon=True)
+
+    def _beat(self):
+        while not self._stop.wait(self.lease_seconds / 3):
+            if not self.queue.heartbeat(self.task_id, self.owner, self.lease_seconds):
+                logging.warning(f"Lost the lease on task {self.task_id}.")
+                return
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+class CrawlWorker:
+    """
+    Claims tasks from a shared `LeaseQueue` and writes the papers it finds to a `PaperStore`.
+
+    Start as many workers as wanted, on one machine or several. A worker exits
+    once the queue has nothing pending and nothing leased to other workers.
+    """
+    def __init__(self, queue, store, owner=None, lease_seconds=300, abstract_batch_size=10,
+                 poll_interval=5, venues=VENUES):
+        self.queue = queue
+        self.store = store
+        self.owner = owner or default_owner()
+        self.lease_seconds = lease_seconds
+        self.abstract_batch_size = abstract_batch_size
+        self.poll_interval = poll_interval
+        self.venues = venues
+        self._scholar_scraper = None
+        self._venue_scrapers = {}
+
+    def scholar_scraper(self):
+        if self._scholar_scraper is None:
+            self._scholar_scraper = ScholarScraper()
+        return self._scholar_scraper
+
+    def venue_scraper(self, venue_name):
+        if venue_name not in self._venue_scrapers:
+            self._venue_scrapers[venue_name] = VENUE_SCRAPERS[venue_name](venue_name, self.venues[venue_name])
+        return self._venue_scrapers[venue_name]
+
+    def run(self):
+        """Work until the queue is drained. Returns the number of tasks processed."""
+        processed = 0
+        logging.info(f"Worker {self.owner} started.")
+        with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            while True:
+                task = self.queue.claim(self.owner, self.lease_seconds)
+                if task is None:
+                    if self.queue.is_drained():
+                        break
+                    # Other workers still hold leases and may enqueue follow-up work
+                    time.sleep(self.poll_interval)
+                    continue
+
+                task_id, kind, payload = task
+                with Heartbeat(self.queue, task_id, self.owner, self.lease_seconds):
+                    try:
+                        self.handle(kind, payload, executor)
+                    except Exception as e:
+                        logging.error(f"Task {task_id} ({kind} {payload}) failed: {e}")
+                        self.queue.fail(task_id, self.owner, e)
+                    else:
+                        self.queue.complete(task_id, self.owner)
+                processed += 1
+
+        save_skipped_urls()
+        logging.info(f"Worker {self.owner} finished after {processed} tasks. Queue status: {self.queue.counts()}")
+        return processed
+
+    def interrupted(self):
+        """Whether a running task should stop early (never, for a plain worker)."""
+        return False
+
+    def handle(self, kind, payload, executor):
+        """
+        Run one task. Returns the Scholar hits or papers it found. Raises
+        `TaskInterrupted` if `interrupted()` turned True before it was done.
+        """
+        if kind == TASK_SCHOLAR_PAGES:
+            scraper = self.scholar_scraper()
+            found = []
+            for page in range(payload['start'], payload['end']):
+                if self.interrupted():
+                    raise TaskInterrupted(f"Stopped before Scholar page {page + 1}")
+                hits = scraper.fetch_page(page, payload['query'], payload.get('year_range'))
+                if hits is None:
+                    raise RuntimeError(f"Scholar page {page + 1} could not be fetched")
+                if not hits:
+                    break
+                found.extend(hits)
+                # Abstract resolution is handed back to the queue so any worker can pick it up
+                for i in range(0, len(hits), self.abstract_batch_size):
+                    self.queue.enqueue(TASK_ABSTRACTS, {'query': payload['query'], 'papers': [hit.to_dict() for hit in hits[i:i + self.abstract_batch_size]]})
+                METRICS.sleep(2, 'scholar.google.com')  # Delay between Scholar pages to avoid blocking
+            return found
+
+        elif kind == TASK_ABSTRACTS:
+            scraper = self.scholar_scraper()
+            papers = [as_record(paper) for paper in payload['papers']]
+            abstracts = executor.map(lambda paper: scraper.resolve_abstract(paper.source, paper.url), papers)
+            for paper, abstract in zip(papers, abstracts):
+                paper.abstract = abstract
+            self.store.add_papers(papers)
+            METRICS.incr('papers', 'Scholar', len(papers))
+            return papers
+
+        elif kind == TASK_VENUE_YEAR:
+            scraper = self.venue_scraper(payload['venue'])
+            cancelled = threading.Event()
+            def skip_rest():
+                if self.interrupted():
+                    cancelled.set()
+                return cancelled.is_set()
+            papers = scraper.fetch_papers_for_year(payload['year'], executor, self.store if KEEP_ALL_VENUE_PAPERS else None,
+                                                   cancelled=skip_rest)
+            if cancelled.is_set():
+                # Skipped detail pages would make the year look complete
+                raise TaskInterrupted(f"Stopped during {payload['venue']} {payload['year']}")
+            self.store.add_papers(papers)
+            return papers
+
+        else:
+            raise ValueError(f"Unknown task kind: {kind}")
+
+def merge_results(store, output_file="./results/all_results.xlsx"):
+    """Write everything the workers stored as one deduplicated result file."""
+    df = dedupe(store.to_dataframe())
+    with METRICS.timer('excel_export'):
+        df.to_excel(output_file, index=False)
+    logging.info(f"Merged {len(df)} papers from {store.path} into {output_file}.")
+    return df
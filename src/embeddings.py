@@ -0,0 +1,166 @@
+# embeddings.py
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import time
+from contextlib import contextmanager
+
+from .config import get_config
+from .metrics import METRICS
+
+##### Load configuration
+config = get_config()
+
+EMBEDDINGS = config.get('embeddings', {})
+
+def text_hash(text):
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+class EmbeddingCache:
+    """
+    Sentence embeddings kept on disk, so a corpus is encoded once per model.
+
+    Vectors are rows of one float32 (or float16) matrix file per model, read
+    through a memory map; an SQLite index maps the hash of each text to its
+    row. `encode` only runs the model on texts it has not seen, in CPU batches,
+    and `rows` gives row indices for taking subsets straight from `matrix()`.
+    """
+    def __init__(self, model_name=None, path=None, dtype=None, batch_size=None, encoder=None):
+        import numpy as np
+        self.model_name = model_name or EMBEDDINGS.get('model', 'all-MiniLM-L6-v2')
+        self.dtype = np.dtype(dtype or EMBEDDINGS.get('dtype', 'float32'))
+        self.batch_size = batch_size or EMBEDDINGS.get('batch_size', 64)
+        self._encoder = encoder
+        model_dir = re.sub(r'[^\w.-]+', '_', self.model_name) + f"-{self.dtype.name}"
+        self.path = os.path.join(path or EMBEDDINGS.get('path', './results/embeddings'), model_dir)
+        os.makedirs(self.path, exist_ok=True)
+        self.data_path = os.path.join(self.path, 'vectors.bin')
+        self.index_path = os.path.join(self.path, 'index.sqlite')
+        open(self.data_path, 'ab').close()
+        with self.connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+            conn.execute("CREATE TABLE IF NOT EXISTS vectors (hash TEXT PRIMARY KEY, row INTEGER NOT NULL)")
+        self.dimension = self.stored_dimension()
+
+    @contextmanager
+    def connect(self):
+        conn = sqlite3.connect(self.index_path, timeout=60, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def stored_dimension(self):
+        with self.connect() as conn:
+            row = conn.execute("SELECT value FROM meta WHERE name = 'dimension'").fetchone()
+        return int(row[0]) if row else None
+
+    def encoder(self):
+        """The model's batch encode function; SentenceTransformer on CPU unless one was given."""
+        if self._encoder is None:
+            # Imported here so only the embedding stage needs sentence-transformers
+            from sentence_transformers import SentenceTransformer
+            model = SentenceTransformer(self.model_name, device='cpu')
+            self._encoder = lambda texts: model.encode(texts, batch_size=self.batch_size, convert_to_numpy=True)
+        return self._encoder
+
+    def __len__(self):
+        with self.connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM vectors").fetchone()[0]
+
+    def matrix(self):
+        """Memory-mapped view of every cached vector (empty before the first encode)."""
+        import numpy as np
+        self.dimension = self.dimension or self.stored_dimension()
+        if not self.dimension:
+            return np.empty((0, 0), dtype=self.dtype)
+        rows = os.path.getsize(self.data_path) // (self.dimension * self.dtype.itemsize)
+        if rows == 0:
+            return np.empty((0, self.dimension), dtype=self.dtype)
+        return np.memmap(self.data_path, dtype=self.dtype, mode='r', shape=(rows, self.dimension))
+
+    def lookup(self, hashes):
+        """Row of each cached hash, as a dict."""
+        found = {}
+        hashes = list(hashes)
+        with self.connect() as conn:
+            # Bounded IN lists keep under SQLite's variable limit
+            for i in range(0, len(hashes), 900):
+                chunk = hashes[i:i + 900]
+                marks = ','.join('?' * len(chunk))
+                found.update(conn.execute(f"SELECT hash, row FROM vectors WHERE hash IN ({marks})", chunk).fetchall())
+        return found
+
+    def add(self, hashes, vectors):
+        """Append vectors for `hashes`; hashes another process stored in the meantime keep their row."""
+        import numpy as np
+        vectors = np.ascontiguousarray(vectors, dtype=self.dtype)
+        with self.connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if self.dimension is None:
+                    self.dimension = int(vectors.shape[1])
+                    conn.execute("INSERT OR IGNORE INTO meta (name, value) VALUES ('dimension', ?), ('model', ?)",
+                                 (str(self.dimension), self.model_name))
+                if vectors.shape[1] != self.dimension:
+                    raise ValueError(f"{self.model_name} vectors have {vectors.shape[1]} dimensions, the cache {self.dimension}")
+                row_bytes = self.dimension * self.dtype.itemsize
+                with open(self.data_path, 'ab') as f:
+                    first_row = f.seek(0, os.SEEK_END) // row_bytes
+                    f.write(vectors.tobytes())
+                conn.executemany("INSERT OR IGNORE INTO vectors (hash, row) VALUES (?, ?)",
+                                 [(h, first_row + i) for i, h in enumerate(hashes)])
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def rows(self, texts, encode_missing=True):
+        """
+        Matrix row of every text, in order, encoding texts not cached yet.
+        With `encode_missing` false, uncached texts get row -1.
+        """
+        import numpy as np
+        # Missing values (None, NaN, pd.NA) are encoded as empty texts
+        texts = [text if isinstance(text, str) else '' for text in texts]
+        hashes = [text_hash(text) for text in texts]
+        found = self.lookup(set(hashes))
+        missing = {}
+        for h, text in zip(hashes, texts):
+            if h not in found and h not in missing:
+                missing[h] = text
+        if missing and encode_missing:
+            logging.info(f"Encoding {len(missing)} of {len(texts)} texts with {self.model_name} ({len(texts) - len(missing)} cached).")
+            encode = self.encoder()
+            pending = list(missing.items())
+            # Batches are stored as they finish, so an interrupted run keeps its work
+            chunk = self.batch_size * 16
+            for i in range(0, len(pending), chunk):
+                batch = pending[i:i + chunk]
+                started = time.perf_counter()
+                vectors = encode([text for _, text in batch])
+                METRICS.observe('embed', time.perf_counter() - started, self.model_name)
+                METRICS.incr('embedded_texts', self.model_name, len(batch))
+                self.add([h for h, _ in batch], vectors)
+            found = self.lookup(missing.keys()) | found
+        return np.array([found.get(h, -1) for h in hashes], dtype=np.int64)
+
+    def encode(self, texts):
+        """Embeddings of `texts` as an in-memory (len(texts), dimension) array, from the cache where possible."""
+        import numpy as np
+        rows = self.rows(texts)
+        if len(rows) == 0:
+            return np.empty((0, self.dimension or 0), dtype=self.dtype)
+        return np.asarray(self.matrix()[rows])
+
+def embed_store(store, column='Abstract', include_unmatched=False, cache=None):
+    """Encode the titles or abstracts of every stored paper not cached yet; returns the cache."""
+    cache = cache if cache is not None else EmbeddingCache()
+    df = store.to_dataframe(include_unmatched=include_unmatched)
+    texts = df[column].dropna().tolist()
+    rows = cache.rows(texts)
+    logging.info(f"{len(rows)} {column.lower()}s of {store.path} embedded in {cache.path}.")
+    return cache
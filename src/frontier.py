@@ -0,0 +1,291 @@
+# frontier.py
+import concurrent.futures
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from .config import get_config
+from .metrics import METRICS
+
+##### Load configuration
+config = get_config()
+
+FRONTIER = config.get('frontier', {})
+
+##### URL canonicalization
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'msclkid', 'yclid', 'mc_cid', 'mc_eid',
+    '_ga', '_gl', '_hsenc', '_hsmpl', 'ref_src', 'spm',
+}
+ARXIV_PATH = re.compile(r'^/(?:abs|pdf|format|html)/(.+?)(?:v\d+)?(?:\.pdf)?/?$')
+IEEE_DOCUMENT = re.compile(r'/document/(\d+)')
+IEEE_ARNUMBER = re.compile(r'(?:^|&)arnumber=(\d+)')
+
+def canonicalize_url(url):
+    """
+    Map the different spellings of a paper URL onto one key.
+
+    Lowercases scheme and host, treats http and https (and a leading www.) as
+    the same site, drops fragments and tracking parameters and sorts the rest.
+    arXiv abs/pdf/export links become https://arxiv.org/abs/<id> (without
+    version), IEEE document/ and arnumber= links https://ieeexplore.ieee.org/document/<n>.
+    """
+    if not url or url == 'No link':
+        return url
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    if scheme == 'http':
+        scheme = 'https'
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    if host == 'arxiv.org' or host.endswith('.arxiv.org'):
+        match = ARXIV_PATH.match(parts.path)
+        if match:
+            return f"https://arxiv.org/abs/{match.group(1)}"
+    if host == 'ieeexplore.ieee.org':
+        match = IEEE_DOCUMENT.search(parts.path) or IEEE_ARNUMBER.search(parts.query)
+        if match:
+            return f"https://ieeexplore.ieee.org/document/{match.group(1)}"
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS
+    )
+    path = parts.path
+    if len(path) > 1 and path.endswith('/'):
+        path = path.rstrip('/')
+    return urlunsplit((scheme, host, path or '/', urlencode(query), ''))
+
+# Plain http(s) links without query, port, credentials or special hosts, for which
+# canonicalization is only case, scheme, www. and trailing-slash handling
+SIMPLE_URL = r'^(?i:https?)://(?:(?i:www)\.)?(?P<host>[^/?#:@\[\]\s]+)(?P<path>/[^?#\s]*)?(?:#.*)?$'
+SPECIAL_HOSTS = r'(?:^|\.)(?:arxiv\.org|ieeexplore\.ieee\.org)$'
+
+def canonicalize_urls(urls):
+    """
+    `canonicalize_url` over a pandas Series of URLs. Simple links are handled
+    with vectorized string operations; the rest go through `canonicalize_url`.
+    """
+    urls = urls.astype(object)
+    text = urls.where(urls.map(lambda url: isinstance(url, str)), None).astype('string')
+    parts = text.str.extract(SIMPLE_URL)
+    host = parts['host'].str.lower()
+    simple = host.notna() & ~host.str.contains(SPECIAL_HOSTS, regex=True).fillna(True)
+    path = parts['path'].fillna('').str.rstrip('/').replace('', '/')
+    result = urls.copy()
+    result[simple.to_numpy(dtype=bool)] = ('https://' + host + path)[simple].astype(object)
+    rest = ~simple.to_numpy(dtype=bool) & text.notna().to_numpy(dtype=bool)
+    result[rest] = [canonicalize_url(url) for url in urls[rest]]
+    return result
+
+##### Seen-set
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (no false negatives, `error_rate` false positives at `capacity`)."""
+    def __init__(self, capacity, error_rate=0.001):
+        capacity = max(1, capacity)
+        self.size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+class UrlFrontier:
+    """
+    Persistent seen-set of paper URLs with the results fetched for them.
+
+    Every URL is canonicalized first. A Bloom filter answers "never seen" for
+    most new URLs without touching the SQLite store; only possible hits are
+    looked up exactly. Within a run, concurrent requests for the same URL wait
+    for the first fetch instead of fetching again. Results are kept in two
+    columns: 'abstract' (Scholar path) and 'record' (venue paper details). A
+    record's abstract also fills the 'abstract' column, so a paper found by the
+    venue scrapers is not fetched again from Scholar.
+
+    Fetches that found nothing (no abstract, a blocked or missing page, a
+    selector miss) are kept for this run only, so later runs, and parsers
+    fixed in the meantime, try them again.
+    """
+    def __init__(self, path=FRONTIER.get('path', "./results/frontier.sqlite"),
+                 expected_urls=FRONTIER.get('expected_urls', 1000000),
+                 error_rate=FRONTIER.get('error_rate', 0.001),
+                 sync_interval=FRONTIER.get('sync_interval', 5.0)):
+        self.path = path
+        self.sync_interval = sync_interval
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self.connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS seen (
+                    url TEXT PRIMARY KEY,
+                    abstract TEXT,
+                    record TEXT,
+                    fetched_at REAL
+                )""")
+            stored = conn.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+
+        self.bloom = BloomFilter(max(expected_urls, 2 * stored), error_rate)
+        self._lock = threading.Lock()
+        self._memory = {}    # (column, url) -> value resolved during this run
+        self._inflight = {}  # (column, url) -> Future of the fetch in progress
+        self._synced_rowid = 0
+        self._synced_at = 0
+        self._sync()
+        logging.info(f"URL frontier {path} loaded with {stored} known URLs.")
+
+    @contextmanager
+    def connect(self):
+        conn = sqlite3.connect(self.path, timeout=60)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _sync(self):
+        """Add URLs stored since the last sync (possibly by other workers) to the Bloom filter."""
+        with self.connect() as conn:
+            rows = conn.execute("SELECT rowid, url FROM seen WHERE rowid > ? ORDER BY rowid", (self._synced_rowid,)).fetchall()
+        with self._lock:
+            for _, url in rows:
+                self.bloom.add(url)
+            if rows:
+                self._synced_rowid = max(self._synced_rowid, rows[-1][0])
+            self._synced_at = time.monotonic()
+
+    def _lookup(self, column, key):
+        """Stored value of `column` for `key`, or None if not stored."""
+        if key not in self.bloom:
+            if time.monotonic() - self._synced_at < self.sync_interval:
+                return None
+            self._sync()
+            if key not in self.bloom:
+                return None
+        with self.connect() as conn:
+            row = conn.execute(f"SELECT {column} FROM seen WHERE url = ?", (key,)).fetchone()
+        if row is None or row[0] is None:
+            return None
+        # Older stores kept '' for "seen, no abstract"; those are fetched again
+        return json.loads(row[0]) or None
+
+    def _store(self, key, abstract=None, record=None):
+        values = {'abstract': abstract, 'record': record}
+        stored = {column: json.dumps(value) for column, value in values.items() if value is not None}
+        if not stored:
+            return
+        columns = list(stored)
+        with self.connect() as conn:
+            conn.execute(
+                f"""INSERT INTO seen (url, {', '.join(columns)}, fetched_at) VALUES (?, {', '.join('?' * len(columns))}, ?)
+                    ON CONFLICT(url) DO UPDATE SET {', '.join(f'{c} = excluded.{c}' for c in columns)}, fetched_at = excluded.fetched_at""",
+                (key, *stored.values(), time.time())
+            )
+        with self._lock:
+            self.bloom.add(key)
+
+    def _resolve(self, column, url, fetch, persist):
+        key = canonicalize_url(url)
+        memo_key = (column, key)
+        with self._lock:
+            if memo_key in self._memory:
+                METRICS.incr('cache_hits', 'frontier')
+                return self._memory[memo_key]
+            future = self._inflight.get(memo_key)
+            owner = future is None
+            if owner:
+                future = self._inflight[memo_key] = concurrent.futures.Future()
+        if not owner:
+            METRICS.incr('cache_hits', 'frontier')
+            return future.result()
+
+        # The store is read outside the lock; other threads asking for this URL wait on the future
+        try:
+            cached = self._lookup(column, key)
+            if cached is not None:
+                METRICS.incr('cache_hits', 'frontier')
+                value = cached
+            else:
+                METRICS.incr('cache_misses', 'frontier')
+                value = fetch()
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[memo_key]
+            future.set_exception(e)
+            raise
+        if cached is None:
+            try:
+                persist(key, value)
+            except sqlite3.Error as e:
+                logging.error(f"Could not store {key} in the URL frontier: {e}")
+        with self._lock:
+            self._memory[memo_key] = value
+            del self._inflight[memo_key]
+        future.set_result(value)
+        return value
+
+    def probably_seen(self, url):
+        """Cheap guess (Bloom filter only, no disk) whether `url` was fetched before."""
+        return canonicalize_url(url) in self.bloom
+
+    def resolve_abstract(self, url, fetch):
+        """
+        Abstract for `url`: from this run, from the store, or from `fetch()`.
+
+        Only abstracts that were found are stored; a None abstract is kept for
+        this run only.
+        """
+        def persist(key, abstract):
+            if abstract:
+                self._store(key, abstract=abstract)
+        value = self._resolve('abstract', url, fetch, persist)
+        return value or None
+
+    def resolve_record(self, url, fetch, failed_abstracts=()):
+        """
+        Paper details for `url`: from this run, from the store, or from `fetch()`.
+
+        Records without an abstract, or whose abstract is one of
+        `failed_abstracts`, are kept for this run only.
+        """
+        def persist(key, record):
+            if not record or not record.get('Abstract') or record['Abstract'] in failed_abstracts:
+                return
+            self._store(key, abstract=record['Abstract'], record=record)
+        return self._resolve('record', url, fetch, persist)
+
+_frontier = None
+_frontier_lock = threading.Lock()
+
+def get_frontier():
+    """The process-wide frontier, or None when disabled in config.json."""
+    global _frontier
+    if not FRONTIER.get('enabled', True):
+        return None
+    with _frontier_lock:
+        if _frontier is None:
+            _frontier = UrlFrontier()
+    return _frontier
@@ -0,0 +1,323 @@
+# fulltext.py
+import concurrent.futures
+import logging
+import mmap
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from collections import deque
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from urllib.parse import urlsplit, parse_qs
+
+import requests
+
+from .config import get_config
+from .concurrency import MAX_WORKERS
+from .frontier import canonicalize_url
+from .metrics import METRICS
+from .resilience import resilient_get, save_skipped_urls
+from .store import PaperStore, paper_key
+
+##### Load configuration
+config = get_config()
+
+FULLTEXT = config.get('fulltext', {})
+HEADERS = config.get('headers', {})
+
+##### PDF links
+PMLR_PAGE = re.compile(r'^(/v\d+/)([^/]+)\.html$')
+IJCAI_PAGE = re.compile(r'^/proceedings/\d{4}/\d+$')
+
+def pdf_url_for(url):
+    """
+    Link to the PDF of a paper whose landing page is `url`, or None when the
+    publisher's PDF location cannot be derived from it.
+    """
+    if not url or url == 'No link':
+        return None
+    if urlsplit(url).path.lower().endswith('.pdf'):
+        return url
+    parts = urlsplit(canonicalize_url(url))
+    host, path = parts.netloc, parts.path
+    if host == 'arxiv.org' and path.startswith('/abs/'):
+        return f"https://arxiv.org/pdf/{path[len('/abs/'):]}"
+    if host == 'proceedings.mlr.press':
+        match = PMLR_PAGE.match(path)
+        if match:
+            volume, name = match.groups()
+            return f"https://proceedings.mlr.press{volume}{name}/{name}.pdf"
+    if host == 'openreview.net' and path == '/forum':
+        paper_id = parse_qs(parts.query).get('id')
+        if paper_id:
+            return f"https://openreview.net/pdf?id={paper_id[0]}"
+    if host == 'ijcai.org' and IJCAI_PAGE.match(path):
+        return f"https://www.ijcai.org{path}.pdf"
+    if host == 'proceedings.neurips.cc' and '/hash/' in path and path.endswith(('-Abstract.html', '-Abstract-Conference.html')):
+        path = path.replace('/hash/', '/file/').replace('-Abstract', '-Paper').replace('.html', '.pdf')
+        return f"https://proceedings.neurips.cc{path}"
+    return None
+
+def extract_pdf_text(content):
+    """
+    Full text of PDF bytes, page by page. Runs in the harvester's worker
+    processes; returns (text, pages, error, seconds) so no parser exception has
+    to be pickled.
+    """
+    # Imported here so PyPDF2 is only loaded in the processes that parse PDFs
+    import io
+    from PyPDF2 import PdfReader
+    started = time.perf_counter()
+    try:
+        reader = PdfReader(io.BytesIO(content))
+        pages = [page.extract_text() or '' for page in reader.pages]
+    except Exception as e:
+        return None, 0, f"{type(e).__name__}: {e}", time.perf_counter() - started
+    return '\n'.join(pages), len(pages), None, time.perf_counter() - started
+
+##### Text store
+class TextStore:
+    """
+    Extracted full texts, one zlib-compressed blob per paper, appended to a
+    single data file. An SQLite index maps each paper key to the offset and
+    length of its blob.
+
+    Reads go through a memory map of the data file, so iterating over a large
+    corpus decompresses one document at a time and never loads the file.
+    Appends are serialized by the index's write lock, so several harvesters
+    can share a store.
+    """
+    def __init__(self, path=None, compression_level=None):
+        self.path = path or FULLTEXT.get('path', './results/fulltext')
+        self.compression_level = compression_level if compression_level is not None else FULLTEXT.get('compression_level', 6)
+        os.makedirs(self.path, exist_ok=True)
+        self.data_path = os.path.join(self.path, 'texts.bin')
+        self.index_path = os.path.join(self.path, 'index.sqlite')
+        open(self.data_path, 'ab').close()
+        self._map = None
+        self._map_lock = threading.Lock()
+        with self.connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS documents (
+                    key TEXT PRIMARY KEY,
+                    url TEXT,
+                    pdf_url TEXT,
+                    offset INTEGER NOT NULL,
+                    length INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    pages INTEGER,
+                    added_at REAL
+                )
+            """)
+
+    @contextmanager
+    def connect(self):
+        conn = sqlite3.connect(self.index_path, timeout=60, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def add(self, key, text, url=None, pdf_url=None, pages=None):
+        """Append the text of one paper; a later text for the same key replaces it."""
+        raw = text.encode('utf-8')
+        blob = zlib.compress(raw, self.compression_level)
+        with self.connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                with open(self.data_path, 'ab') as f:
+                    offset = f.seek(0, os.SEEK_END)
+                    f.write(blob)
+                conn.execute(
+                    """INSERT OR REPLACE INTO documents (key, url, pdf_url, offset, length, size, pages, added_at)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                    (key, url, pdf_url, offset, len(blob), len(raw), pages, time.time())
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                # Bytes already appended stay unreferenced
+                conn.execute("ROLLBACK")
+                raise
+
+    def __contains__(self, key):
+        with self.connect() as conn:
+            return conn.execute("SELECT 1 FROM documents WHERE key = ?", (key,)).fetchone() is not None
+
+    def __len__(self):
+        with self.connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def keys(self):
+        with self.connect() as conn:
+            return {row[0] for row in conn.execute("SELECT key FROM documents")}
+
+    def stats(self):
+        """Documents, pages, and raw and compressed text size in bytes."""
+        with self.connect() as conn:
+            count, pages, size, length = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(pages), 0), COALESCE(SUM(size), 0), COALESCE(SUM(length), 0) FROM documents"
+            ).fetchone()
+        return {'documents': count, 'pages': pages, 'text_bytes': size, 'stored_bytes': length}
+
+    def read(self, offset, length):
+        """Decompressed text of the blob at `offset`; the data file is remapped when it has grown past the map."""
+        with self._map_lock:
+            if self._map is None or len(self._map) < offset + length:
+                if self._map is not None:
+                    self._map.close()
+                with open(self.data_path, 'rb') as f:
+                    self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            blob = self._map[offset:offset + length]
+        return zlib.decompress(blob).decode('utf-8')
+
+    def get(self, key):
+        """Text of one paper, or None if it has not been harvested."""
+        with self.connect() as conn:
+            row = conn.execute("SELECT offset, length FROM documents WHERE key = ?", (key,)).fetchone()
+        return self.read(*row) if row else None
+
+    def iter_texts(self, keys=None):
+        """
+        Yield (key, text) for every stored paper, or for `keys`, in file order
+        so the data file is read sequentially.
+        """
+        with self.connect() as conn:
+            rows = conn.execute("SELECT key, offset, length FROM documents ORDER BY offset").fetchall()
+        wanted = set(keys) if keys is not None else None
+        for key, offset, length in rows:
+            if wanted is None or key in wanted:
+                yield key, self.read(offset, length)
+
+    def close(self):
+        with self._map_lock:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+
+##### Harvesting
+class PdfHarvester:
+    """
+    Downloads the PDFs of stored papers and puts their full text in a TextStore.
+
+    Downloads run on a thread pool through the shared rate limiter and retries;
+    text extraction is CPU-bound and runs in `processes` worker processes. At
+    most `max_in_flight` PDFs are held in memory at once. Papers already in the
+    text store are skipped, so an interrupted harvest resumes where it stopped.
+
+    If an extraction process dies (a parser crash, or out of memory), the pool
+    is restarted and the PDFs it was working on are extracted again one at a
+    time in a separate process, so the PDF that caused it is found and given
+    up as failed without taking the others down with it.
+    """
+    def __init__(self, store=None, texts=None, processes=None, max_in_flight=None):
+        self.store = store if store is not None else PaperStore()
+        self.texts = texts if texts is not None else TextStore()
+        self.processes = processes or FULLTEXT.get('processes') or os.cpu_count()
+        self.max_in_flight = max_in_flight or FULLTEXT.get('max_in_flight', 16)
+
+    def pending(self, include_unmatched=False, sources=None):
+        """(key, url, pdf_url) of stored papers with a known PDF location and no stored text yet."""
+        df = self.store.to_dataframe(include_unmatched=include_unmatched)
+        if sources:
+            df = df[df['Source'].isin(sources)]
+        # Missing values of the nullable dtypes (pd.NA) become None
+        df = df.astype(object)
+        df = df.where(df.notna(), None)
+        done = self.texts.keys()
+        papers, seen = [], set()
+        for paper in df.to_dict('records'):
+            key = paper_key(paper)
+            pdf_url = pdf_url_for(paper['URL'])
+            if pdf_url and key not in done and key not in seen:
+                seen.add(key)
+                papers.append((key, paper['URL'], pdf_url))
+        return papers
+
+    def download(self, pdf_url):
+        host = urlsplit(pdf_url).netloc
+        with METRICS.timer('pdf_download', host):
+            response = resilient_get(pdf_url, headers=HEADERS, timeout=60)
+        response.raise_for_status()
+        if not response.content.startswith(b'%PDF'):
+            raise ValueError(f"not a PDF ({response.headers.get('Content-Type', 'unknown type')})")
+        return response.content
+
+    def harvest(self, limit=None, include_unmatched=False, sources=None):
+        """Harvest up to `limit` pending papers; returns how many texts were stored."""
+        papers = self.pending(include_unmatched, sources)[:limit]
+        logging.info(f"Harvesting full text of {len(papers)} papers with {self.processes} extraction processes.")
+        stored = 0
+        remaining = iter(papers)
+        in_flight = {}
+        suspects = deque()  # (paper, content) in flight when an extraction process died
+        # 'extract' runs all extractions, 'isolate' the suspects one at a time
+        pools = {'extract': self.processes, 'isolate': 1}
+        extractors = {step: concurrent.futures.ProcessPoolExecutor(max_workers=workers) for step, workers in pools.items()}
+
+        def refill():
+            while len(in_flight) + len(suspects) < self.max_in_flight:
+                paper = next(remaining, None)
+                if paper is None:
+                    break
+                in_flight[downloads.submit(self.download, paper[2])] = ('download', paper, None)
+            if suspects and 'isolate' not in (step for step, _, _ in in_flight.values()):
+                extract('isolate', *suspects.popleft())
+
+        def extract(step, paper, content):
+            try:
+                future = extractors[step].submit(extract_pdf_text, content)
+            except BrokenProcessPool:
+                extractors[step].shutdown(wait=False)
+                extractors[step] = concurrent.futures.ProcessPoolExecutor(max_workers=pools[step])
+                future = extractors[step].submit(extract_pdf_text, content)
+            in_flight[future] = (step, paper, content)
+
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=min(MAX_WORKERS, self.max_in_flight)) as downloads:
+                refill()
+                while in_flight:
+                    done, _ = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in done:
+                        step, paper, content = in_flight.pop(future)
+                        key, url, pdf_url = paper
+                        host = urlsplit(pdf_url).netloc
+                        if step == 'download':
+                            try:
+                                content = future.result()
+                            except (requests.RequestException, ValueError) as e:
+                                METRICS.incr('pdf_failed', host)
+                                logging.error(f"Failed to download PDF {pdf_url}: {e}")
+                                continue
+                            METRICS.incr('pdf_bytes', host, len(content))
+                            extract('extract', paper, content)
+                            continue
+                        try:
+                            text, pages, error, seconds = future.result()
+                        except BrokenProcessPool:
+                            if step == 'extract':
+                                # Every PDF in the dead pool fails, though only one of them need be the cause
+                                logging.warning(f"A PDF extraction process died; extracting {pdf_url} again on its own.")
+                                suspects.append((paper, content))
+                                continue
+                            METRICS.incr('pdf_failed', host)
+                            logging.error(f"Extracting {pdf_url} kills the extraction process; giving up on it.")
+                            continue
+                        METRICS.observe('pdf_text', seconds, host)
+                        if error or not text or not text.strip():
+                            METRICS.incr('pdf_failed', host)
+                            logging.error(f"No text extracted from {pdf_url}: {error or 'empty document'}")
+                            continue
+                        self.texts.add(key, text, url=url, pdf_url=pdf_url, pages=pages)
+                        stored += 1
+                        METRICS.incr('pdf_texts', host)
+                    refill()
+        finally:
+            for pool in extractors.values():
+                pool.shutdown()
+        save_skipped_urls()
+        logging.info(f"Harvest completed: {stored} of {len(papers)} texts stored in {self.texts.path}.")
+        return stored
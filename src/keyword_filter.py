@@ -0,0 +1,59 @@
+# keyword_filter.py
+import logging
+
+from .config import get_keywords
+from .metrics import METRICS
+
+CATEGORIES = ['adversarial', 'marl', 'game_theory', 'rl', 'multi_agent']
+
+class KeywordFilter:
+    """
+    Lexical relevance rule over title and abstract:
+    Adversarial ∧ (MARL ∨ Game Theory ∨ (RL ∧ Multi-Agent)).
+
+    Keyword bags come from keywords.json (or `keywords`), lowercased and
+    deduplicated once. `matches` checks one paper, `matches_frame` every row
+    of a DataFrame.
+    """
+    def __init__(self, keywords=None):
+        keywords = keywords if keywords is not None else get_keywords()
+        self.terms = {
+            category: tuple(dict.fromkeys(term.lower() for term in keywords.get(category, [])))
+            for category in CATEGORIES
+        }
+
+    def has(self, category, text):
+        # Plain substring search; measured faster than a compiled regex alternation
+        return any(term in text for term in self.terms[category])
+
+    def matches_text(self, text):
+        """The rule on already lowercased text; later bags are only checked when they can change the outcome."""
+        return self.has('adversarial', text) and (
+            self.has('marl', text) or self.has('game_theory', text)
+            or (self.has('multi_agent', text) and self.has('rl', text))
+        )
+
+    def matches(self, title, abstract):
+        return self.matches_text(f"{title} | {abstract}".lower())
+
+    def matches_frame(self, df):
+        """
+        Boolean Series: which rows of a DataFrame with Title and Abstract columns
+        match. The texts are joined and lowercased with pandas string methods;
+        the rule itself runs once per row in Python.
+        """
+        import pandas as pd
+        texts = (df['Title'].fillna('').astype(str) + ' | ' + df['Abstract'].fillna('').astype(str)).str.lower()
+        return pd.Series([self.matches_text(text) for text in texts], index=df.index, dtype=bool)
+
+def refilter_store(store, keywords=None, output_file="./results/refiltered_results.xlsx"):
+    """
+    Apply a keyword configuration to every paper in `store`, including venue
+    papers the crawl-time filter rejected, and save the matching ones.
+    """
+    df = store.to_dataframe(include_unmatched=True)
+    with METRICS.timer('refilter'):
+        result = df[KeywordFilter(keywords).matches_frame(df)]
+    result.to_excel(output_file, index=False)
+    logging.info(f"Re-filtering kept {len(result)} of {len(df)} stored papers; saved to {output_file}.")
+    return result
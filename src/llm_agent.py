@@ -1,38 +1,23 @@
-from huggingface_hub import InferenceClient
-import pandas as pd
-import time
-import tqdm
 import os
+import re
 import json
+import pandas as pd
+import tqdm
 import logging
 
-# Load configurations from JSON file
-current_dir = os.path.dirname(__file__)
-config_file = os.path.join(current_dir, 'config.json')
-with open(config_file, 'r') as f:
-    config = json.load(f)
+from .config import get_config
+from .resilience import call_with_retry
+from .metrics import METRICS
 
-################
-class AgentLLM:
-    def __init__(self, api_key = config['api_key'], model_url = config['model_url']):
-        self.client = InferenceClient(model=model_url, token=api_key)
+# Load configurations from JSON file
+config = get_config()
 
-    def prompt_model(self, prompt):
-        try:
-            response = self.client.text_generation(prompt, return_full_text=False)
-            return response
-        except Exception as err:
-            logging.error(f"Error occurred while prompting model: {err}")
-            raise SystemExit(err)
+CASCADE = config.get('cascade', {})
+CASCADE_VERDICT = "Cascade"  # prefix of verdicts decided without the LLM
+PACKING = config.get('prompt_packing', {})
 
-    def filter_papers(self, dataframe):
-        dataframe['is_relevent'] = pd.Series(dtype='int64')
-        dataframe['Verdict'] = pd.Series(dtype='str')
-        abstracts = dataframe['Abstract'].tolist()
-        for i, abs in tqdm.tqdm(enumerate(abstracts), total=len(abstracts), desc="Prompting Phi model"):
-            title = dataframe.iloc[i]['Title']
-            abstract = abs
-            prompt = '''<|system|>
+##### Prompts and answer parsing
+SINGLE_PROMPT = '''<|system|>
             You are a helpful assistant. Your only valid responses are: "YES", "NO", or "I DON'T KNOW".
             <|end|>
             <|user|>
@@ -43,13 +28,282 @@ class AgentLLM:
                 explanation: <brief explanation of your decision>
             <|end|>
             <|assistant|>
-            '''.format(title, abstract)
+            '''
+
+PACKED_PROMPT = '''<|system|>
+You are a helpful assistant that classifies research papers. You only answer with JSON lines.
+<|end|>
+<|user|>
+For each paper below, decide whether it discusses adversarial attacks and/or defenses on multi-agent reinforcement learning (MARL) algorithms. The abstract must specifically reference a MARL or Game Theory algorithm.
+
+{papers}
+
+Answer with exactly one line per paper, in the same order, and nothing else:
+{{"id": <paper id>, "relevant": "yes" | "no" | "unknown", "why": "<at most 15 words>"}}
+<|end|>
+<|assistant|>
+'''
+
+PACKED_PAPER = "Paper {id}\nTitle: {title}\nAbstract: {abstract}"
+
+ANSWER_OBJECT = re.compile(r'\{[^{}]*\}')
+ANSWER_LABELS = {'yes': 1, 'true': 1, 'no': 0, 'false': 0, 'unknown': 0, "i don't know": 0}
+
+def parse_response(text):
+    """(is_relevant, explanation) from a single-paper answer, or None if it has no is_relevant line."""
+    label = re.search(r'is_relevant:\s*(.+)', text, re.IGNORECASE)
+    if not label:
+        return None
+    explanation = re.search(r'explanation:\s*(.*)', text, re.IGNORECASE | re.DOTALL)
+    return label.group(1).strip().lower(), explanation.group(1).strip() if explanation else ''
+
+def parse_packed_response(text, count):
+    """
+    {paper id: (is_relevent, why)} for every well-formed answer line of a packed prompt.
+
+    Prose, code fences, broken lines, unknown ids and repeated ids are ignored,
+    so the papers without a usable answer can simply be asked again.
+    """
+    answers = {}
+    for match in ANSWER_OBJECT.finditer(text or ''):
+        try:
+            answer = json.loads(match.group(0))
+            paper_id = int(answer['id'])
+            label = ANSWER_LABELS[str(answer['relevant']).strip().lower()]
+        except (ValueError, KeyError, TypeError):
+            continue
+        if 1 <= paper_id <= count and paper_id not in answers:
+            answers[paper_id] = (label, str(answer.get('why', '')).strip())
+    return answers
+
+################
+class RelevanceCascade:
+    """
+    Cheap local relevance model in front of the LLM, trained on earlier LLM verdicts.
+
+    Titles and abstracts are hashed into word and bigram TF-IDF features and scored
+    by a logistic regression, all papers in one batch. Papers scored below `lower`
+    are labelled not relevant and papers above `upper` relevant; only the ones in
+    between are sent to the LLM.
+
+    Unless given, the band is calibrated on out-of-fold scores of the training
+    papers: `lower` keeps `target_recall` of the LLM's relevant papers, `upper`
+    is the lowest score above which at least `target_precision` of the papers
+    were relevant (or 1, so nothing is accepted without the LLM).
+    """
+    def __init__(self, lower=None, upper=None,
+                 target_recall=CASCADE.get('target_recall', 0.98),
+                 target_precision=CASCADE.get('target_precision', 0.99),
+                 training_files=CASCADE.get('training_files', []),
+                 min_training_papers=CASCADE.get('min_training_papers', 100)):
+        self.lower = lower
+        self.upper = upper
+        self.target_recall = target_recall
+        self.target_precision = target_precision
+        self.training_files = training_files
+        self.min_training_papers = min_training_papers
+        self.model = None
+        self.report = {}
+
+    @staticmethod
+    def texts(dataframe):
+        return (dataframe['Title'].fillna('').astype(str) + ' ' + dataframe['Abstract'].fillna('').astype(str)).tolist()
+
+    def load_training_data(self):
+        """Papers labelled by the LLM in earlier runs, one row per title."""
+        frames = []
+        for path in self.training_files:
+            if not os.path.exists(path):
+                continue
+            df = pd.read_excel(path)
+            if 'is_relevent' not in df.columns:
+                # Files of relevant papers only
+                df['is_relevent'] = 1
+            if 'Verdict' in df.columns:
+                verdict = df['Verdict'].fillna('').astype(str)
+                df = df[~verdict.str.startswith(CASCADE_VERDICT) & (verdict != "LLM request failed")]
+            frames.append(df[['Title', 'Abstract', 'is_relevent']])
+        if not frames:
+            return pd.DataFrame(columns=['Title', 'Abstract', 'is_relevent'])
+        data = pd.concat(frames, ignore_index=True).dropna(subset=['is_relevent'])
+        data = data.drop_duplicates(subset=['Title'], keep='first')
+        data['is_relevent'] = data['is_relevent'].astype(int)
+        return data
+
+    def build_model(self):
+        from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.pipeline import make_pipeline
+        return make_pipeline(
+            HashingVectorizer(ngram_range=(1, 2), n_features=2 ** 18, alternate_sign=False, stop_words='english'),
+            TfidfTransformer(sublinear_tf=True),
+            LogisticRegression(C=10, class_weight='balanced', max_iter=1000),
+        )
+
+    def calibrate(self, scores, labels):
+        """Pick the band from out-of-fold `scores` unless it was given."""
+        if self.lower is None:
+            positives = sorted(scores[labels == 1])
+            self.lower = float(positives[int((1 - self.target_recall) * len(positives))])
+        if self.upper is None:
+            self.upper = 1.0
+            order = scores.argsort()[::-1]
+            relevant = labels[order].cumsum()
+            # Lowest score whose top-ranked papers (at least ten) are still precise enough
+            for rank in range(len(order) - 1, 8, -1):
+                if relevant[rank] / (rank + 1) >= self.target_precision:
+                    self.upper = float(scores[order[rank]])
+                    break
+
+    def fit(self, data=None):
+        """
+        Train on past verdicts. Returns False (and the cascade stays off) when
+        scikit-learn is missing or there are too few labelled papers of each class.
+        """
+        try:
+            from sklearn.model_selection import cross_val_predict
+        except ImportError:
+            logging.warning("scikit-learn is not installed; every paper goes to the LLM.")
+            return False
+        if data is None:
+            data = self.load_training_data()
+        counts = data['is_relevent'].value_counts()
+        if len(data) < self.min_training_papers or len(counts) < 2 or counts.min() < 5:
+            logging.info(f"Only {len(data)} labelled papers; every paper goes to the LLM.")
+            return False
+
+        texts, labels = self.texts(data), data['is_relevent'].to_numpy()
+        with METRICS.timer('cascade_fit'):
+            # Out-of-fold scores estimate how the band would have routed the labelled papers
+            scores = cross_val_predict(self.build_model(), texts, labels, cv=min(5, counts.min()), method='predict_proba')[:, 1]
+            self.model = self.build_model().fit(texts, labels)
+        self.calibrate(scores, labels)
+
+        positives = labels == 1
+        in_band = (scores >= self.lower) & (scores <= self.upper)
+        accepted = scores > self.upper
+        self.report = {
+            'training_papers': int(len(labels)),
+            'relevant_papers': int(positives.sum()),
+            'lower': self.lower,
+            'upper': self.upper,
+            'recall': float((scores >= self.lower)[positives].mean()),  # LLM positives not discarded by the cascade
+            'accepted_precision': float(positives[accepted].mean()) if accepted.any() else None,
+            'llm_fraction': float(in_band.mean()),
+        }
+        logging.info(f"Relevance cascade trained on {len(labels)} papers, band [{self.lower:.3f}, {self.upper:.3f}]: "
+                     f"recall {self.report['recall']:.3f} against LLM labels, "
+                     f"{self.report['llm_fraction']:.1%} of papers would still go to the LLM.")
+        return True
+
+    def score(self, dataframe):
+        """Relevance probability of every paper in `dataframe`."""
+        with METRICS.timer('cascade_score'):
+            return self.model.predict_proba(self.texts(dataframe))[:, 1]
+
+class AgentLLM:
+    def __init__(self, api_key = config['api_key'], model_url = config['model_url'], client = None,
+                 papers_per_prompt = PACKING.get('papers_per_prompt', 1)):
+        # Any object with a compatible `text_generation` method can stand in for the HF client
+        if client is None:
+            # Imported here so the HF client only loads when the filtering stage runs
+            from huggingface_hub import InferenceClient
+            client = InferenceClient(model=model_url, token=api_key)
+        self.client = client
+        self.model_url = model_url
+        self.papers_per_prompt = papers_per_prompt
+        self.tokens_per_paper = PACKING.get('tokens_per_paper', 48)
+        self.max_rounds = PACKING.get('max_rounds', 3)
+        self.max_abstract_chars = PACKING.get('max_abstract_chars', 2000)
+
+    def prompt_model(self, prompt, max_new_tokens=None):
+        """
+        Prompt the model with jittered retries on rate limits and server errors.
+
+        Returns None when the endpoint keeps failing (or its circuit breaker is
+        open), so the paper can be left for a later pass instead of ending the run.
+        """
+        METRICS.incr('llm_requests', self.model_url)
+        kwargs = {'max_new_tokens': max_new_tokens} if max_new_tokens else {}
+        try:
+            with METRICS.timer('llm', self.model_url):
+                return call_with_retry(
+                    lambda: self.client.text_generation(prompt, return_full_text=False, **kwargs),
+                    self.model_url
+                )
+        except Exception as err:
+            METRICS.incr('llm_failures', self.model_url)
+            logging.error(f"Error occurred while prompting model: {err}")
+            return None
+
+    def triage(self, dataframe, cascade):
+        """
+        Label the confident papers with `cascade` and return the positions left for the LLM.
+        """
+        scores = cascade.score(dataframe)
+        below, above = scores < cascade.lower, scores > cascade.upper
+        decided = below | above
+        dataframe.loc[below, 'is_relevent'] = 0
+        dataframe.loc[above, 'is_relevent'] = 1
+        dataframe.loc[decided, 'Verdict'] = [f"{CASCADE_VERDICT}: relevance score {score:.3f}" for score in scores[decided]]
+        pending = (~decided).nonzero()[0].tolist()
+        METRICS.incr('cascade_decided', self.model_url, len(dataframe) - len(pending))
+        logging.info(f"Relevance cascade decided {len(dataframe) - len(pending)} of {len(dataframe)} papers; "
+                     f"{len(pending)} go to the LLM.")
+        return pending
+
+    def filter_papers(self, dataframe, cascade=None):
+        """
+        Label every paper with `is_relevent` and a `Verdict`.
+
+        With the cascade enabled in config.json (or a fitted `cascade` given),
+        only papers the local model is unsure about are sent to the LLM, packed
+        `papers_per_prompt` to a prompt. `cascade=False` sends every paper.
+        """
+        dataframe = dataframe.reset_index(drop=True)
+        dataframe['is_relevent'] = pd.Series(dtype='int64')
+        dataframe['Verdict'] = pd.Series(dtype='str')
+        with METRICS.timer('llm_filter'):
+            if cascade is None and CASCADE.get('enabled', False):
+                cascade = RelevanceCascade()
+                if not cascade.fit():
+                    cascade = None
+            if cascade:
+                pending = self.triage(dataframe, cascade)
+            else:
+                pending = list(range(len(dataframe)))
+
+            if self.papers_per_prompt > 1:
+                self.label_packed(dataframe, pending)
+            else:
+                self.label_each(dataframe, pending)
+        # # drop the rows that are not relevant
+        # dataframe = dataframe[dataframe['is_relevent'] == 1]
+        # dataframe.drop(columns=['is_relevent'], inplace=True)
+        
+        return dataframe
+
+    def label_each(self, dataframe, positions):
+        """One prompt per paper."""
+        abstracts = dataframe['Abstract'].tolist()
+        for i in tqdm.tqdm(positions, desc="Prompting Phi model"):
+            title = dataframe.iloc[i]['Title']
+            abstract = abstracts[i]
+            prompt = SINGLE_PROMPT.format(title, abstract)
             
             response_text = self.prompt_model(prompt)
-            is_relevant = response_text.split('is_relevant: ')[1].split('explanation: ')[0].strip().lower()
-            verdict = response_text.split('explanation: ')[1].strip()
+            if response_text is None:
+                # Left unlabelled so a later pass can pick it up
+                dataframe.loc[i, 'Verdict'] = "LLM request failed"
+                continue
+            parsed = parse_response(response_text)
+            if parsed is None:
+                METRICS.incr('llm_unparsed', self.model_url)
+                dataframe.loc[i, 'Verdict'] = "LLM answer could not be parsed"
+                continue
+            is_relevant, verdict = parsed
             
-            if is_relevant == "yes":
+            if is_relevant.startswith("yes"):
                 dataframe.loc[i, 'is_relevent'] = 1
             else:
                 dataframe.loc[i, 'is_relevent'] = 0
@@ -58,13 +312,61 @@ class AgentLLM:
                 
             logging.info(f"Processed paper {title} with response: {is_relevant}, and explanation: {verdict}")
             
-            time.sleep(0.5)
-        # # drop the rows that are not relevant
-        # dataframe = dataframe[dataframe['is_relevent'] == 1]
-        # dataframe.drop(columns=['is_relevent'], inplace=True)
-        
-        return dataframe
+            METRICS.sleep(0.5, self.model_url)
+
+    def packed_prompt(self, papers):
+        """One prompt for a list of (title, abstract); papers are numbered from 1."""
+        blocks = [
+            PACKED_PAPER.format(id=n, title=title, abstract=str(abstract)[:self.max_abstract_chars])
+            for n, (title, abstract) in enumerate(papers, start=1)
+        ]
+        return PACKED_PROMPT.format(papers='\n\n'.join(blocks))
+
+    def label_packed(self, dataframe, positions):
+        """
+        Several papers per prompt, answered as JSON lines.
+
+        Papers without a usable answer are asked again, in prompts half as
+        large, for up to `max_rounds` rounds.
+        """
+        titles = dataframe['Title'].tolist()
+        abstracts = dataframe['Abstract'].tolist()
+        pending = list(positions)
+        batch_size = self.papers_per_prompt
+        failures = {}
+        with tqdm.tqdm(total=len(pending), desc="Prompting Phi model") as progress:
+            for _ in range(self.max_rounds):
+                if not pending:
+                    break
+                retry = []
+                for start in range(0, len(pending), batch_size):
+                    batch = pending[start:start + batch_size]
+                    prompt = self.packed_prompt([(titles[i], abstracts[i]) for i in batch])
+                    # The answer is one short line per paper, so generation is capped to that
+                    response_text = self.prompt_model(prompt, max_new_tokens=self.tokens_per_paper * len(batch))
+                    answers = parse_packed_response(response_text, len(batch)) if response_text is not None else {}
+                    for n, i in enumerate(batch, start=1):
+                        if n not in answers:
+                            failures[i] = "LLM request failed" if response_text is None else "LLM answer could not be parsed"
+                            retry.append(i)
+                            continue
+                        is_relevent, verdict = answers[n]
+                        dataframe.loc[i, 'is_relevent'] = is_relevent
+                        dataframe.loc[i, 'Verdict'] = verdict
+                        failures.pop(i, None)
+                        logging.info(f"Processed paper {titles[i]} with response: {is_relevent}, and explanation: {verdict}")
+                    if response_text is not None:
+                        METRICS.incr('llm_unparsed', self.model_url, len(batch) - len(answers))
+                    progress.update(len(answers))
+                    METRICS.sleep(0.5, self.model_url)
+                pending = retry
+                batch_size = max(1, batch_size // 2)
+
+        for i in pending:
+            # Left unlabelled so a later pass can pick it up
+            dataframe.loc[i, 'Verdict'] = failures[i]
 
     def save_results(self, dataframe):
-        dataframe.to_excel("./results/filtered_papers.xlsx", index=False)
+        with METRICS.timer('excel_export'):
+            dataframe.to_excel("./results/filtered_papers.xlsx", index=False)
         logging.info("Filtered papers saved to ./results/filtered_papers.xlsx.")
\ No newline at end of file
@@ -1,21 +1,20 @@
 # main.py
 import argparse
-import pandas as pd
 import logging
+import os
 
-from scholar import ScholarScraper
-from venues import VenueScraper
+from .metrics import METRICS
 
-from llm_agent import AgentLLM
-
-# Configure logging to use UTF-8 encoding
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('log/main.log', encoding='utf-8')
-    ]
-)
+def configure_logging(log_file='log/main.log'):
+    """Log to `log_file` (UTF-8); done on start rather than on import, so importing main has no side effects."""
+    os.makedirs(os.path.dirname(log_file), exist_ok=True)
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(log_file, encoding='utf-8')
+        ]
+    )
 
 def main():
     parser = argparse.ArgumentParser(description='Scrape papers from Google Scholar and conferences')
@@ -25,44 +24,175 @@ def main():
                         choices=['scholar', 'venues', 'all', 'none'],
                         default='all')
     parser.add_argument('--filter', help='Filter papers using LLM model', type=bool, nargs='?', const=True, default=False)
+    parser.add_argument('--distributed',
+                        help='Sharded crawl role: plan the work queue for --mode, work on it, or merge the stored papers',
+                        type=str,
+                        choices=['plan', 'work', 'merge'])
+    parser.add_argument('--queue', help='Shared work queue file for --distributed', type=str, default='./results/crawl_queue.sqlite')
+    parser.add_argument('--store', help='Paper store file (shared with --distributed workers, searched by the app)', type=str, default='./results/papers.sqlite')
+    parser.add_argument('--import-results', help='Add result spreadsheets of earlier runs to the paper store', nargs='+', metavar='XLSX', default=[])
+    parser.add_argument('--refilter',
+                        help='Re-apply keyword filtering to every stored paper, with keywords.json or the given keywords file',
+                        nargs='?', const=True, default=None, metavar='KEYWORDS_JSON')
+    parser.add_argument('--backfill',
+                        help='Fill in missing abstracts of stored papers from duplicates, DOI metadata and arXiv, without crawling again (at most LIMIT papers looked up online)',
+                        type=int, nargs='?', const=0, default=None, metavar='LIMIT')
+    parser.add_argument('--harvest-pdfs',
+                        help='Download the PDFs of stored papers and keep their full text for topic modeling (at most LIMIT papers)',
+                        type=int, nargs='?', const=0, default=None, metavar='LIMIT')
+    parser.add_argument('--diff', help='Report papers added, removed and changed between two result spreadsheets', nargs=2, metavar=('OLD_XLSX', 'NEW_XLSX'))
+    parser.add_argument('--preprocess',
+                        help='Count the terms of the stored abstracts or harvested full texts into a cached document-term matrix',
+                        type=str, choices=['abstracts', 'fulltext'])
+    parser.add_argument('--deadline', help='Stop scraping after this many minutes and save the papers found so far', type=float, metavar='MINUTES')
+    parser.add_argument('--budget', help='Request budgets per host for a scheduled scrape', nargs='+', metavar='HOST=N', default=[])
+    parser.add_argument('--embed', help='Add sentence embeddings of the stored abstracts to the embedding cache', type=bool, nargs='?', const=True, default=False)
+    parser.add_argument('--profile',
+                        help='Sample every pipeline stage and write per-stage flamegraphs and peak-memory reports to ./results/profile/',
+                        type=bool, nargs='?', const=True, default=False)
     args = parser.parse_args()
+    final_df = None
+    scheduled = False
+
+    profiler = None
+    if args.profile:
+        from .profiling import start_profiling
+        profiler = start_profiling()
+
+    if args.import_results:
+        import pandas as pd
+        from .store import PaperStore
+        store = PaperStore(args.store)
+        for path in args.import_results:
+            count = store.add_dataframe(pd.read_excel(path))
+            logging.info(f"Imported {count} papers from {path} into {args.store}.")
+
+    if args.diff:
+        import pandas as pd
+        from .merge import diff
+        old_path, new_path = args.diff
+        result = diff(pd.read_excel(old_path), pd.read_excel(new_path))
+        logging.info(f"{old_path} -> {new_path}: {result.summary()}")
+        result.to_excel()
+
+    if args.distributed == 'plan':
+        from .distributed import plan_crawl
+        from .work_queue import LeaseQueue
+        plan_crawl(LeaseQueue(args.queue), mode=args.mode)
+
+    elif args.distributed == 'work':
+        from .distributed import CrawlWorker
+        from .work_queue import LeaseQueue
+        from .store import PaperStore
+        CrawlWorker(LeaseQueue(args.queue), PaperStore(args.store)).run()
+
+    elif args.distributed == 'merge':
+        from .distributed import merge_results
+        from .store import PaperStore
+        final_df = merge_results(PaperStore(args.store))
+
+    elif args.mode != 'none' and (args.deadline is not None or args.budget):
+        # Scheduled scrape: the plan is kept in --queue, so rerunning with the same queue resumes it
+        import time
+        from .distributed import plan_crawl
+        from .scheduler import ScheduledCrawl
+        from .work_queue import LeaseQueue
+        from .store import PaperStore
+        queue = LeaseQueue(args.queue)
+        plan_crawl(queue, mode=args.mode)
+        budgets = {host.lower(): int(count) for host, count in (budget.split('=', 1) for budget in args.budget)}
+        deadline = time.time() + args.deadline * 60 if args.deadline is not None else None
+        final_df = ScheduledCrawl(queue, PaperStore(args.store), deadline=deadline, budgets=budgets).run()
+        scheduled = True
 
-    if args.mode == 'none':
+    elif args.mode == 'none':
         logging.info("No scraping tasks selected. Exiting program.")
         
+    # Stages import their dependencies only when selected
     elif args.mode == 'scholar':
+        from .scholar import ScholarScraper
         scholar_scraper = ScholarScraper()
         final_df = scholar_scraper.scrape()
         
     elif args.mode == 'venues':
+        from .venues import VenueScraper
         venue_scraper = VenueScraper()
         final_df = venue_scraper.scrape_venues()
         
     elif args.mode == 'all':
+        from .scholar import ScholarScraper
+        from .venues import VenueScraper
+        from .records import typed_frame
+        from .merge import merge
         scholar_scraper = ScholarScraper()
         scholar_df = scholar_scraper.scrape()
         venue_scraper = VenueScraper()
         venue_df = venue_scraper.scrape_venues()
         
-        # merge scholar and venue dataframes
-        final_df = pd.concat([scholar_df, venue_df], ignore_index=True)
-        final_df.drop_duplicates(subset=["Title"], inplace=True)
+        # merge scholar and venue dataframes; a paper found by both is kept once, with missing fields filled in
+        final_df = typed_frame(merge(scholar_df, venue_df))
         output_file = "./results/all_results.xlsx"
-        final_df.to_excel(output_file, index=False)
+        with METRICS.timer('excel_export'):
+            final_df.to_excel(output_file, index=False)
         logging.info(f"Scraping completed. {len(final_df)} papers saved to {output_file}.")
         logging.info("All scraping tasks completed.")
     
     else:
         logging.error("Invalid mode. Please choose from 'scholar', 'venues', 'all'.")
+
+    # Every scrape also lands in the paper store, which keeps the search index up to date
+    if final_df is not None and args.distributed is None and not scheduled:
+        from .store import PaperStore
+        PaperStore(args.store).add_dataframe(final_df)
+
+    if args.backfill is not None:
+        from .backfill import backfill_store
+        from .store import PaperStore
+        backfill_store(PaperStore(args.store), limit=args.backfill or None)
+
+    if args.refilter:
+        import json
+        from .keyword_filter import refilter_store
+        from .store import PaperStore
+        keywords = None
+        if args.refilter is not True:
+            with open(args.refilter, 'r') as f:
+                keywords = json.load(f)
+        refilter_store(PaperStore(args.store), keywords)
+
+    if args.harvest_pdfs is not None:
+        from .fulltext import PdfHarvester
+        from .store import PaperStore
+        PdfHarvester(PaperStore(args.store)).harvest(limit=args.harvest_pdfs or None)
+
+    if args.preprocess == 'abstracts':
+        from .preprocess import preprocess_store
+        from .store import PaperStore
+        preprocess_store(PaperStore(args.store))
+    elif args.preprocess == 'fulltext':
+        from .preprocess import preprocess_fulltext
+        from .fulltext import TextStore
+        preprocess_fulltext(TextStore())
+
+    if args.embed:
+        from .embeddings import embed_store
+        from .store import PaperStore
+        embed_store(PaperStore(args.store))
     
     if args.filter:
+        import pandas as pd
+        from .llm_agent import AgentLLM
         llm_agent = AgentLLM()
         final_df = pd.read_excel("./results/all_results.xlsx")
         filtered_df = llm_agent.filter_papers(final_df)
         llm_agent.save_results(filtered_df)
         logging.info("Filtering completed.")
-        
+    
+    METRICS.write_report()
+    if profiler is not None:
+        profiler.finish()
     return
 
 if __name__ == '__main__':
+    configure_logging()
     main()
\ No newline at end of file
@@ -0,0 +1,172 @@
+# merge.py
+import logging
+
+from .frontier import canonicalize_urls
+from .metrics import METRICS
+
+# Matching keys, strongest first: a DOI, the canonical URL, the normalized title
+KEY_KINDS = ['doi', 'url', 'title']
+DOI_PATTERN = r'(10\.\d{4,9}/[^\s?#&]+)'
+PLACEHOLDER_TITLES = {'', 'n/a', 'no title'}
+COMPARED_COLUMNS = ['Title', 'URL', 'Abstract', 'Source', 'Year']
+
+def paper_keys(df):
+    """
+    The matching keys of every row of a result DataFrame, as a dict of
+    key kind -> object array (None where the row has no such key).
+
+    Titles are lowercased with punctuation and spacing collapsed, then hashed
+    to 64 bits, so joins compare integers instead of long strings.
+    """
+    import numpy as np
+    import pandas as pd
+    n = len(df)
+    urls = df['URL'].astype(object).where(df['URL'].notna(), None) if 'URL' in df.columns else pd.Series([None] * n, index=df.index)
+    urls = urls.where(urls != 'No link', None)
+    url_keys = canonicalize_urls(urls)
+    url_keys = url_keys.where(url_keys.notna(), None)
+
+    dois = urls.dropna().astype(str).str.extract(DOI_PATTERN, expand=False).str.lower().str.rstrip('.')
+    doi_keys = pd.Series([None] * n, index=df.index, dtype=object)
+    doi_keys.loc[dois.dropna().index] = dois.dropna()
+
+    titles = df['Title'].astype(object).where(df['Title'].notna(), '').astype(str) if 'Title' in df.columns else pd.Series([''] * n, index=df.index)
+    normalized = titles.str.lower().str.replace(r'[\W_]+', ' ', regex=True).str.strip()
+    title_keys = pd.Series(pd.util.hash_array(normalized.to_numpy(dtype=object)), index=df.index).astype(object)
+    title_keys[titles.str.strip().str.lower().isin(PLACEHOLDER_TITLES)] = None
+    return {
+        'doi': doi_keys.to_numpy(dtype=object),
+        'url': url_keys.to_numpy(dtype=object),
+        'title': title_keys.to_numpy(dtype=object),
+    }
+
+def match(left, right, on=None):
+    """
+    One-to-one pairs of rows (positions in `left`, positions in `right`) that
+    are the same paper. Each key kind is one hash join over the rows still
+    unmatched, so the cost is linear in the number of rows. With `on`, rows
+    are matched by that column alone.
+    """
+    import numpy as np
+    import pandas as pd
+    if on is not None:
+        left_keys = {on: left[on].to_numpy(dtype=object)}
+        right_keys = {on: right[on].to_numpy(dtype=object)}
+    else:
+        left_keys, right_keys = paper_keys(left), paper_keys(right)
+    left_open = np.ones(len(left), dtype=bool)
+    right_open = np.ones(len(right), dtype=bool)
+    pairs = []
+    for kind in left_keys:
+        a = pd.DataFrame({'key': left_keys[kind], 'left': np.arange(len(left))})
+        b = pd.DataFrame({'key': right_keys[kind], 'right': np.arange(len(right))})
+        a = a[left_open & a['key'].notna().to_numpy()].drop_duplicates('key')
+        b = b[right_open & b['key'].notna().to_numpy()].drop_duplicates('key')
+        joined = a.merge(b, on='key')
+        left_open[joined['left'].to_numpy()] = False
+        right_open[joined['right'].to_numpy()] = False
+        pairs.append(joined[['left', 'right']])
+    pairs = pd.concat(pairs, ignore_index=True)
+    return pairs['left'].to_numpy(dtype=np.int64), pairs['right'].to_numpy(dtype=np.int64)
+
+def dedupe(df):
+    """`df` without rows that repeat an earlier row's DOI, canonical URL or title."""
+    import numpy as np
+    import pandas as pd
+    keys = paper_keys(df)
+    duplicate = np.zeros(len(df), dtype=bool)
+    for kind in KEY_KINDS:
+        values = pd.Series(keys[kind])
+        # Rows already dropped do not claim their other keys
+        kept = values.where(~duplicate)
+        duplicate |= (kept.duplicated() & kept.notna()).to_numpy()
+    return df[~duplicate]
+
+def as_text(frame):
+    """Cell values as comparable text, with missing values as ''."""
+    return frame.astype(object).where(frame.notna(), '').astype(str)
+
+class CorpusDiff:
+    """
+    Papers added, removed and changed between two result sets.
+
+    `changed` holds the new version of every matched paper with a different
+    value in any of `columns`, with the names of those columns in `Changed`.
+    """
+    def __init__(self, added, removed, changed, unchanged):
+        self.added = added
+        self.removed = removed
+        self.changed = changed
+        self.unchanged = unchanged
+
+    def summary(self):
+        return {'added': len(self.added), 'removed': len(self.removed), 'changed': len(self.changed), 'unchanged': self.unchanged}
+
+    def __repr__(self):
+        return f"CorpusDiff({self.summary()})"
+
+    def to_excel(self, output_file="./results/diff_results.xlsx"):
+        import pandas as pd
+        with pd.ExcelWriter(output_file) as writer:
+            self.added.to_excel(writer, sheet_name='Added', index=False)
+            self.removed.to_excel(writer, sheet_name='Removed', index=False)
+            self.changed.to_excel(writer, sheet_name='Changed', index=False)
+        logging.info(f"Diff {self.summary()} saved to {output_file}.")
+
+def diff(old, new, columns=None):
+    """Compare two result DataFrames paper by paper (matched by DOI, canonical URL or title)."""
+    import numpy as np
+    with METRICS.timer('diff'):
+        old_rows, new_rows = match(old, new)
+        columns = [c for c in (columns or COMPARED_COLUMNS) if c in old.columns and c in new.columns]
+        before = as_text(old.iloc[old_rows][columns]).to_numpy()
+        after = as_text(new.iloc[new_rows][columns]).to_numpy()
+        differs = before != after
+        changed_rows = differs.any(axis=1)
+
+        changed = new.iloc[new_rows[changed_rows]].copy()
+        names = np.array(columns, dtype=object)
+        changed['Changed'] = [', '.join(names[row]) for row in differs[changed_rows]]
+
+        added = np.ones(len(new), dtype=bool)
+        added[new_rows] = False
+        removed = np.ones(len(old), dtype=bool)
+        removed[old_rows] = False
+        return CorpusDiff(new[added], old[removed], changed, int((~changed_rows).sum()))
+
+def merge(left, right):
+    """
+    Outer merge of two result DataFrames. Matched papers appear once, with
+    each column taken from `left` and filled from `right` where `left` has no
+    value; unmatched papers of both sides are kept, duplicates within a side removed.
+    """
+    import numpy as np
+    import pandas as pd
+    with METRICS.timer('merge'):
+        left = left.reset_index(drop=True)
+        right = right.reset_index(drop=True)
+        left_rows, right_rows = match(left, right)
+        # Coalesce all columns of the matched pairs in one pass
+        matched = left.iloc[left_rows].reset_index(drop=True).combine_first(right.iloc[right_rows].reset_index(drop=True))
+        matched = matched[list(dict.fromkeys([*left.columns, *right.columns]))]
+        left_only = np.ones(len(left), dtype=bool)
+        left_only[left_rows] = False
+        right_only = np.ones(len(right), dtype=bool)
+        right_only[right_rows] = False
+        merged = pd.concat([matched, left[left_only], right[right_only]], ignore_index=True)
+        return dedupe(merged).reset_index(drop=True)
+
+def update(target, source, columns, on=None):
+    """
+    `target` with `columns` set from the matching papers of `source` (for
+    writing topics or labels computed on a subset back to the full set), matched
+    by paper keys or by the `on` column. Rows without a match keep their values.
+    """
+    target = target.copy()
+    target_rows, source_rows = match(target, source, on)
+    for column in columns:
+        if column not in target.columns:
+            target[column] = None
+        values = source[column].iloc[source_rows].to_numpy()
+        target.iloc[target_rows, target.columns.get_loc(column)] = values
+    return target
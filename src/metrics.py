@@ -0,0 +1,147 @@
+# metrics.py
+import threading
+import time
+import datetime as dt
+import logging
+import json
+from collections import defaultdict
+from contextlib import contextmanager
+
+from .config import get_config
+
+##### Load configuration
+config = get_config()
+
+METRICS_ENDPOINT = config.get('metrics_endpoint', False)
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(q / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+##### Run-wide timers and counters
+class Metrics:
+    """
+    Thread-safe timers and counters, keyed by stage (or counter name) and source.
+
+    Stages are things like 'http', 'parse', 'pdf_extract', 'llm' or 'sleep';
+    the source is the host, publisher or venue the work was done for.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        # A StageProfiler (see profiling.py) told about every timed stage while attached
+        self.profiler = None
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started_at = dt.datetime.now()
+            self._start = time.monotonic()
+            self.counters = defaultdict(float)
+            self.timings = defaultdict(list)
+
+    def incr(self, name, source=None, value=1):
+        with self._lock:
+            self.counters[(name, source)] += value
+
+    def value(self, name, source=None):
+        with self._lock:
+            return self.counters.get((name, source), 0)
+
+    def by_source(self, name):
+        """Current value of counter `name` for every source, as a dict."""
+        with self._lock:
+            return {source: value for (counter, source), value in self.counters.items() if counter == name}
+
+    def observe(self, stage, seconds, source=None):
+        with self._lock:
+            self.timings[(stage, source)].append(seconds)
+
+    def mean(self, stage, source=None, default=None):
+        """Mean of the timings recorded for `stage` so far, or `default` if there are none."""
+        with self._lock:
+            values = self.timings.get((stage, source))
+            return sum(values) / len(values) if values else default
+
+    @contextmanager
+    def timer(self, stage, source=None):
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.enter(stage)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start, source)
+            if profiler is not None:
+                profiler.exit(stage)
+
+    def sleep(self, seconds, source=None):
+        """time.sleep that is accounted for under the 'sleep' stage."""
+        if seconds <= 0:
+            return
+        with self.timer('sleep', source):
+            time.sleep(seconds)
+
+    def summary(self):
+        with self._lock:
+            timings = {key: sorted(values) for key, values in self.timings.items()}
+            counters = dict(self.counters)
+            duration = time.monotonic() - self._start
+
+        stages = []
+        for (stage, source), values in sorted(timings.items(), key=lambda item: (item[0][0], str(item[0][1]))):
+            total = sum(values)
+            stages.append({
+                'stage': stage,
+                'source': source,
+                'count': len(values),
+                'total': total,
+                'mean': total / len(values),
+                'p50': percentile(values, 50),
+                'p95': percentile(values, 95),
+                'p99': percentile(values, 99),
+                'max': values[-1],
+            })
+        return {
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'duration': duration,
+            'stages': stages,
+            'counters': [
+                {'name': name, 'source': source, 'value': value}
+                for (name, source), value in sorted(counters.items(), key=lambda item: (item[0][0], str(item[0][1])))
+            ],
+        }
+
+    def write_report(self, output_file="./results/run_report.json"):
+        """Write the machine-readable run report."""
+        report = self.summary()
+        with open(output_file, 'w') as f:
+            json.dump(report, f, indent=2)
+        logging.info(f"Run report saved to {output_file}.")
+        return report
+
+    def to_prometheus(self):
+        """Render counters and stage timings in the Prometheus text exposition format."""
+        report = self.summary()
+        lines = []
+
+        def labels(**values):
+            pairs = [f'{key}="{str(value).replace(chr(34), chr(39))}"' for key, value in values.items() if value is not None]
+            return '{' + ','.join(pairs) + '}' if pairs else ''
+
+        for counter in report['counters']:
+            lines.append(f"sci_scraper_{counter['name']}_total{labels(source=counter['source'])} {counter['value']}")
+        for stage in report['stages']:
+            base = dict(stage=stage['stage'], source=stage['source'])
+            for q in ('p50', 'p95', 'p99'):
+                quantile = int(q[1:]) / 100
+                lines.append(f"sci_scraper_stage_seconds{labels(**base, quantile=quantile)} {stage[q]}")
+            lines.append(f"sci_scraper_stage_seconds_sum{labels(**base)} {stage['total']}")
+            lines.append(f"sci_scraper_stage_seconds_count{labels(**base)} {stage['count']}")
+        lines.append(f"sci_scraper_run_duration_seconds {report['duration']}")
+        return '\n'.join(lines) + '\n'
+
+METRICS = Metrics()
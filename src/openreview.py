@@ -0,0 +1,110 @@
+# openreview.py
+import logging
+import re
+from urllib.parse import urlencode, urlparse, parse_qs
+
+import requests
+
+from .config import get_config
+from .resilience import resilient_get
+from .metrics import METRICS
+
+##### Load configuration
+config = get_config()
+
+OPENREVIEW = config.get('openreview', {})
+HEADERS = config.get('headers', {})
+
+def forum_id(url):
+    """The note id of an OpenReview forum or PDF link, or None for other URLs."""
+    if not url:
+        return None
+    parts = urlparse(url)
+    if not parts.netloc.lower().endswith('openreview.net'):
+        return None
+    ids = parse_qs(parts.query).get('id')
+    return ids[0] if ids else None
+
+def title_key(title):
+    return re.sub(r'[\W_]+', ' ', (title or '').lower()).strip()
+
+def content_value(content, field):
+    """A note field; API v2 wraps every value as {'value': ...}, API v1 does not."""
+    value = content.get(field)
+    if isinstance(value, dict):
+        value = value.get('value')
+    return value
+
+class OpenReviewClient:
+    """
+    Bulk reader of ICLR submissions from the OpenReview notes API.
+
+    One request returns up to `page_size` notes, so a whole conference year
+    takes a handful of requests instead of one page per paper. Years before
+    `v2_from_year` are read from the v1 API, later ones from the v2 API.
+    `api_url` and `api_v1_url` can point at a local fake server; requests go
+    through the shared retry layer and adaptive limiter like every other fetch.
+    """
+    def __init__(self, api_url=None, api_v1_url=None, v2_from_year=None, page_size=None):
+        self.api_url = (api_url or OPENREVIEW.get('api_url', 'https://api2.openreview.net')).rstrip('/')
+        self.api_v1_url = (api_v1_url or OPENREVIEW.get('api_v1_url', 'https://api.openreview.net')).rstrip('/')
+        self.v2_from_year = v2_from_year or OPENREVIEW.get('v2_from_year', 2024)
+        self.page_size = page_size or OPENREVIEW.get('page_size', 1000)
+
+    def notes_url(self, year, offset=0):
+        """URL of one page of a year's submissions."""
+        if year >= self.v2_from_year:
+            api, invitation = self.api_url, f"ICLR.cc/{year}/Conference/-/Submission"
+        else:
+            api, invitation = self.api_v1_url, f"ICLR.cc/{year}/Conference/-/Blind_Submission"
+        return f"{api}/notes?{urlencode({'invitation': invitation, 'offset': offset, 'limit': self.page_size})}"
+
+    def submissions(self, year):
+        """
+        Every ICLR submission of `year` as dicts with 'title', 'abstract',
+        'url' (the forum page) and 'decision' (the venue string, e.g.
+        'ICLR 2024 poster', or None when the API does not say).
+        """
+        papers = []
+        offset = 0
+        while True:
+            url = self.notes_url(year, offset)
+            with METRICS.timer('openreview_page', 'ICLR'):
+                response = resilient_get(url, headers=HEADERS, timeout=30)
+                response.raise_for_status()
+                data = response.json()
+            notes = data.get('notes', [])
+            for note in notes:
+                content = note.get('content', {})
+                papers.append({
+                    'title': content_value(content, 'title'),
+                    'abstract': content_value(content, 'abstract'),
+                    'url': f"https://openreview.net/forum?id={note.get('forum') or note['id']}",
+                    'decision': content_value(content, 'venue'),
+                })
+            offset += len(notes)
+            if not notes or len(notes) < self.page_size or offset >= data.get('count', offset + 1):
+                break
+        logging.info(f"Fetched {len(papers)} ICLR {year} submissions from OpenReview in {offset // self.page_size + 1} requests.")
+        return papers
+
+    def abstracts(self, year):
+        """
+        Lookup tables of the year's abstracts, by forum id and by normalized
+        title (the title table only holds submissions not marked as rejected
+        or withdrawn). Empty when OpenReview could not be read.
+        """
+        try:
+            papers = self.submissions(year)
+        except (requests.RequestException, ValueError) as e:
+            logging.warning(f"OpenReview bulk read for ICLR {year} failed, falling back to paper pages: {e}")
+            return {}, {}
+        by_forum, by_title = {}, {}
+        for paper in papers:
+            if not paper['abstract']:
+                continue
+            by_forum[forum_id(paper['url'])] = paper
+            decision = (paper['decision'] or '').lower()
+            if not any(word in decision for word in ('submitted', 'reject', 'withdraw', 'desk')):
+                by_title.setdefault(title_key(paper['title']), paper)
+        return by_forum, by_title
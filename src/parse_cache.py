@@ -0,0 +1,122 @@
+# parse_cache.py
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from .config import get_config
+from .metrics import METRICS
+
+##### Load configuration
+config = get_config()
+
+PARSE_CACHE = config.get('parse_cache', {})
+
+def body_hash(body):
+    """128-bit blake2b hash of a response body (str or bytes)."""
+    if isinstance(body, str):
+        body = body.encode('utf-8', 'surrogatepass')
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+class ParseCache:
+    """
+    Parsed results of response bodies, kept in a SQLite file.
+
+    Entries are keyed by (body hash, extractor name, extractor version), so an
+    unchanged page is never parsed twice by the same extractor, and bumping one
+    extractor's version only invalidates that extractor's entries. Raw
+    responses are not stored here, only what was extracted from them.
+    """
+    def __init__(self, path=PARSE_CACHE.get('path', "./results/parse_cache.sqlite")):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self.connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS parsed (
+                    body_hash TEXT NOT NULL,
+                    extractor TEXT NOT NULL,
+                    version TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    parsed_at REAL,
+                    PRIMARY KEY (body_hash, extractor, version)
+                )""")
+
+    @contextmanager
+    def connect(self):
+        conn = sqlite3.connect(self.path, timeout=60)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def connection(self):
+        """This thread's connection; lookups and inserts are too small to open one each."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=60)
+            # A lost entry after a power cut only means parsing that page again
+            conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def get(self, key, extractor, version):
+        """(True, result) if stored, else (False, None); a stored result may itself be None."""
+        row = self.connection().execute(
+            "SELECT result FROM parsed WHERE body_hash = ? AND extractor = ? AND version = ?",
+            (key, extractor, str(version))
+        ).fetchone()
+        if row is None:
+            return False, None
+        return True, json.loads(row[0])
+
+    def put(self, key, extractor, version, result):
+        conn = self.connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO parsed (body_hash, extractor, version, result, parsed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, extractor, str(version), json.dumps(result), time.time())
+            )
+
+    def memoize(self, body, extractor, version, parse):
+        """`parse()`, or its stored result when this extractor version parsed the same body before."""
+        key = body_hash(body)
+        found, result = self.get(key, extractor, version)
+        if found:
+            METRICS.incr('cache_hits', 'parse_cache')
+            return result
+        METRICS.incr('cache_misses', 'parse_cache')
+        # Exceptions propagate uncached, so a parser crash is retried next time
+        result = parse()
+        try:
+            self.put(key, extractor, version, result)
+        except sqlite3.Error as e:
+            logging.error(f"Could not store the {extractor} result in the parse cache: {e}")
+        return result
+
+_parse_cache = None
+_parse_cache_lock = threading.Lock()
+
+def get_parse_cache():
+    """The process-wide parse cache, or None when disabled in config.json."""
+    global _parse_cache
+    if not PARSE_CACHE.get('enabled', True):
+        return None
+    with _parse_cache_lock:
+        if _parse_cache is None:
+            _parse_cache = ParseCache()
+    return _parse_cache
+
+def memoize(body, extractor, version, parse):
+    """`parse()` through the process-wide parse cache (or directly when it is disabled)."""
+    cache = get_parse_cache()
+    if cache is None or body is None:
+        return parse()
+    return cache.memoize(body, extractor, version, parse)
@@ -0,0 +1,163 @@
+# pmlr.py
+import logging
+import re
+from urllib.parse import urlparse
+
+import requests
+
+from .config import get_config
+from .resilience import resilient_get
+from .metrics import METRICS
+
+HEADERS = get_config().get('headers', {})
+
+# LaTeX left in PMLR titles and abstracts: math, escaped characters, simple
+# accent and font commands, and braces protecting capitalization
+LATEX_MATH = re.compile(r'(?<!\\)(\$\$?)(?:\\.|[^$\\])+?\1')
+LATEX_ESCAPES = re.compile(r'\\([&%$#_{}])')
+# Letter accents (\c, \v, ...) only when not the start of a longer command such as \cdot or \varepsilon
+LATEX_ACCENTS = re.compile(r'\\(?:[`\'^"~=.]|[Hcuv](?![A-Za-z]))\s*\{?([A-Za-z])\}?')
+LATEX_FONTS = re.compile(r'\\(?:emph|text(?:it|bf|sl|sc|tt|rm|sf|up|md|normal))\s*\{([^{}]*)\}')
+# A group right after a command or a sub/superscript is an argument, not protection
+LATEX_ARGUMENT = re.compile(r'(?:\\[A-Za-z]+\*?\s*|[_^])$')
+ESCAPED_OPEN, ESCAPED_CLOSE = '\ue000', '\ue001'
+
+def strip_protective_braces(text):
+    """Drop the braces of {groups} that only protect capitalization; argument braces stay."""
+    kept = []
+    result = []
+    for char in text:
+        if char == '{':
+            keep = bool(LATEX_ARGUMENT.search(''.join(result[-32:])))
+            kept.append(keep)
+            if keep:
+                result.append(char)
+        elif char == '}' and kept:
+            if kept.pop():
+                result.append(char)
+        else:
+            result.append(char)
+    return ''.join(result)
+
+def clean_text(text):
+    """`clean_latex` for text outside math."""
+    text = LATEX_ACCENTS.sub(r'\1', text)
+    previous = None
+    while previous != text:
+        previous, text = text, LATEX_FONTS.sub(r'\1', text)
+    text = LATEX_ESCAPES.sub(lambda match: {'{': ESCAPED_OPEN, '}': ESCAPED_CLOSE}.get(match.group(1), match.group(1)), text)
+    text = strip_protective_braces(text)
+    return text.replace(ESCAPED_OPEN, '{').replace(ESCAPED_CLOSE, '}')
+
+def clean_latex(text):
+    """
+    Bib field text with escapes and accents resolved, font commands unwrapped,
+    protective braces dropped and whitespace collapsed. Math ($...$) is kept
+    as written, and so are the arguments of other commands.
+    """
+    parts = []
+    position = 0
+    for match in LATEX_MATH.finditer(text):
+        parts.append(clean_text(text[position:match.start()]))
+        parts.append(match.group(0))
+        position = match.end()
+    parts.append(clean_text(text[position:]))
+    return ' '.join(''.join(parts).split())
+
+FIELD_NAME = re.compile(r'[\s,]*([\w-]+)\s*=\s*')
+BARE_VALUE_END = re.compile(r'[,}]|$')
+
+def read_delimited(body, position):
+    """(value, position after it) of a {braced} or "quoted" value starting at `position`."""
+    quoted = body[position] == '"'
+    depth = 0 if quoted else 1
+    start = position = position + 1
+    while position < len(body):
+        char = body[position]
+        if char == '\\':
+            position += 2
+            continue
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0 and not quoted:
+                break
+        elif char == '"' and quoted and depth == 0:
+            break
+        position += 1
+    return body[start:position], position + 1
+
+def parse_fields(body):
+    """Fields of one entry body ('key, name = {value}, ...') as a dict with lowercase names."""
+    fields = {}
+    position = body.find(',') + 1
+    while position < len(body):
+        match = FIELD_NAME.match(body, position)
+        if not match or match.end() >= len(body):
+            break
+        name, position = match.group(1).lower(), match.end()
+        if body[position] in '{"':
+            fields[name], position = read_delimited(body, position)
+        else:
+            end = BARE_VALUE_END.search(body, position).start()
+            fields[name] = body[position:end].strip()
+            position = end
+    return fields
+
+def parse_bibtex(lines):
+    """
+    Yield (entry type, fields) for every entry in an iterable of BibTeX lines.
+
+    Entries are parsed one at a time as soon as their braces balance, so a
+    volume's bibliography is never held as a list of entries.
+    """
+    entry, depth, opened = [], 0, False
+    for line in lines:
+        if not entry:
+            start = line.find('@')
+            if start < 0:
+                continue
+            line = line[start:]
+        entry.append(line)
+        # Escaped braces do not count towards the nesting
+        stripped = line.replace('\\{', '').replace('\\}', '')
+        depth += stripped.count('{') - stripped.count('}')
+        opened = opened or '{' in stripped
+        if opened and depth <= 0:
+            kind, _, body = '\n'.join(entry).partition('{')
+            entry, depth, opened = [], 0, False
+            kind = kind.strip().lstrip('@').lower()
+            if kind in ('comment', 'preamble', 'string'):
+                continue
+            yield kind, parse_fields(body.rstrip().rstrip('}'))
+
+def url_key(url):
+    """Scheme- and host-independent key of a PMLR page URL."""
+    return urlparse(url).path.rstrip('/')
+
+def fetch_volume(bibliography_url):
+    """
+    Papers of one PMLR volume from its bibliography, as a dict of URL key ->
+    {'title', 'abstract', 'year', 'url'}. Empty when the file could not be read.
+    """
+    try:
+        with METRICS.timer('pmlr_bibliography'):
+            response = resilient_get(bibliography_url, headers=HEADERS, timeout=60)
+            response.raise_for_status()
+    except requests.RequestException as e:
+        logging.warning(f"Could not read PMLR bibliography {bibliography_url}, falling back to paper pages: {e}")
+        return {}
+    papers = {}
+    with METRICS.timer('bibtex_parse'):
+        for _, fields in parse_bibtex(response.text.splitlines()):
+            if not fields.get('url') or not fields.get('abstract'):
+                continue
+            papers[url_key(fields['url'])] = {
+                'title': clean_latex(fields.get('title', '')),
+                'abstract': clean_latex(fields['abstract']),
+                'year': fields.get('year'),
+                'url': fields['url'],
+            }
+    logging.info(f"Read {len(papers)} papers from {bibliography_url}.")
+    return papers
@@ -0,0 +1,229 @@
+# preprocess.py
+import concurrent.futures
+import hashlib
+import json
+import logging
+import os
+
+from .config import get_config
+from .metrics import METRICS
+
+##### Load configuration
+config = get_config()
+
+PREPROCESS = config.get('preprocess', {})
+MIN_TOKEN_LENGTH = PREPROCESS.get('min_token_length', 3)
+# Bumped whenever cleaning or tokenization changes, so cached matrices are rebuilt
+VERSION = 1
+
+def token_pattern(min_length=MIN_TOKEN_LENGTH):
+    """Words of letters only (no digits or punctuation) with at least `min_length` of them."""
+    return r"(?u)\b[^\W\d_]{%d,}\b" % min_length
+
+def count_terms(texts, min_length=MIN_TOKEN_LENGTH, stop_words='english'):
+    """
+    Lowercase, tokenize, drop stop words and count one chunk of documents.
+    Returns (vocabulary, sparse counts, whitespace tokens per document); runs in worker processes.
+    """
+    # Same counts as CountVectorizer, measured faster: stop words are dropped per distinct term, not per token
+    import re
+    from array import array
+    from collections import Counter, defaultdict
+    import scipy.sparse
+    from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+    pattern = re.compile(token_pattern(min_length))
+    stop = frozenset(ENGLISH_STOP_WORDS if stop_words == 'english' else stop_words or ())
+    # New terms get the next column index on first lookup
+    vocabulary = defaultdict()
+    vocabulary.default_factory = vocabulary.__len__
+    indptr, indices, data, tokens = array('q', [0]), array('q'), array('i'), array('q')
+    for text in texts:
+        tokens.append(len(text.split()))
+        counts = Counter(pattern.findall(text.lower()))
+        for term in stop.intersection(counts):
+            del counts[term]
+        indices.extend(map(vocabulary.__getitem__, counts))
+        data.extend(counts.values())
+        indptr.append(len(indices))
+    matrix = scipy.sparse.csr_matrix((data, indices, indptr), shape=(len(texts), len(vocabulary)), dtype='int32')
+    return list(vocabulary), matrix, tokens
+
+def fingerprint(keys, texts, settings):
+    """Hash of the corpus and the preprocessing settings, naming its cache files."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(json.dumps(settings, sort_keys=True).encode('utf-8'))
+    for key, text in zip(keys, texts):
+        digest.update(str(key).encode('utf-8', 'replace') + b'\0')
+        digest.update(text.encode('utf-8', 'replace') + b'\0')
+    return digest.hexdigest()
+
+class TermCounts:
+    """
+    Document-term counts of a corpus: a sparse (documents x terms) matrix,
+    its vocabulary and the document keys, plus per-document length statistics.
+
+    Built once by `preprocess` and cached as .npz/.json files, so exploratory
+    plots, most-common-word lists and c-TF-IDF topic representations all read
+    the same precomputed artifact.
+    """
+    def __init__(self, matrix, vocabulary, keys, lengths):
+        self.matrix = matrix
+        self.vocabulary = vocabulary
+        self.keys = keys
+        self.lengths = lengths
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    def stats(self):
+        """Per-document characters, whitespace tokens and kept tokens, as a DataFrame indexed by key."""
+        import pandas as pd
+        return pd.DataFrame(self.lengths, index=pd.Index(self.keys, name='key'))
+
+    def frequencies(self):
+        """Corpus-wide count of every term, most frequent first."""
+        import numpy as np
+        import pandas as pd
+        totals = np.asarray(self.matrix.sum(axis=0)).ravel()
+        return pd.Series(totals, index=self.vocabulary, name='count').sort_values(ascending=False, kind='stable')
+
+    def most_common(self, n=100):
+        """(term, count) pairs like `Counter.most_common`."""
+        return list(self.frequencies().head(n).items())
+
+    def document_frequencies(self):
+        import numpy as np
+        import pandas as pd
+        return pd.Series(np.diff(self.matrix.tocsc().indptr), index=self.vocabulary, name='documents')
+
+    def class_term_matrix(self, labels):
+        """Term counts summed per label (e.g. topic), as (sorted labels, sparse classes x terms)."""
+        import numpy as np
+        import scipy.sparse
+        classes, codes = np.unique(np.asarray(labels), return_inverse=True)
+        indicator = scipy.sparse.csr_matrix(
+            (np.ones(len(codes), dtype='int32'), (codes, np.arange(len(codes)))), shape=(len(classes), len(codes))
+        )
+        return classes, indicator @ self.matrix
+
+    def class_tfidf(self, labels):
+        """
+        c-TF-IDF per label, as used by BERTopic: the term frequency of each
+        class, L1-normalized, times log(1 + average words per class / term count).
+        """
+        import numpy as np
+        import scipy.sparse
+        from sklearn.preprocessing import normalize
+        classes, counts = self.class_term_matrix(labels)
+        counts = counts.astype('float64')
+        term_totals = np.asarray(counts.sum(axis=0)).ravel()
+        average = counts.sum() / max(len(classes), 1)
+        idf = np.log(1 + average / np.maximum(term_totals, 1))
+        return classes, normalize(counts, norm='l1', axis=1) @ scipy.sparse.diags(idf)
+
+    def top_terms(self, labels, n=10):
+        """The `n` highest c-TF-IDF terms of every label, as a dict."""
+        import numpy as np
+        classes, scores = self.class_tfidf(labels)
+        scores = scores.toarray()
+        vocabulary = np.asarray(self.vocabulary, dtype=object)
+        return {label: vocabulary[np.argsort(-row, kind='stable')[:n]].tolist() for label, row in zip(classes.tolist(), scores)}
+
+    def save(self, path):
+        import numpy as np
+        import scipy.sparse
+        scipy.sparse.save_npz(f"{path}.npz", self.matrix)
+        np.savez_compressed(f"{path}.lengths.npz", **self.lengths)
+        with open(f"{path}.json", 'w', encoding='utf-8') as f:
+            json.dump({'vocabulary': self.vocabulary, 'keys': self.keys}, f)
+
+    @classmethod
+    def load(cls, path):
+        import numpy as np
+        import scipy.sparse
+        with open(f"{path}.json", 'r', encoding='utf-8') as f:
+            names = json.load(f)
+        with np.load(f"{path}.lengths.npz") as lengths:
+            lengths = {name: lengths[name] for name in lengths.files}
+        return cls(scipy.sparse.load_npz(f"{path}.npz").tocsr(), names['vocabulary'], names['keys'], lengths)
+
+def merge_chunks(chunks):
+    """Stack per-chunk (vocabulary, counts) onto one sorted vocabulary."""
+    import numpy as np
+    import scipy.sparse
+    vocabulary = sorted(set().union(*(terms for terms, _, _ in chunks)))
+    column = {term: i for i, term in enumerate(vocabulary)}
+    blocks = []
+    for terms, counts, _ in chunks:
+        counts = counts.tocsr()
+        remap = np.array([column[term] for term in terms], dtype=np.int64)
+        indices = remap[counts.indices] if len(remap) else counts.indices
+        blocks.append(scipy.sparse.csr_matrix((counts.data, indices, counts.indptr), shape=(counts.shape[0], len(vocabulary))))
+    if not blocks:
+        return vocabulary, scipy.sparse.csr_matrix((0, 0), dtype='int32')
+    matrix = scipy.sparse.vstack(blocks, format='csr')
+    matrix.sort_indices()
+    return vocabulary, matrix
+
+def preprocess(texts, keys=None, cache_dir=None, processes=None, chunk_size=None,
+               min_length=MIN_TOKEN_LENGTH, stop_words='english'):
+    """
+    Clean, tokenize and count a corpus into a TermCounts.
+
+    Chunks of `chunk_size` documents are counted in `processes` worker
+    processes (in this process when 1) and stacked onto one vocabulary. With
+    `cache_dir`, the result is stored there under a hash of the corpus and
+    settings, and later calls on the same corpus load it instead.
+    """
+    import numpy as np
+    texts = ['' if not isinstance(text, str) else text for text in texts]
+    keys = list(range(len(texts))) if keys is None else list(keys)
+    processes = processes or PREPROCESS.get('processes') or os.cpu_count()
+    chunk_size = chunk_size or PREPROCESS.get('chunk_size', 2000)
+    settings = {'version': VERSION, 'min_length': min_length, 'stop_words': stop_words}
+
+    cache_path = None
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        cache_path = os.path.join(cache_dir, f"terms-{fingerprint(keys, texts, settings)}")
+        if os.path.exists(f"{cache_path}.json"):
+            logging.info(f"Loaded term counts of {len(texts)} documents from {cache_path}.")
+            return TermCounts.load(cache_path)
+
+    with METRICS.timer('preprocess'):
+        chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+        if processes > 1 and len(chunks) > 1:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=min(processes, len(chunks))) as executor:
+                counted = list(executor.map(count_terms, chunks, [min_length] * len(chunks), [stop_words] * len(chunks)))
+        else:
+            counted = [count_terms(chunk, min_length, stop_words) for chunk in chunks]
+        vocabulary, matrix = merge_chunks(counted)
+
+        lengths = {
+            'characters': np.fromiter(map(len, texts), dtype=np.int64, count=len(texts)),
+            'tokens': np.concatenate([np.frombuffer(tokens, dtype=np.int64) for _, _, tokens in counted]) if counted else np.zeros(0, dtype=np.int64),
+            'terms': np.asarray(matrix.sum(axis=1)).ravel().astype(np.int64) if len(texts) else np.zeros(0, dtype=np.int64),
+        }
+        result = TermCounts(matrix, vocabulary, keys, lengths)
+    logging.info(f"Counted {matrix.nnz} distinct document terms over {len(vocabulary)} terms in {len(texts)} documents.")
+    if cache_path:
+        result.save(cache_path)
+    return result
+
+def preprocess_store(store, column='Abstract', include_unmatched=False, **options):
+    """TermCounts of the titles or abstracts in a paper store, cached next to the store file."""
+    from .store import paper_key
+    df = store.to_dataframe(include_unmatched=include_unmatched)
+    df = df[df[column].notna()].astype(object)
+    df = df.where(df.notna(), None)
+    keys = [paper_key(paper) for paper in df.to_dict('records')]
+    cache_dir = os.path.join(os.path.dirname(store.path) or '.', 'preprocessed')
+    return preprocess(df[column].tolist(), keys, cache_dir=cache_dir, **options)
+
+def preprocess_fulltext(texts, **options):
+    """TermCounts of every harvested full text, cached inside the text store."""
+    keys, documents = [], []
+    for key, text in texts.iter_texts():
+        keys.append(key)
+        documents.append(text)
+    return preprocess(documents, keys, cache_dir=os.path.join(texts.path, 'preprocessed'), **options)
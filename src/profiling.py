@@ -0,0 +1,290 @@
+# profiling.py
+import atexit
+import datetime as dt
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+from .config import get_config
+from .metrics import METRICS
+
+##### Load configuration
+config = get_config()
+
+PROFILING = config.get('profiling', {})
+
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+def file_name(stage):
+    return re.sub(r'[^\w.-]+', '_', stage)
+
+class StageProfiler:
+    """
+    Sampling profiler whose samples are grouped by pipeline stage.
+
+    Stages are the `METRICS.timer` stages ('scholar_page', 'abstract_resolution',
+    'index_parse', 'paper_details', 'pdf_extract', 'llm_filter', 'excel_export',
+    ...). While attached, every timer tells the profiler which stages each
+    thread is in. A background thread wakes every `interval` seconds, reads the
+    stack of every thread that is inside a stage and adds the elapsed time to
+    that stack in each of its stages, so a stage's profile covers everything run
+    under it, nested stages included. Times are wall-clock, so waiting on the
+    network or a lock shows up as well as CPU work.
+
+    With `memory`, Python allocations are traced with tracemalloc. The traced
+    size is read at every sample to get each stage's peak, and a snapshot of the
+    largest allocation sites is kept from near that peak. Tracing allocations
+    slows allocation-heavy code (HTML parsing in particular) several times, which
+    also stretches those stages in the profiles.
+    """
+    def __init__(self, directory=None, interval=None, memory=None, tracemalloc_frames=None,
+                 snapshot_interval=None, top_allocations=None):
+        self.directory = directory or profile_directory()
+        self.interval = interval or PROFILING.get('interval', 0.01)
+        self.memory = PROFILING.get('memory', True) if memory is None else memory
+        self.tracemalloc_frames = tracemalloc_frames or PROFILING.get('tracemalloc_frames', 1)
+        self.snapshot_interval = PROFILING.get('snapshot_interval', 1.0) if snapshot_interval is None else snapshot_interval
+        self.snapshot_growth = PROFILING.get('snapshot_growth', 1.2)
+        self.top_allocations = top_allocations or PROFILING.get('top_allocations', 15)
+        # Thread id -> stages it is in; each list is only changed by its own thread
+        self._stages = {}
+        self._frames = []
+        self._frame_ids = {}
+        self.samples = defaultdict(Counter)
+        self.sample_counts = Counter()
+        self.peaks = {}
+        self.snapshots = {}
+        self._last_snapshot = 0.0
+        self.traced_peak = None
+        self._started_tracemalloc = False
+        self._stop = threading.Event()
+        self._thread = None
+        self.started_at = None
+
+    ##### Stage tracking (called by METRICS.timer)
+    def enter(self, stage):
+        ident = threading.get_ident()
+        stages = self._stages.get(ident)
+        if stages is None:
+            stages = self._stages[ident] = []
+        stages.append(stage)
+
+    def exit(self, stage):
+        stages = self._stages.get(threading.get_ident())
+        if stages and stages[-1] == stage:
+            stages.pop()
+        elif stages and stage in stages:
+            stages.remove(stage)
+
+    ##### Sampling
+    def frame_id(self, code):
+        """Index of a function in the shared frame table."""
+        index = self._frame_ids.get(code)
+        if index is None:
+            index = self._frame_ids[code] = len(self._frames)
+            self._frames.append({'name': code.co_name, 'file': code.co_filename, 'line': code.co_firstlineno})
+        return index
+
+    def stack(self, frame):
+        """Frame ids of a thread's stack, outermost call first."""
+        stack = []
+        while frame is not None:
+            stack.append(self.frame_id(frame.f_code))
+            frame = frame.f_back
+        stack.reverse()
+        return tuple(stack)
+
+    def sample(self, elapsed):
+        own = threading.get_ident()
+        active = set()
+        for ident, frame in sys._current_frames().items():
+            stages = self._stages.get(ident)
+            if ident == own or not stages:
+                continue
+            stack = self.stack(frame)
+            for stage in set(stages):
+                self.samples[stage][stack] += elapsed
+                self.sample_counts[stage] += 1
+                active.add(stage)
+        if self.memory and active and tracemalloc.is_tracing():
+            self.sample_memory(active)
+
+    def sample_memory(self, active):
+        traced = tracemalloc.get_traced_memory()[0]
+        rising = [stage for stage in active if traced > self.peaks.get(stage, 0)]
+        for stage in rising:
+            self.peaks[stage] = traced
+        # Snapshots copy every live trace, so one is only taken once a stage has
+        # grown well past its last one
+        stale = [stage for stage in rising
+                 if traced >= self.snapshots.get(stage, (0, None))[0] * self.snapshot_growth]
+        if stale and time.monotonic() - self._last_snapshot >= self.snapshot_interval:
+            # Grouping the traces is the slow part, so it waits until the report is written
+            snapshot = tracemalloc.take_snapshot()
+            self._last_snapshot = time.monotonic()
+            for stage in stale:
+                self.snapshots[stage] = (traced, snapshot)
+
+    def allocation_sites(self, snapshot):
+        """The largest allocation sites of a snapshot, by source line."""
+        statistics = snapshot.statistics('lineno')
+        sites = [
+            {'file': stat.traceback[0].filename, 'line': stat.traceback[0].lineno, 'bytes': stat.size, 'count': stat.count}
+            for stat in statistics[:self.top_allocations + 1]
+        ]
+        # Filtering the traces first would take longer than grouping them
+        return [site for site in sites if site['file'] != tracemalloc.__file__][:self.top_allocations]
+
+    def run(self):
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            try:
+                self.sample(now - last)
+            except Exception as e:
+                logging.error(f"Profiler sample failed: {e}")
+            last = now
+
+    ##### Start and stop
+    def start(self):
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start(self.tracemalloc_frames)
+            self._started_tracemalloc = True
+        self.started_at = dt.datetime.now()
+        METRICS.profiler = self
+        self._thread = threading.Thread(target=self.run, name='stage-profiler', daemon=True)
+        self._thread.start()
+        logging.info(f"Profiling stages every {self.interval * 1000:.0f} ms{' with tracemalloc' if self.memory else ''}.")
+        return self
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        if METRICS.profiler is self:
+            METRICS.profiler = None
+        self.traced_peak = tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else None
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+
+    def finish(self):
+        """Stop and write the profiles; later calls do nothing."""
+        if self._thread is None:
+            return None
+        self.stop()
+        return self.write()
+
+    ##### Output
+    def hot_functions(self, stage, top=10):
+        """Functions with the most time at the top of the stack (self time) in a stage."""
+        self_time = Counter()
+        for stack, seconds in self.samples[stage].items():
+            self_time[stack[-1]] += seconds
+        return [
+            {'function': self._frames[index]['name'], 'file': self._frames[index]['file'],
+             'line': self._frames[index]['line'], 'seconds': round(seconds, 4)}
+            for index, seconds in self_time.most_common(top)
+        ]
+
+    def speedscope(self, stage):
+        """A stage's samples in the speedscope file format."""
+        stacks = self.samples[stage]
+        total = sum(stacks.values())
+        return {
+            '$schema': SPEEDSCOPE_SCHEMA,
+            'name': stage,
+            'exporter': 'sci-scraper profiling.py',
+            'activeProfileIndex': 0,
+            'shared': {'frames': self._frames},
+            'profiles': [{
+                'type': 'sampled',
+                'name': stage,
+                'unit': 'seconds',
+                'startValue': 0,
+                'endValue': total,
+                'samples': [list(stack) for stack in stacks],
+                'weights': list(stacks.values()),
+            }],
+        }
+
+    def folded(self, stage):
+        """A stage's samples as folded stacks (flamegraph.pl input), weighted in milliseconds."""
+        lines = []
+        for stack, seconds in self.samples[stage].items():
+            names = [f"{self._frames[index]['name']} ({os.path.basename(self._frames[index]['file'])}:{self._frames[index]['line']})"
+                     for index in stack]
+            lines.append(f"{';'.join(name.replace(';', ',') for name in names)} {max(1, round(seconds * 1000))}")
+        return '\n'.join(lines) + '\n'
+
+    def report(self):
+        sites = {}
+        stages = {}
+        for stage in sorted(self.samples, key=lambda stage: -sum(self.samples[stage].values())):
+            traced, snapshot = self.snapshots.get(stage, (None, None))
+            if snapshot is not None and id(snapshot) not in sites:
+                sites[id(snapshot)] = self.allocation_sites(snapshot)
+            stages[stage] = {
+                'sampled_seconds': round(sum(self.samples[stage].values()), 4),
+                'samples': self.sample_counts[stage],
+                'peak_traced_bytes': self.peaks.get(stage),
+                'snapshot_traced_bytes': traced,
+                'hot_functions': self.hot_functions(stage),
+                'top_allocations': sites.get(id(snapshot), []),
+            }
+        return {
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'interval': self.interval,
+            'traced_peak_bytes': self.traced_peak,
+            'stages': stages,
+        }
+
+    def write(self, directory=None):
+        """Write one speedscope and one folded-stack file per stage, and profile_report.json."""
+        directory = directory or self.directory
+        os.makedirs(directory, exist_ok=True)
+        for stage in self.samples:
+            with open(os.path.join(directory, f"{file_name(stage)}.speedscope.json"), 'w') as f:
+                json.dump(self.speedscope(stage), f)
+            with open(os.path.join(directory, f"{file_name(stage)}.folded"), 'w') as f:
+                f.write(self.folded(stage))
+        report_file = os.path.join(directory, 'profile_report.json')
+        with open(report_file, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+        logging.info(f"Profiles of {len(self.samples)} stages saved to {directory}.")
+        return report_file
+
+def profile_directory(root=None):
+    """A fresh directory per profiled run, so earlier profiles are kept for comparison."""
+    root = root or PROFILING.get('path', "./results/profile")
+    return os.path.join(root, dt.datetime.now().strftime('%Y%m%d-%H%M%S'))
+
+def start_profiling(directory=None):
+    """Profile the rest of the run; the profiles are written by `finish()`, or at exit (also after Ctrl-C)."""
+    profiler = StageProfiler(directory).start()
+    atexit.register(profiler.finish)
+    return profiler
+
+@contextmanager
+def profiled(directory=None):
+    """
+    Profile the stages run inside the block. When a profiler is already
+    attached, the block is part of that profile instead, so callers that must
+    not share one (such as the web app's jobs) have to run one at a time.
+    """
+    if METRICS.profiler is not None:
+        yield METRICS.profiler
+        return
+    profiler = StageProfiler(directory).start()
+    try:
+        yield profiler
+    finally:
+        profiler.finish()
@@ -0,0 +1,95 @@
+# records.py
+import sys
+
+# Column order of every result file
+COLUMNS = ['Title', 'URL', 'Abstract', 'Source', 'Year']
+FIELDS = {'Title': 'title', 'URL': 'url', 'Abstract': 'abstract', 'Source': 'source', 'Year': 'year'}
+
+def to_year(value):
+    """Year as int, or None for missing or unparsable values ("N/A", NaN, ...)."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+class PaperRecord:
+    """
+    One paper, as produced by every scraper (Scholar hits and venue papers alike).
+
+    Slotted, with interned source names and an integer (or None) year, so long
+    lists of papers stay small. Column-style access (`record['Title']`,
+    `record.get('Abstract')`) works as it did for the dicts used before.
+    """
+    __slots__ = ('title', 'url', 'abstract', 'source', 'year')
+
+    def __init__(self, title, url=None, abstract=None, source=None, year=None):
+        self.title = title
+        self.url = url
+        self.abstract = abstract
+        self.source = sys.intern(source) if isinstance(source, str) else source
+        self.year = to_year(year)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get('Title'), data.get('URL'), data.get('Abstract'), data.get('Source'), data.get('Year'))
+
+    def to_dict(self):
+        return {column: getattr(self, field) for column, field in FIELDS.items()}
+
+    def __getitem__(self, column):
+        return getattr(self, FIELDS[column])
+
+    def get(self, column, default=None):
+        value = getattr(self, FIELDS[column], None) if column in FIELDS else None
+        return default if value is None else value
+
+    def __repr__(self):
+        return f"PaperRecord({self.title!r}, source={self.source!r}, year={self.year!r})"
+
+def as_record(paper):
+    """A PaperRecord for a record, a paper dict (e.g. from JSON) or None."""
+    if paper is None or isinstance(paper, PaperRecord):
+        return paper
+    return PaperRecord.from_dict(paper)
+
+def as_dict(paper):
+    """The column dict of a record (what JSON caches and payloads hold), None for None."""
+    return None if paper is None else paper.to_dict()
+
+def string_dtype():
+    """Arrow-backed strings when pyarrow is installed, pandas' own string dtype otherwise."""
+    try:
+        import pyarrow  # noqa: F401
+        return 'string[pyarrow]'
+    except ImportError:
+        return 'string'
+
+def to_frame(records):
+    """
+    Result DataFrame from PaperRecords with compact dtypes: strings for text,
+    a categorical Source and a nullable small-integer Year.
+    """
+    import pandas as pd
+    records = list(records)
+    strings = string_dtype()
+    return pd.DataFrame({
+        'Title': pd.array([r.title for r in records], dtype=strings),
+        'URL': pd.array([r.url for r in records], dtype=strings),
+        'Abstract': pd.array([r.abstract for r in records], dtype=strings),
+        'Source': pd.Categorical([r.source for r in records]),
+        'Year': pd.array([r.year for r in records], dtype='Int16'),
+    }, columns=COLUMNS)
+
+def typed_frame(df):
+    """The same compact dtypes for a result DataFrame built elsewhere (concat, read_excel, SQL)."""
+    import pandas as pd
+    df = df.copy()
+    strings = string_dtype()
+    for column in ('Title', 'URL', 'Abstract'):
+        if column in df.columns:
+            df[column] = df[column].astype(strings)
+    if 'Source' in df.columns:
+        df['Source'] = df['Source'].astype('category')
+    if 'Year' in df.columns:
+        df['Year'] = pd.to_numeric(df['Year'], errors='coerce').astype('Int16')
+    return df
@@ -0,0 +1,206 @@
+# resilience.py
+import threading
+import random
+import time
+import logging
+import json
+import os
+from urllib.parse import urlparse
+
+import requests
+
+from .config import get_config
+from .concurrency import throttled_get
+from .utils import parse_retry_after
+from .metrics import METRICS
+
+##### Load configuration
+config = get_config()
+
+RETRY = config.get('retry', {})
+MAX_RETRIES = RETRY.get('max_retries', 3)
+BASE_DELAY = RETRY.get('base_delay', 1.0)
+MAX_DELAY = RETRY.get('max_delay', 60.0)
+FAILURE_THRESHOLD = RETRY.get('failure_threshold', 5)
+RESET_TIMEOUT = RETRY.get('reset_timeout', 300)
+
+# Statuses worth another attempt; anything else is the final answer of the host
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class CircuitOpenError(requests.RequestException):
+    """Raised without sending a request when the breaker of a host is open."""
+
+##### Per-host circuit breaker
+class CircuitBreaker:
+    """
+    Fails fast for a host after `failure_threshold` consecutive failed requests.
+
+    Once open, requests are refused for `reset_timeout` seconds. After that a
+    single probe request is let through: success closes the breaker again,
+    failure re-opens it for another `reset_timeout`.
+    """
+    def __init__(self, host, failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+            if self.state == 'half_open' and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def release(self):
+        """Free the probe slot without judging the host."""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != 'closed':
+                logging.info(f"Circuit for {self.host} closed again.")
+            self.state = 'closed'
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                if self.state != 'open':
+                    logging.error(f"Circuit for {self.host} opened after {self.failures} failures. "
+                                  f"Skipping it for {self.reset_timeout} seconds.")
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+def get_breaker(host):
+    """Return the shared circuit breaker of `host`, creating it on first use."""
+    with _breakers_lock:
+        breaker = _breakers.get(host)
+        if breaker is None:
+            breaker = CircuitBreaker(host)
+            _breakers[host] = breaker
+    return breaker
+
+##### Skipped URLs, kept for a later retry pass
+_skipped = []
+_skipped_urls = set()
+_skipped_lock = threading.Lock()
+
+def record_skipped(url, reason):
+    with _skipped_lock:
+        _skipped.append({'url': url, 'host': urlparse(url).netloc.lower(), 'reason': reason})
+        _skipped_urls.add(url)
+
+def was_skipped(url):
+    """Whether `url` was given up on during this run."""
+    with _skipped_lock:
+        return url in _skipped_urls
+
+def save_skipped_urls(output_file="./results/skipped_urls.json"):
+    """Write the URLs given up on during this run, merged with earlier runs."""
+    with _skipped_lock:
+        if not _skipped:
+            return
+        skipped = list(_skipped)
+    if os.path.exists(output_file):
+        with open(output_file, 'r') as f:
+            previous = json.load(f)
+    else:
+        previous = []
+    known = {entry['url'] for entry in skipped}
+    merged = [entry for entry in previous if entry['url'] not in known] + skipped
+    with open(output_file, 'w') as f:
+        json.dump(merged, f, indent=2)
+    logging.info(f"{len(skipped)} skipped URLs saved to {output_file}.")
+
+##### Retry helpers
+def backoff_delay(attempt, retry_after=None, base_delay=BASE_DELAY):
+    """Full-jitter exponential backoff, or Retry-After plus a little jitter."""
+    if retry_after is not None:
+        return min(MAX_DELAY, retry_after) + random.uniform(0, base_delay)
+    return random.uniform(0, min(MAX_DELAY, base_delay * (2 ** attempt)))
+
+def is_retryable(error):
+    """Connection problems, timeouts and 429/5xx answers are worth retrying."""
+    if isinstance(error, CircuitOpenError):
+        return False
+    if isinstance(error, (requests.ConnectionError, requests.Timeout, TimeoutError)):
+        return True
+    response = getattr(error, 'response', None)
+    return response is not None and response.status_code in RETRY_STATUSES
+
+def call_with_retry(func, host, max_retries=MAX_RETRIES, base_delay=BASE_DELAY):
+    """
+    Call `func` with jittered retries, guarded by the circuit breaker of `host`.
+
+    Non-retryable errors are raised immediately and do not count against the
+    host. Once retries are exhausted the failure is recorded on the breaker and
+    the last error is raised.
+    """
+    breaker = get_breaker(host)
+    if not breaker.allow():
+        METRICS.incr('circuit_open_skips', host)
+        raise CircuitOpenError(f"Circuit for {host} is open")
+
+    for attempt in range(max_retries + 1):
+        try:
+            result = func()
+        except Exception as e:
+            if not is_retryable(e):
+                # The host answered (or was never reached), so this says nothing about its health
+                breaker.release()
+                raise
+            error = e
+        else:
+            breaker.record_success()
+            return result
+
+        if attempt < max_retries:
+            response = getattr(error, 'response', None)
+            retry_after = parse_retry_after(response.headers.get('Retry-After')) if response is not None else None
+            delay = backoff_delay(attempt, retry_after, base_delay)
+            logging.warning(f"Request to {host} failed ({error}). Retry {attempt + 1}/{max_retries} in {delay:.1f} seconds.")
+            METRICS.incr('retries', host)
+            METRICS.sleep(delay, host)
+
+    METRICS.incr('failures', host)
+    breaker.record_failure()
+    raise error
+
+def resilient_get(url, max_retries=MAX_RETRIES, base_delay=BASE_DELAY, **kwargs):
+    """
+    GET `url` with retries and per-host circuit breaking.
+
+    Returns the response for any non-retryable status (callers still decide
+    what to do with a 404). Raises a `requests.RequestException` once the URL is
+    given up on, after recording it in the skipped list.
+    """
+    host = urlparse(url).netloc.lower()
+
+    def attempt():
+        response = throttled_get(url, **kwargs)
+        if response.status_code in RETRY_STATUSES:
+            raise requests.HTTPError(f"{response.status_code} for {url}", response=response)
+        return response
+
+    try:
+        return call_with_retry(attempt, host, max_retries, base_delay)
+    except requests.RequestException as e:
+        if is_retryable(e) or isinstance(e, CircuitOpenError):
+            record_skipped(url, str(e))
+        raise
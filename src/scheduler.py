@@ -0,0 +1,310 @@
+# scheduler.py
+import concurrent.futures
+import json
+import logging
+import os
+import signal
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+from .config import get_config
+from .concurrency import MAX_WORKERS
+from .distributed import CrawlWorker, Heartbeat, TaskInterrupted, TASK_SCHOLAR_PAGES, TASK_ABSTRACTS, TASK_VENUE_YEAR, merge_results
+from .keyword_filter import KeywordFilter
+from .metrics import METRICS
+from .resilience import save_skipped_urls
+from .venues import YEAR_COST
+
+##### Load configuration
+config = get_config()
+
+SCHEDULER = config.get('scheduler', {})
+# Optimistic prior for sources without history: this many relevant papers per this many requests
+PRIOR_RELEVANT = SCHEDULER.get('prior_relevant', 1.0)
+PRIOR_REQUESTS = SCHEDULER.get('prior_requests', 20.0)
+# Conservative duration of a task from a source without history
+PRIOR_SECONDS = SCHEDULER.get('prior_seconds', YEAR_COST)
+# Abstract batches finish Scholar hits already paid for, so they always go first
+FINISHING_PRIORITY = 1e6
+
+def host_of(kind, payload, venues):
+    """The host a task's first requests go to, before history knows better (None when unknown)."""
+    if kind == TASK_SCHOLAR_PAGES:
+        return 'scholar.google.com'
+    if kind == TASK_VENUE_YEAR and payload.get('venue') in venues:
+        return urlparse(venues[payload['venue']]['base_url']).netloc.lower()
+    return None
+
+def task_source(kind, payload):
+    """What a task's yield is learned under: 'Scholar', 'Scholar abstracts' or the venue name."""
+    if kind == TASK_SCHOLAR_PAGES:
+        return 'Scholar'
+    if kind == TASK_ABSTRACTS:
+        return 'Scholar abstracts'
+    return payload.get('venue', kind)
+
+class CrawlHistory:
+    """
+    Per-source statistics of earlier crawl tasks, kept in a SQLite file:
+    how long a task takes, how many requests it makes to each host, and how
+    many papers and keyword-matching papers it finds.
+
+    Scholar hits can only be keyword-matched once their abstracts are known, so
+    the requests and matches of abstract batches are credited to 'Scholar'
+    (see `credit`). Yields of all sources then count the same thing: keyword
+    matches per request spent on finding them.
+    """
+    def __init__(self, path=None):
+        self.path = path or SCHEDULER.get('history_path', './results/crawl_history.sqlite')
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self.connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sources (
+                    source TEXT PRIMARY KEY,
+                    tasks INTEGER NOT NULL DEFAULT 0,
+                    seconds REAL NOT NULL DEFAULT 0,
+                    requests REAL NOT NULL DEFAULT 0,
+                    papers REAL NOT NULL DEFAULT 0,
+                    relevant REAL NOT NULL DEFAULT 0
+                )""")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS host_requests (
+                    source TEXT NOT NULL,
+                    host TEXT NOT NULL,
+                    requests REAL NOT NULL DEFAULT 0,
+                    PRIMARY KEY (source, host)
+                )""")
+
+    @contextmanager
+    def connect(self):
+        conn = sqlite3.connect(self.path, timeout=60)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def record(self, source, seconds, host_requests, papers, relevant):
+        with self.connect() as conn:
+            conn.execute(
+                """INSERT INTO sources (source, tasks, seconds, requests, papers, relevant) VALUES (?, 1, ?, ?, ?, ?)
+                   ON CONFLICT(source) DO UPDATE SET
+                       tasks = tasks + 1, seconds = seconds + excluded.seconds, requests = requests + excluded.requests,
+                       papers = papers + excluded.papers, relevant = relevant + excluded.relevant""",
+                (source, seconds, sum(host_requests.values()), papers, relevant)
+            )
+            conn.executemany(
+                """INSERT INTO host_requests (source, host, requests) VALUES (?, ?, ?)
+                   ON CONFLICT(source, host) DO UPDATE SET requests = requests + excluded.requests""",
+                [(source, host, count) for host, count in host_requests.items()]
+            )
+
+    def credit(self, source, requests, relevant):
+        """Add requests and keyword matches to a source's yield without counting a task."""
+        with self.connect() as conn:
+            conn.execute(
+                """INSERT INTO sources (source, requests, relevant) VALUES (?, ?, ?)
+                   ON CONFLICT(source) DO UPDATE SET
+                       requests = requests + excluded.requests, relevant = relevant + excluded.relevant""",
+                (source, requests, relevant)
+            )
+
+    def estimates(self):
+        """
+        Per-source expectations for one task: 'seconds', 'hosts' (requests per
+        host) and 'yield' (relevant papers per request, smoothed towards the prior).
+        """
+        with self.connect() as conn:
+            sources = conn.execute("SELECT source, tasks, seconds, requests, relevant FROM sources").fetchall()
+            hosts = conn.execute("SELECT source, host, requests FROM host_requests").fetchall()
+        tasks = {source: count for source, count, *_ in sources}
+        estimates = {
+            source: {
+                'seconds': seconds / count if count else PRIOR_SECONDS,
+                'hosts': {},
+                'yield': (relevant + PRIOR_RELEVANT) / (requests + PRIOR_REQUESTS),
+            }
+            for source, count, seconds, requests, relevant in sources
+        }
+        for source, host, requests in hosts:
+            if source in estimates:
+                estimates[source]['hosts'][host] = requests / tasks[source]
+        return estimates
+
+class ScheduledCrawl(CrawlWorker):
+    """
+    Works through a planned crawl queue within a wall-clock deadline and
+    per-host request budgets.
+
+    Tasks are ordered by expected yield (relevant papers per request, learned
+    from earlier runs in `CrawlHistory`). A task is only started if its
+    expected duration fits before the deadline and its expected requests fit
+    the remaining budget of every host it uses (sources without history are
+    assumed to take `PRIOR_SECONDS`). When nothing more fits, the run stops
+    after the current task; at the deadline or on SIGINT/SIGTERM the current
+    task is interrupted at its next page and returned to the queue. Either way
+    the papers found so far are written as a result file and the rest stays
+    pending in the queue, so running again with the same queue resumes the crawl.
+    """
+    def __init__(self, queue, store, deadline=None, budgets=None, history=None, safety_factor=None, **kwargs):
+        super().__init__(queue, store, **kwargs)
+        self.deadline = deadline
+        self.budgets = dict(budgets or {})
+        self.history = history if history is not None else CrawlHistory()
+        self.safety_factor = safety_factor or SCHEDULER.get('safety_factor', 1.25)
+        self.stop_reason = None
+        self.skipped = {}
+        self._stop = threading.Event()
+        self.keyword_filter = KeywordFilter()
+
+    def interrupted(self):
+        return self._stop.is_set() or (self.deadline is not None and time.time() > self.deadline)
+
+    def stop(self, *_):
+        """Interrupt the current task at its next page, then flush (also the SIGINT/SIGTERM handler)."""
+        if not self._stop.is_set():
+            logging.warning("Stop requested; returning the current task to the queue.")
+        self.stop_reason = self.stop_reason or 'stopped'
+        self._stop.set()
+
+    def priority(self, kind, payload, estimates):
+        if kind == TASK_ABSTRACTS:
+            return FINISHING_PRIORITY
+        expected = estimates.get(task_source(kind, payload), {}).get('yield', PRIOR_RELEVANT / PRIOR_REQUESTS)
+        # Ties: earlier Scholar pages and more recent venue years first
+        if kind == TASK_SCHOLAR_PAGES:
+            return expected - payload.get('start', 0) * 1e-9
+        return expected + payload.get('year', 0) * 1e-9
+
+    def blocker(self, kind, payload, estimates, used):
+        """Why a task cannot be started now ('deadline' or 'budget:<host>'), or None."""
+        # Nothing known yet: assume a long task, so a first measurement does not overrun the deadline
+        estimate = estimates.get(task_source(kind, payload), {'seconds': PRIOR_SECONDS, 'hosts': {}})
+        if self.deadline is not None and time.time() + estimate['seconds'] * self.safety_factor > self.deadline:
+            return 'deadline'
+        hosts = dict(estimate['hosts'])
+        if not hosts and host_of(kind, payload, self.venues):
+            hosts[host_of(kind, payload, self.venues)] = 0
+        for host, expected in hosts.items():
+            budget = self.budgets.get(host)
+            if budget is None:
+                continue
+            spent = used.get(host, 0)
+            if spent >= budget or spent + expected * self.safety_factor > budget:
+                return f"budget:{host}"
+        return None
+
+    def next_task(self, estimates):
+        """Claim the best task that fits the deadline and budgets, reprioritizing the queue on the way."""
+        candidates = self.queue.claimable()
+        priorities = {task_id: self.priority(kind, payload, estimates) for task_id, kind, payload in candidates}
+        self.queue.set_priorities(priorities)
+        used = METRICS.by_source('requests')
+        self.skipped = {}
+        for task_id, kind, payload in sorted(candidates, key=lambda task: -priorities[task[0]]):
+            reason = self.blocker(kind, payload, estimates, used)
+            if reason:
+                self.skipped[reason] = self.skipped.get(reason, 0) + 1
+                continue
+            task = self.queue.claim(self.owner, self.lease_seconds, task_id)
+            if task is not None:
+                return task
+        return None
+
+    def run_task(self, task, executor):
+        """Run one claimed task and record what it cost and found in the crawl history."""
+        task_id, kind, payload = task
+        requests_before = METRICS.by_source('requests')
+        papers_before = sum(METRICS.by_source('papers').values())
+        started = time.monotonic()
+        with Heartbeat(self.queue, task_id, self.owner, self.lease_seconds):
+            try:
+                found = self.handle(kind, payload, executor)
+            except TaskInterrupted as e:
+                logging.warning(f"Task {task_id} ({kind} {payload}) interrupted and returned to the queue: {e}")
+                self.queue.release(task_id, self.owner)
+                if not self._stop.is_set():
+                    self.stop_reason = self.stop_reason or 'deadline'
+                    self._stop.set()
+                return
+            except Exception as e:
+                logging.error(f"Task {task_id} ({kind} {payload}) failed: {e}")
+                self.queue.fail(task_id, self.owner, e)
+                return
+            self.queue.complete(task_id, self.owner)
+        requests_after = METRICS.by_source('requests')
+        host_requests = {host: count - requests_before.get(host, 0) for host, count in requests_after.items()
+                         if count > requests_before.get(host, 0)}
+        papers = sum(METRICS.by_source('papers').values()) - papers_before
+        seconds = time.monotonic() - started
+        if kind == TASK_ABSTRACTS:
+            # The hits' keyword matches, and the requests spent resolving them, count towards Scholar's yield
+            self.history.record(task_source(kind, payload), seconds, host_requests, papers, 0)
+            self.history.credit(task_source(TASK_SCHOLAR_PAGES, payload), sum(host_requests.values()), self.keyword_matches(found))
+        elif kind == TASK_SCHOLAR_PAGES:
+            # Hits without abstracts cannot be judged yet; their matches are credited by the abstract batches
+            self.history.record(task_source(kind, payload), seconds, host_requests, papers, 0)
+        else:
+            self.history.record(task_source(kind, payload), seconds, host_requests, papers, self.keyword_matches(found))
+
+    def keyword_matches(self, papers):
+        """How many of `papers` match the keywords on title and abstract."""
+        return sum(self.keyword_filter.matches(paper.get('Title') or '', paper.get('Abstract') or '') for paper in papers or [])
+
+    def run(self):
+        """
+        Work until the deadline, a budget or a stop signal leaves nothing
+        startable, or the queue is drained. Returns the merged partial result.
+        """
+        processed = 0
+        handlers = {}
+        if threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                handlers[signum] = signal.signal(signum, self.stop)
+        logging.info(f"Scheduled crawl {self.owner} started. Queue status: {self.queue.counts()}")
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+                while not self._stop.is_set():
+                    task = self.next_task(self.history.estimates())
+                    if task is None:
+                        if self.queue.is_drained():
+                            self.stop_reason = 'drained'
+                        elif self.skipped:
+                            self.stop_reason = 'deadline' if 'deadline' in self.skipped else 'budget'
+                        else:
+                            # Only tasks leased to other workers are left
+                            time.sleep(self.poll_interval)
+                            continue
+                        break
+                    self.run_task(task, executor)
+                    processed += 1
+        finally:
+            for signum, handler in handlers.items():
+                signal.signal(signum, handler)
+        logging.info(f"Scheduled crawl stopped ({self.stop_reason}) after {processed} tasks.")
+        return self.flush()
+
+    def flush(self, output_file="./results/all_results.xlsx", report_file="./results/schedule_report.json"):
+        """Write the papers found so far and a report of what stopped the run and what is left."""
+        save_skipped_urls()
+        df = merge_results(self.store, output_file)
+        used = METRICS.by_source('requests')
+        report = {
+            'stop_reason': self.stop_reason,
+            'deadline': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.deadline)) if self.deadline else None,
+            'papers': len(df),
+            'queue': self.queue.counts(),
+            'skipped_tasks': self.skipped,
+            'requests': {host: {'used': used.get(host, 0), 'budget': self.budgets.get(host)}
+                         for host in sorted(set(used) | set(self.budgets))},
+        }
+        with open(report_file, 'w') as f:
+            json.dump(report, f, indent=2)
+        logging.info(f"Schedule report saved to {report_file}. Queue status: {report['queue']}")
+        return df
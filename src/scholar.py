@@ -1,34 +1,137 @@
 # scholar_scraper.py
 import requests
-import time
+import threading
+import concurrent.futures
 from bs4 import BeautifulSoup
 from tqdm import tqdm
-import pandas as pd
 import logging
-import os
-import json
+import re
 
 from .scholar_scrapers import (
     IeeeScraper, SpringerScraper, MlrScraper, ArxivScraper,
     NeuripsScraper, MdpiScraper, ScienceDirectScraper, ACMScraper,
     AAAIScraper, JAIRScraper, JMLRScraper, IJCAIScraper
 )
+from .config import get_config
 from .utils import detect_source, extract_year
+from .concurrency import MAX_WORKERS
+from .metrics import METRICS
+from .resilience import resilient_get, save_skipped_urls
+from .records import PaperRecord, to_frame
+from .frontier import get_frontier, canonicalize_url
 
 ##### Load configuration
-current_dir = os.path.dirname(os.path.realpath(__file__))
-config_file = os.path.join(current_dir, 'config.json')
-with open(config_file, 'r') as f:
-    config = json.load(f)
-    
+config = get_config()
+
 NUM_PAGES = config['num_pages']
 SCHOLAR_QUERY = config['scholar_query']
+START_YEAR = config['start_year']
+END_YEAR = config['end_year']
+SHARDING = config.get('scholar_sharding', {})
+BASE_URL = "https://scholar.google.com/scholar"
+
+##### Query sharding
+# Scholar stops serving results after about 100 pages per query, so a broad query
+# is split into narrower ones: by year window (as_ylo/as_yhi) and by sub-clause.
+QUERY_TOKEN = re.compile(r"""\(|\)|'[^']*'|"[^"]*"|[^\s()]+""")
+
+def parse_query(query):
+    """
+    Parse a Scholar boolean query into ('term', text), ('and', [...]) or ('or', [...]) nodes.
+
+    Like Scholar, OR binds tighter than AND, and adjacent terms are ANDed.
+    """
+    tokens = QUERY_TOKEN.findall(query)
+    position = 0
+
+    def peek():
+        return tokens[position] if position < len(tokens) else None
+
+    def parse_and():
+        nonlocal position
+        children = [parse_or()]
+        while peek() not in (None, ')'):
+            if peek() == 'AND':
+                position += 1
+            children.append(parse_or())
+        return children[0] if len(children) == 1 else ('and', children)
+
+    def parse_or():
+        nonlocal position
+        children = [parse_atom()]
+        while peek() == 'OR':
+            position += 1
+            children.append(parse_atom())
+        return children[0] if len(children) == 1 else ('or', children)
+
+    def parse_atom():
+        nonlocal position
+        token = peek()
+        if token is None:
+            raise ValueError(f"Unexpected end of query: {query}")
+        position += 1
+        if token == '(':
+            node = parse_and()
+            if peek() == ')':
+                position += 1
+            return node
+        return ('term', token)
+
+    node = parse_and()
+    if position < len(tokens):
+        raise ValueError(f"Unbalanced parentheses in query: {query}")
+    return node
+
+def render_query(node, nested=False):
+    kind, value = node
+    if kind == 'term':
+        return value
+    text = f" {kind.upper()} ".join(render_query(child, nested=True) for child in value)
+    return f"({text})" if nested else text
+
+def split_node(node):
+    """Alternatives whose union is `node`: the branches of an OR, or an AND distributed over its widest OR."""
+    kind, value = node
+    if kind == 'or':
+        return value
+    if kind == 'and':
+        widest = max(range(len(value)), key=lambda i: len(value[i][1]) if value[i][0] == 'or' else 0)
+        if value[widest][0] == 'or':
+            return [('and', value[:widest] + [alternative] + value[widest + 1:]) for alternative in value[widest][1]]
+    return [node]
+
+def split_query(query, max_subqueries=SHARDING.get('max_subqueries', 12)):
+    """
+    Split `query` into at most `max_subqueries` queries whose results together cover it.
+
+    The widest OR-group is split first, for as long as the total stays within the limit.
+    """
+    shards = [parse_query(query)]
+    while True:
+        candidates = [(len(split_node(shard)), i) for i, shard in enumerate(shards)]
+        candidates = [(width, i) for width, i in candidates if width > 1 and len(shards) - 1 + width <= max_subqueries]
+        if not candidates:
+            break
+        _, i = max(candidates)
+        shards[i:i + 1] = split_node(shards[i])
+    return [render_query(shard) for shard in shards]
+
+def year_windows(start_year=START_YEAR, end_year=END_YEAR, window=SHARDING.get('year_window', 1)):
+    """Consecutive (as_ylo, as_yhi) ranges covering start_year..end_year."""
+    return [(year, min(end_year, year + window - 1)) for year in range(start_year, end_year + 1, window)]
+
+def scholar_shards(query=SCHOLAR_QUERY):
+    """Every (sub-query, year window) pair the sharded mode runs."""
+    return [(subquery, window) for subquery in split_query(query) for window in year_windows()]
 
 ##### Main class
 class ScholarScraper:
-    def __init__(self, query = SCHOLAR_QUERY, num_pages = NUM_PAGES):
+    def __init__(self, query = SCHOLAR_QUERY, num_pages = NUM_PAGES, frontier = None, sharded = SHARDING.get('enabled', False)):
         self.query = query
         self.num_pages = num_pages
+        self.sharded = sharded
+        # Seen-set of paper URLs, so a paper is fetched once across pages, queries and runs
+        self.frontier = frontier if frontier is not None else get_frontier()
         self.scrapers = {
             'IEEE': IeeeScraper(),
             'Springer': SpringerScraper(),
@@ -43,56 +146,161 @@ class ScholarScraper:
             'IJCAI': IJCAIScraper(),
             'arXiv': ArxivScraper()
         }
+        self._last_check = None  # for ScienceDirect rate-limiting
+        self._sciencedirect_lock = threading.Lock()
 
-    def scrape(self, callback=None):
-        base_url = "https://scholar.google.com/scholar"
-        results = []
-        last_check = None  # for ScienceDirect rate-limiting
-        logging.info(f"=== Scraping Google Scholar for query: {self.query} ===")
-        for page in tqdm(range(self.num_pages), desc='Scholar pages processed', unit='page'):
-            params = {'q': self.query, 'start': page * 10, 'hl': 'en'}
-            response = requests.get(base_url, params=params)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            articles = soup.find_all('div', class_='gs_ri')
+    def resolve_abstract(self, source, link):
+        """Abstract of one Scholar hit, fetched only if the URL frontier has not seen it yet."""
+        if source not in self.scrapers:
+            METRICS.incr('unsupported_source', source)
+            return None
+        if self.frontier is None:
+            return self.fetch_abstract(source, link)
+        return self.frontier.resolve_abstract(link, lambda: self.fetch_abstract(source, link))
+
+    def fetch_abstract(self, source, link):
+        """Fetch the abstract of one Scholar hit with the scraper for its source."""
+        scraper = self.scrapers[source]
+        with METRICS.timer('abstract_resolution', source):
+            if source == 'ScienceDirect' and isinstance(scraper, ScienceDirectScraper):
+                # ScienceDirect keeps its own fixed pacing, so its requests stay serialized
+                with self._sciencedirect_lock:
+                    abstract, self._last_check = scraper.get_abstract(link, self._last_check)
+                return abstract
+            return scraper.get_abstract(link)
+
+    def fetch_page(self, page, query=None, year_range=None):
+        """
+        Fetch one Scholar result page and return its hits as PaperRecords without abstracts.
+
+        `query` defaults to the scraper's query; `year_range` is an optional
+        (first, last) year filter. Returns None if the page could not be fetched.
+        """
+        with METRICS.timer('scholar_page', 'Scholar'):
+            params = {'q': query or self.query, 'start': page * 10, 'hl': 'en'}
+            if year_range:
+                params['as_ylo'], params['as_yhi'] = year_range
+            try:
+                response = resilient_get(BASE_URL, params=params)
+            except requests.RequestException as e:
+                logging.error(f"Failed to fetch Scholar page {page + 1}: {e}")
+                return None
+            with METRICS.timer('scholar_parse', 'Scholar'):
+                soup = BeautifulSoup(response.text, 'html.parser')
+                articles = soup.find_all('div', class_='gs_ri')
+            hits = []
             for article in articles:
                 title_elem = article.find('h3', class_='gs_rt')
                 title = title_elem.text if title_elem else 'No title'
                 link_elem = title_elem.find('a') if title_elem else None
                 link = link_elem['href'] if link_elem else 'No link'
                 citation = article.find('div', class_='gs_a')
-                
-                # Detect the source and retrieve abstract
+
+                # Detect the source; the abstract is resolved separately
                 source = detect_source(link)
                 # if source == 'arXiv':
                 #     continue # Skip arXiv papers
-                abstract = None
-                if source in self.scrapers:
-                    scraper = self.scrapers[source]
-                    if source == 'ScienceDirect' and isinstance(scraper, ScienceDirectScraper):
-                        abstract, last_check = scraper.get_abstract(link, last_check)
-                    else:
-                        abstract = scraper.get_abstract(link)
-                        
-                paper_data = {
-                    'Title': title,
-                    'URL': link,
-                    'Abstract': abstract,
-                    'Source': source,
-                    'Year': extract_year(citation.text) if citation else None
-                }
+                hits.append(PaperRecord(
+                    title=title,
+                    url=link,
+                    source=source,
+                    year=extract_year(citation.text) if citation else None
+                ))
+            return hits
+
+    def scrape_pages(self, executor, query=None, year_range=None, callback=None, progress=None, seen=None):
+        """
+        Page through one query until `num_pages` or the first page without results.
+
+        Hits whose canonical URL (or title, without a link) is already in `seen`
+        are dropped, so shards of one query do not return the same paper twice.
+        """
+        results = []
+        for page in range(self.num_pages):
+            hits = self.fetch_page(page, query, year_range)
+            if progress is not None:
+                progress.update(1)
+            if hits is None:
+                continue
+            if not hits:
+                # No gs_ri results: the query is exhausted
+                break
+            if seen is not None:
+                hits = [hit for hit in hits if seen.add(hit_key(hit))]
+
+            # Abstracts of one result page are resolved concurrently; the adaptive
+            # limiter of each publisher decides how many of them actually run at once
+            abstracts = executor.map(lambda hit: self.resolve_abstract(hit.source, hit.url), hits)
+            for paper_data, abstract in zip(hits, abstracts):
+                paper_data.abstract = abstract
                 results.append(paper_data)
-                
-                logging.info(f"Processed article: {title[:50]}... | Source: {source} | Abstract found: {'Yes' if abstract else 'No'}")
-                
-                time.sleep(2)  # Delay to avoid blocking
+                METRICS.incr('papers', 'Scholar')
+
+                logging.info(f"Processed article: {paper_data.title[:50]}... | Source: {paper_data.source} | Abstract found: {'Yes' if abstract else 'No'}")
+
                 # Update progress
                 if callback:
-                    callback(page, self.num_pages, paper_data)
+                    callback(page, self.num_pages, paper_data.to_dict())
+
+            METRICS.sleep(2, 'scholar.google.com')  # Delay between Scholar pages to avoid blocking
+        return results
+
+    def scrape_sharded(self, executor, callback=None):
+        """Run every (sub-query, year window) shard concurrently and merge them without duplicates."""
+        shards = scholar_shards(self.query)
+        logging.info(f"Scholar query split into {len(shards)} shards.")
+        seen = SeenSet()
+        results = []
+        with tqdm(total=len(shards) * self.num_pages, desc='Scholar pages processed', unit='page') as progress, \
+                concurrent.futures.ThreadPoolExecutor(max_workers=SHARDING.get('max_shards_in_flight', 4)) as shard_executor:
+            futures = {
+                shard_executor.submit(self.scrape_pages, executor, subquery, window, callback, progress, seen): (subquery, window)
+                for subquery, window in shards
+            }
+            for future in concurrent.futures.as_completed(futures):
+                subquery, window = futures[future]
+                try:
+                    shard_results = future.result()
+                except Exception as e:
+                    logging.error(f"Scholar shard {window} '{subquery[:50]}...' failed: {e}")
+                    continue
+                METRICS.incr('shard_papers', f"{window[0]}-{window[1]}", len(shard_results))
+                results.extend(shard_results)
+        return results
+
+    def scrape(self, callback=None):
+        logging.info(f"=== Scraping Google Scholar for query: {self.query} ===")
+        with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            if self.sharded:
+                results = self.scrape_sharded(executor, callback)
+            else:
+                with tqdm(total=self.num_pages, desc='Scholar pages processed', unit='page') as progress:
+                    results = self.scrape_pages(executor, callback=callback, progress=progress)
         
         # convert to dataframe
-        df = pd.DataFrame(results, columns=['Title', 'URL', 'Abstract', 'Source', 'Year'])
+        df = to_frame(results)
         # save to excel
         output_file = "./results/scholar_results.xlsx"
-        df.to_excel(output_file, index=False)
+        with METRICS.timer('excel_export'):
+            df.to_excel(output_file, index=False)
         logging.info(f"Scraping completed. {len(df)} papers saved to {output_file}.")
+        save_skipped_urls()
         return df
+
+class SeenSet:
+    """Thread-safe set whose `add` tells whether the key was new."""
+    def __init__(self):
+        self._keys = set()
+        self._lock = threading.Lock()
+
+    def add(self, key):
+        with self._lock:
+            if key in self._keys:
+                return False
+            self._keys.add(key)
+            return True
+
+def hit_key(hit):
+    if hit.url and hit.url != 'No link':
+        return canonicalize_url(hit.url)
+    return ' '.join(hit.title.lower().split())
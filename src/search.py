@@ -0,0 +1,106 @@
+# search.py
+import re
+import sqlite3
+import logging
+
+from .store import PaperStore
+from .metrics import METRICS
+
+# Title matches count twice as much as abstract matches in BM25
+TITLE_WEIGHT = 2.0
+ABSTRACT_WEIGHT = 1.0
+
+QUERY_TERM = re.compile(r'"[^"]+"|\w+')
+
+def to_match_expression(query):
+    """
+    Turn free text into an FTS5 MATCH expression.
+
+    Words are ORed (BM25 ranks papers matching more of them higher) and
+    "quoted phrases" are kept as phrases. FTS5 operators typed by the user are
+    treated as plain words, so any input is a valid query.
+    """
+    terms = []
+    for term in QUERY_TERM.findall(query):
+        words = re.findall(r'\w+', term)
+        if words:
+            terms.append('"' + ' '.join(words) + '"')
+    return ' OR '.join(terms)
+
+class SearchIndex:
+    """
+    Full-text BM25 search over titles and abstracts of the paper store.
+
+    The inverted index is an FTS5 table in the store's SQLite file. Triggers
+    on the papers table keep it up to date, so every process that adds papers
+    through `PaperStore` updates the index incrementally, whether or not it
+    uses this class.
+    """
+    def __init__(self, store=None):
+        self.store = store if store is not None else PaperStore()
+        with self.store.connect() as conn:
+            exists = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'papers_fts'").fetchone()
+            conn.executescript("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5(
+                    title, abstract, content='papers', tokenize='porter unicode61'
+                );
+                CREATE TRIGGER IF NOT EXISTS papers_fts_insert AFTER INSERT ON papers BEGIN
+                    INSERT INTO papers_fts (rowid, title, abstract) VALUES (new.rowid, new.title, new.abstract);
+                END;
+                CREATE TRIGGER IF NOT EXISTS papers_fts_delete AFTER DELETE ON papers BEGIN
+                    INSERT INTO papers_fts (papers_fts, rowid, title, abstract) VALUES ('delete', old.rowid, old.title, old.abstract);
+                END;
+                CREATE TRIGGER IF NOT EXISTS papers_fts_update AFTER UPDATE ON papers BEGIN
+                    INSERT INTO papers_fts (papers_fts, rowid, title, abstract) VALUES ('delete', old.rowid, old.title, old.abstract);
+                    INSERT INTO papers_fts (rowid, title, abstract) VALUES (new.rowid, new.title, new.abstract);
+                END;
+            """)
+            if not exists:
+                # Papers stored before the index existed
+                conn.execute("INSERT INTO papers_fts (papers_fts) VALUES ('rebuild')")
+                logging.info(f"Search index built for {self.store.path}.")
+
+    def rebuild(self):
+        with self.store.connect() as conn:
+            conn.execute("INSERT INTO papers_fts (papers_fts) VALUES ('rebuild')")
+
+    def optimize(self):
+        """Merge the index segments (worth doing after large imports)."""
+        with self.store.connect() as conn:
+            conn.execute("INSERT INTO papers_fts (papers_fts) VALUES ('optimize')")
+
+    def search(self, query, limit=20, offset=0, source=None, year_from=None, year_to=None):
+        """
+        Papers matching `query`, best first, as dicts with a BM25 `score`
+        (lower is better, as in SQLite) and an abstract `snippet`.
+        """
+        expression = to_match_expression(query)
+        if not expression:
+            return []
+        filters, params = [], [expression]
+        if source:
+            filters.append("p.source = ?")
+            params.append(source)
+        if year_from is not None:
+            filters.append("p.year >= ?")
+            params.append(int(year_from))
+        if year_to is not None:
+            filters.append("p.year <= ?")
+            params.append(int(year_to))
+        where = ''.join(f" AND {condition}" for condition in filters)
+        sql = f"""
+            SELECT p.title, p.url, p.source, p.year,
+                   bm25(papers_fts, {TITLE_WEIGHT}, {ABSTRACT_WEIGHT}) AS score,
+                   snippet(papers_fts, 1, '[', ']', ' ... ', 24) AS snippet
+            FROM papers_fts JOIN papers p ON p.rowid = papers_fts.rowid
+            WHERE papers_fts MATCH ?{where}
+            ORDER BY score LIMIT ? OFFSET ?"""
+        params += [int(limit), int(offset)]
+        with METRICS.timer('search'), self.store.connect() as conn:
+            try:
+                rows = conn.execute(sql, params).fetchall()
+            except sqlite3.OperationalError as e:
+                logging.error(f"Search for {query!r} failed: {e}")
+                return []
+        columns = ['title', 'url', 'source', 'year', 'score', 'snippet']
+        return [dict(zip(columns, row)) for row in rows]
@@ -0,0 +1,117 @@
+# store.py
+import sqlite3
+import os
+import time
+from contextlib import contextmanager
+
+from .records import COLUMNS, to_year, typed_frame
+
+def paper_key(paper):
+    """Identity of a paper in the store: its URL, or its title when there is no usable link."""
+    url = to_text(paper.get('URL'))
+    if url and url != 'No link':
+        return url
+    return ' '.join(str(paper.get('Title', '')).lower().split())
+
+class PaperStore:
+    """
+    Paper records from every scrape, kept in one SQLite file.
+
+    Writes are upserts keyed by `paper_key`, so several workers can add the
+    same paper and the store keeps one row. A later write with an abstract
+    fills in a row stored earlier without one.
+
+    Venue papers may carry a `keyword_match` flag (the crawl-time keyword
+    filter's decision); papers that did not match are kept for re-filtering
+    but left out of the results by default.
+    """
+    def __init__(self, path="./results/papers.sqlite"):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self.connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS papers (
+                    key TEXT PRIMARY KEY,
+                    title TEXT,
+                    url TEXT,
+                    abstract TEXT,
+                    source TEXT,
+                    year INTEGER,
+                    added_at REAL,
+                    keyword_match INTEGER
+                )""")
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(papers)")]
+            if 'keyword_match' not in columns:
+                conn.execute("ALTER TABLE papers ADD COLUMN keyword_match INTEGER")
+
+    @contextmanager
+    def connect(self):
+        conn = sqlite3.connect(self.path, timeout=60)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def add_papers(self, papers):
+        """Upsert PaperRecords or paper dicts (Title, URL, Abstract, Source, Year, optional keyword_match). Returns how many were given."""
+        now = time.time()
+        rows = [
+            (paper_key(p), to_text(p.get('Title')), to_text(p.get('URL')), to_text(p.get('Abstract')),
+             to_text(p.get('Source')), to_year(p.get('Year')), now,
+             None if p.get('keyword_match') is None else int(p['keyword_match']))
+            for p in papers
+        ]
+        with self.connect() as conn:
+            conn.executemany(
+                """INSERT INTO papers (key, title, url, abstract, source, year, added_at, keyword_match)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(key) DO UPDATE SET
+                       abstract = COALESCE(excluded.abstract, papers.abstract),
+                       year = COALESCE(excluded.year, papers.year),
+                       keyword_match = COALESCE(excluded.keyword_match, papers.keyword_match)""",
+                rows
+            )
+        return len(rows)
+
+    def add_dataframe(self, df):
+        """Upsert the rows of a result DataFrame (e.g. one read from an earlier run's xlsx)."""
+        columns = [column for column in COLUMNS if column in df.columns]
+        # Missing values of the nullable dtypes (pd.NA) become None
+        df = df[columns].astype(object)
+        return self.add_papers(df.where(df.notna(), None).to_dict('records'))
+
+    def count(self):
+        with self.connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM papers").fetchone()[0]
+
+    def to_dataframe(self, include_unmatched=False, with_keys=False):
+        """
+        Stored papers as a DataFrame with the usual result columns (all of them
+        with `include_unmatched`), plus 'key' and 'keyword_match' with `with_keys`.
+        """
+        import pandas as pd
+        where = "" if include_unmatched else "WHERE keyword_match IS NOT 0"
+        extra = ", key, keyword_match" if with_keys else ""
+        with self.connect() as conn:
+            df = pd.read_sql_query(f"SELECT title, url, abstract, source, year{extra} FROM papers {where} ORDER BY added_at, key", conn)
+        df.columns = COLUMNS + (['key', 'keyword_match'] if with_keys else [])
+        return typed_frame(df)
+
+    def set_abstracts(self, updates):
+        """Overwrite abstracts: `updates` maps paper keys to (abstract, keyword_match or None to keep it)."""
+        with self.connect() as conn:
+            conn.executemany(
+                "UPDATE papers SET abstract = ?, keyword_match = COALESCE(?, keyword_match) WHERE key = ?",
+                [(abstract, None if match is None else int(match), key) for key, (abstract, match) in updates.items()]
+            )
+        return len(updates)
+
+def to_text(value):
+    """None for missing values (None or NaN from pandas), the value as text otherwise."""
+    if value is None or value != value:
+        return None
+    return str(value)
@@ -1,6 +1,8 @@
 # utils.py
 from urllib.parse import urlparse
 from itertools import cycle
+from email.utils import parsedate_to_datetime
+import datetime as dt
 import re
 
 # User agent list and cycling
@@ -86,4 +88,20 @@ def extract_year(citation):
     year = re.search(r"\b(19|20)\d{2}\b", citation)
     if year:
         return year.group()
-    return None
\ No newline at end of file
+    return None
+
+def parse_retry_after(value):
+    """Convert a Retry-After header (seconds or HTTP date) into seconds to wait."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=dt.timezone.utc)
+    return max(0.0, (retry_at - dt.datetime.now(dt.timezone.utc)).total_seconds())
\ No newline at end of file
@@ -1,58 +1,130 @@
 import logging
-import concurrent.futures
-import pandas as pd
-from .venues_scrapers import AAMASScraper, IJCAIScraper, AISTATSScraper, ICMLScraper, ICLRScraper, START_YEAR, END_YEAR
-import json
 import os
+import threading
+from .venues_scrapers import AAMASScraper, IJCAIScraper, AISTATSScraper, ICMLScraper, ICLRScraper, START_YEAR, END_YEAR
+from .resilience import save_skipped_urls
+from .metrics import METRICS
+from .work_stealing import WorkStealingPool, host_of
+from .config import get_config, get_venues
+from .records import to_frame
 
 # Load venue configurations from JSON file
-current_dir = os.path.dirname(__file__)
-venues_file = os.path.join(current_dir, 'venues.json')
-with open(venues_file, 'r') as f:
-    VENUES = json.load(f)
+VENUES = get_venues()
+
+# Keep every crawled venue paper (not only keyword matches) in the paper store
+KEEP_ALL_VENUE_PAPERS = get_config().get('keep_all_venue_papers', False)
+
+# Cost estimates (seconds) for ordering work units when nothing better is known
+YEAR_COST = 60.0
+DETAIL_COST = 1.0
+FRONTIER_HIT_COST = 0.05  # share of a detail unit's cost when the frontier already has the paper
+
+# Scraper class for each supported venue
+VENUE_SCRAPERS = {
+    "AAMAS": AAMASScraper,
+    "IJCAI": IJCAIScraper,
+    "AISTATS": AISTATSScraper,
+    "ICML": ICMLScraper,
+    "ICLR": ICLRScraper,
+}
+
+class VenueYear:
+    """
+    One venue-year split into work units: the proceedings index, then one
+    unit per paper. The unit finishing the last paper filters and collects the year.
+    """
+    def __init__(self, scraper, year, store, collected):
+        self.scraper = scraper
+        self.year = year
+        self.store = store
+        self.collected = collected
+        self.results = []
+        self.remaining = 0
+        self._lock = threading.Lock()
+
+    def label(self):
+        return f"{self.scraper.venue_name} {self.year}"
+
+    def index(self, pool):
+        paper_details = self.scraper.list_papers(self.year)
+        if not paper_details:
+            self.finish()
+            return
+        self.results = [None] * len(paper_details)
+        self.remaining = len(paper_details)
+        detail_cost = METRICS.mean('paper_details', self.scraper.venue_display_name, DETAIL_COST)
+        frontier = self.scraper.frontier
+        for i, paper_info in enumerate(paper_details):
+            url = self.scraper.paper_url(paper_info) or self.scraper.base_url
+            # Papers the frontier already knows are answered without a request
+            cost = detail_cost * FRONTIER_HIT_COST if frontier is not None and frontier.probably_seen(url) else detail_cost
+            pool.submit(host_of(url), cost, self.fetch, i, paper_info)
+
+    def fetch(self, i, paper_info):
+        try:
+            self.results[i] = self.scraper.fetch_details(paper_info, self.year)
+        except Exception as e:
+            logging.error(f"Error fetching {self.scraper.paper_url(paper_info)} for {self.label()}: {e}")
+        with self._lock:
+            self.remaining -= 1
+            done = self.remaining == 0
+        if done:
+            self.finish()
+
+    def finish(self):
+        try:
+            papers = self.scraper.collect_year(self.year, self.results, self.store)
+        except Exception as exc:
+            logging.error(f"Error occurred while processing {self.label()}: {exc}")
+            return
+        self.collected.extend(papers)
+        logging.info(f"Completed processing for {self.label()} with {len(papers)} papers.")
+
+def year_costs():
+    """Expected seconds of one venue-year per venue, from the crawl history of earlier scheduled runs."""
+    from .scheduler import SCHEDULER
+    path = SCHEDULER.get('history_path', './results/crawl_history.sqlite')
+    if not os.path.exists(path):
+        return {}
+    from .scheduler import CrawlHistory
+    return {source: estimate['seconds'] for source, estimate in CrawlHistory(path).estimates().items()}
 
 class VenueScraper:
-    def __init__(self, venues = VENUES):
+    def __init__(self, venues = VENUES, store = None):
         self.venues = venues
+        if store is None and KEEP_ALL_VENUE_PAPERS:
+            from .store import PaperStore
+            store = PaperStore()
+        self.store = store
 
     def scrape_venues(self):
         all_papers = []
 
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            future_to_year = {}
-
-            for venue_name, config in self.venues.items():
-                logging.info(f"=== Scraping Venue: {venue_name} ===")
-                if venue_name == "AAMAS":
-                    scraper = AAMASScraper(venue_name, config)
-                elif venue_name == "IJCAI":
-                    scraper = IJCAIScraper(venue_name, config)
-                elif venue_name == "AISTATS":
-                    scraper = AISTATSScraper(venue_name, config)
-                elif venue_name == "ICML":
-                    scraper = ICMLScraper(venue_name, config)
-                elif venue_name == "ICLR":
-                    scraper = ICLRScraper(venue_name, config)
-                else:
-                    continue
-
-                for year in range(START_YEAR, END_YEAR + 1):
-                    future = executor.submit(scraper.fetch_papers_for_year, year)
-                    future_to_year[future] = (venue_name, year)
-
-            for future in concurrent.futures.as_completed(future_to_year):
-                venue_name, year = future_to_year[future]
-                try:
-                    papers = future.result()
-                    all_papers.extend(papers)
-                    logging.info(f"Completed processing for {venue_name} {year} with {len(papers)} papers.")
-                except Exception as exc:
-                    logging.error(f"Error occurred while processing {venue_name} {year}: {exc}")
-
-        df = pd.DataFrame(all_papers)
+        # Every venue-year is split into an index unit and one unit per paper, queued
+        # per host and run largest first by one work-stealing pool, so the biggest
+        # years start first and idle workers move to whichever host has work left.
+        # How many requests hit each host at once is up to its adaptive limiter.
+        pool = WorkStealingPool()
+        costs = year_costs()
+        for venue_name, config in self.venues.items():
+            logging.info(f"=== Scraping Venue: {venue_name} ===")
+            if venue_name not in VENUE_SCRAPERS:
+                continue
+            scraper = VENUE_SCRAPERS[venue_name](venue_name, config)
+
+            for year in range(START_YEAR, END_YEAR + 1):
+                venue_year = VenueYear(scraper, year, self.store, all_papers)
+                # Without history, more recent (usually larger) years go first
+                cost = costs.get(venue_name, YEAR_COST) + year * 1e-6
+                pool.submit(host_of(scraper.proceedings_url(year) or scraper.base_url), cost, venue_year.index, pool)
+        pool.run()
+
+        df = to_frame(all_papers)
         df.drop_duplicates(subset=["Title", "Year", "Source"], inplace=True)
 
         output_file = "./results/venues_results.xlsx"
-        df.to_excel(output_file, index=False)
+        with METRICS.timer('excel_export'):
+            df.to_excel(output_file, index=False)
         logging.info(f"Scraping completed. {len(df)} papers saved to {output_file}.")
-        return df
\ No newline at end of file
+        save_skipped_urls()
+        return df
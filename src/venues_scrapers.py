@@ -1,40 +1,51 @@
 import requests
 from bs4 import BeautifulSoup
-import time
 import re
 import tqdm
 from urllib.parse import urljoin
-from PyPDF2 import PdfReader
 import io
 import logging
-import json
-import os
+
+from .config import get_config, get_keywords
+from .resilience import resilient_get, CircuitOpenError
+from .metrics import METRICS
+from .frontier import get_frontier
+from .keyword_filter import KeywordFilter
+from .records import PaperRecord, as_record, as_dict
+from .openreview import OpenReviewClient, OPENREVIEW, forum_id, title_key
+from .pmlr import fetch_volume, url_key
+from .parse_cache import memoize
 
 # -------------------- Configuration -------------------- #
 
 # Import keywords from a separate JSON file
-current_dir = os.path.dirname(os.path.realpath(__file__))
-keywords_file = os.path.join(current_dir, 'keywords.json')
-with open(keywords_file, 'r') as f:
-    KEYWORDS = json.load(f)
+KEYWORDS = get_keywords()
 
 KEYWORDS_ADVERSARIAL = KEYWORDS["adversarial"]
 KEYWORDS_RL = KEYWORDS["rl"]
 KEYWORDS_MULTI_AGENT = KEYWORDS["multi_agent"]
 KEYWORDS_MARL = KEYWORDS["marl"]
 KEYWORDS_GAME_THEORY = KEYWORDS["game_theory"]
+KEYWORD_FILTER = KeywordFilter(KEYWORDS)
 
 # Other configurations
-config_file = os.path.join(current_dir, 'config.json')
-with open(config_file, 'r') as f:
-    config = json.load(f)
-    
+config = get_config()
+
 START_YEAR = config["start_year"]
 END_YEAR = config["end_year"]
 HEADERS = config["headers"]
 REQUEST_DELAY = config["request_delay"]
+
+# Returned when a PDF could not be fetched or parsed; such records are not cached
+ABSTRACT_FAILED = "Abstract extraction failed"
+# Stand-ins for an abstract the page or PDF did not have
+ABSTRACT_NOT_FOUND = "Abstract not found"
+EXTENDED_ABSTRACT = "Extended Abstract found. Skipping extraction."
 # -------------------------------------------------------- #
 class BaseScraper:
+    # Bump when a parse_* method of the scraper changes, so pages parsed by the old version are parsed again
+    parser_version = 1
+
     def __init__(self, venue_name, config):
         self.venue_name = venue_name
         self.config = config
@@ -43,13 +54,17 @@ class BaseScraper:
         self.paper_wrapper_class = config["paper_wrapper_class"]
         self.abstract_page_selector = config["abstract_page_selector"]
         self.venue_display_name = config["venue_name"]
+        # Seen-set of paper URLs, so paper details are fetched once across runs
+        self.frontier = get_frontier()
 
     def fetch_html(self, url):
         """Fetches the HTML content of a given URL."""
         try:
-            response = requests.get(url, headers=HEADERS, timeout=10)
+            response = resilient_get(url, headers=HEADERS, timeout=10)
             response.raise_for_status()
             return response.text
+        except CircuitOpenError:
+            return None
         except requests.RequestException as e:
             logging.error(f"Error fetching {url}: {e}")
             return None
@@ -62,6 +77,10 @@ class BaseScraper:
         """Extracts paper details based on the venue."""
         raise NotImplementedError("Subclasses must implement this method")
 
+    def paper_info(self, title, url):
+        """What `extract_paper_details` takes for a paper known by its title and URL (here: the URL)."""
+        return url
+
     def clean_title(self, title):
         """Remove redundant _x000D_, newline characters, and extra whitespace from titles"""
         title = re.sub(r'_x000D_', '', title)
@@ -71,30 +90,44 @@ class BaseScraper:
     def extract_abstract_from_pdf(self, pdf_url):
         """Extract abstract from PDF paper"""
         try:
-            response = requests.get(pdf_url, headers=HEADERS, timeout=30)
+            response = resilient_get(pdf_url, headers=HEADERS, timeout=30)
             response.raise_for_status()
             
-            pdf_file = io.BytesIO(response.content)
-            reader = PdfReader(pdf_file)
-            
-            first_page = reader.pages[0].extract_text()
-            
-            if re.search(r'\bExtended Abstract\b', first_page, re.IGNORECASE):
-                return "Extended Abstract found. Skipping extraction."
-            else:
-                pattern = r'\bABSTRACT\b\s*(.*?)(?=\b(?:Introduction|1\s+INTRODUCTION|Keywords)\b)'
-                abstract_match = re.search(pattern, first_page, re.DOTALL | re.IGNORECASE)
-
-                if abstract_match:
-                    abstract = abstract_match.group(1).strip()
-                    abstract = ' '.join(abstract.split())
-                    return abstract
-                else:
-                    return "Abstract extraction failed"
+            def parse():
+                with METRICS.timer('pdf_extract', self.venue_display_name):
+                    return self.parse_abstract_from_pdf(response.content)
+            return self.parsed('parse_abstract_from_pdf', response.content, parse)
             
         except Exception as e:
             logging.error(f"Error extracting abstract from {pdf_url}: {e}")
-            return "Abstract extraction failed"
+            return ABSTRACT_FAILED
+
+    def parsed(self, extractor, body, parse):
+        """`parse()` of a response body, memoized per scraper class, `extractor` and parser version."""
+        return memoize(body, f"{type(self).__name__}.{extractor}", self.parser_version, parse)
+
+    def parse_abstract_from_pdf(self, pdf_content):
+        """Extract the abstract from the first page of PDF bytes"""
+        # Imported here so PyPDF2 is only loaded when a venue actually has PDFs
+        from PyPDF2 import PdfReader
+
+        pdf_file = io.BytesIO(pdf_content)
+        reader = PdfReader(pdf_file)
+        
+        first_page = reader.pages[0].extract_text()
+        
+        if re.search(r'\bExtended Abstract\b', first_page, re.IGNORECASE):
+            return EXTENDED_ABSTRACT
+        else:
+            pattern = r'\bABSTRACT\b\s*(.*?)(?=\b(?:Introduction|1\s+INTRODUCTION|Keywords)\b)'
+            abstract_match = re.search(pattern, first_page, re.DOTALL | re.IGNORECASE)
+
+            if abstract_match:
+                abstract = abstract_match.group(1).strip()
+                abstract = ' '.join(abstract.split())
+                return abstract
+            else:
+                return ABSTRACT_FAILED
 
     def paper_contains_keywords(self, title, abstract):
         """
@@ -108,67 +141,99 @@ class BaseScraper:
         Returns:
             bool: True if paper is about adversarial attacks/defenses in MARL
         """
-        combined_text = f"{title} | {abstract}".lower()
-        
-        # Check presence of at least one term from each concept set
-        has_multi_agent = any(kw.lower() in combined_text for kw in KEYWORDS_MULTI_AGENT)
-        has_rl = any(kw.lower() in combined_text for kw in KEYWORDS_RL)
-        has_adversarial = any(kw.lower() in combined_text for kw in KEYWORDS_ADVERSARIAL)
-        has_marl = any(kw.lower() in combined_text for kw in KEYWORDS_MARL)
-        has_game_theory = any(kw.lower() in combined_text for kw in KEYWORDS_GAME_THEORY)
-        
-        # If it has :
-        # - adversarial and MARL keywords
-        # - adversarial and game theory keywords
-        # - adversarial and multi-agent and RL keywords
-        # then it is a relevant paper        
-        if has_adversarial:
-            if has_marl or has_game_theory:
-                return True
-            elif has_multi_agent and has_rl:
-                return True
-        
-        # If none of the above conditions are met, return False
-        return False
+        return KEYWORD_FILTER.matches(title, abstract)
     
-    def fetch_papers_for_year(self, year):
-        all_papers_for_year = []
-        logging.info(f"Processing {self.venue_display_name} {year}...")
-
+    def fetch_papers_for_year(self, year, executor=None, store=None, cancelled=None):
+        """
+        Fetches and filters all papers of a venue for one year.
+
+        Paper detail pages are fetched through `executor` when one is given, so
+        several venue-years can share one pool whose per-host concurrency is
+        governed by the adaptive limiters. With a `store`, every paper is kept
+        there with its keyword_match flag, so the corpus can be re-filtered
+        later without crawling again; only relevant papers are returned. Once
+        `cancelled()` returns True, the remaining detail pages are skipped and
+        the result is incomplete; callers that pass it must check it afterwards.
+        """
+        paper_details = self.list_papers(year)
+        if paper_details is None:
+            return []
+        def fetch(paper_info):
+            if cancelled is not None and cancelled():
+                return None
+            return self.fetch_details(paper_info, year)
+        results = map(fetch, paper_details) if executor is None else executor.map(fetch, paper_details)
+        results = tqdm.tqdm(results, total=len(paper_details), desc=f"Processing {self.venue_display_name} {year} papers")
+        papers = self.collect_year(year, results, store)
+        # Pause between years; on the work-stealing pool the adaptive limiters pace instead
+        METRICS.sleep(REQUEST_DELAY * 10, self.venue_display_name)
+        return papers
+
+    def proceedings_url(self, year):
+        """Proceedings page of one year, or None if the venue has no volume for it."""
         if self.venue_name == "AISTATS" or self.venue_name == "ICML":
             volume = self.config["year_mapping"].get(str(year))
             if not volume:
-                logging.warning(f"No volume mapping found for year {year}. Skipping.")
-                return []
-            proceedings_url = self.proceedings_url_template.format(volume=volume)
-        else:
-            proceedings_url = self.proceedings_url_template.format(year=year)
+                return None
+            return self.proceedings_url_template.format(volume=volume)
+        return self.proceedings_url_template.format(year=year)
+
+    def list_papers(self, year):
+        """The paper links (or link dicts) of one year's proceedings, or None if they could not be fetched."""
+        logging.info(f"Processing {self.venue_display_name} {year}...")
+        proceedings_url = self.proceedings_url(year)
+        if not proceedings_url:
+            logging.warning(f"No volume mapping found for year {year}. Skipping.")
+            return None
 
         logging.info(f"Fetching proceedings page: {proceedings_url}")
         proceedings_html = self.fetch_html(proceedings_url)
         if not proceedings_html:
             logging.warning(f"Failed to fetch proceedings for {self.venue_display_name} {year}. Skipping.")
-            return []
+            return None
 
         # Pass the proceedings_url to extract_paper_links
-        paper_details = self.extract_paper_links(proceedings_html, proceedings_url)
-        
-        for paper_info in tqdm.tqdm(paper_details, desc=f"Processing {self.venue_display_name} {year} papers"):
-            details = self.extract_paper_details(paper_info, year)
-            
+        with METRICS.timer('index_parse', self.venue_display_name):
+            return self.extract_paper_links(proceedings_html, proceedings_url)
+
+    @staticmethod
+    def paper_url(paper_info):
+        return paper_info if isinstance(paper_info, str) else paper_info.get('url')
+
+    def fetch_details(self, paper_info, year):
+        """The PaperRecord of one paper, answered by the frontier when it was fetched before."""
+        with METRICS.timer('paper_details', self.venue_display_name):
+            url = self.paper_url(paper_info)
+            if self.frontier is None or not url:
+                return self.extract_paper_details(paper_info, year)
+            # The frontier keeps records as JSON, so it is handed (and gives back) dicts
+            return as_record(self.frontier.resolve_record(
+                url, lambda: as_dict(self.extract_paper_details(paper_info, year)), failed_abstracts=(ABSTRACT_FAILED,)
+            ))
+
+    def collect_year(self, year, results, store=None):
+        """Keyword-filter the paper details of one year; with a `store`, keep every paper there."""
+        all_papers_for_year = []
+        stored_papers = []
+        for details in results:
             if details:
+                METRICS.incr('papers', self.venue_display_name)
                 title = details.get('Title', "")
                 abstract = details.get('Abstract', "")
-                if self.paper_contains_keywords(title, abstract):
+                relevant = self.paper_contains_keywords(title, abstract)
+                if store is not None:
+                    stored_papers.append(dict(details.to_dict(), keyword_match=relevant))
+                if relevant:
                     all_papers_for_year.append(details)
+                    METRICS.incr('relevant_papers', self.venue_display_name)
                     logging.info(f"Found relevant paper: {title} | {year} | {details.get('URL', '')}")
                 else:
                     logging.info(f"Skipping non-relevant paper: {title}")
             # break # for fast testing, remove this line to process all papers
 
+        if stored_papers:
+            store.add_papers(stored_papers)
         logging.info(f"Found {len(all_papers_for_year)} relevant papers for {self.venue_display_name} {year}.")
-        time.sleep(REQUEST_DELAY * 10)
-        
         return all_papers_for_year
 
 class AAMASScraper(BaseScraper):
@@ -195,16 +260,18 @@ class AAMASScraper(BaseScraper):
         
         return paper_details
 
+    def paper_info(self, title, url):
+        return {'title': title, 'url': url}
+
     def extract_paper_details(self, paper_info, year):
-        """Creates paper details dictionary with abstract from PDF."""
-        details = {
-            'Title': self.clean_title(paper_info['title']),
-            'Abstract': self.extract_abstract_from_pdf(paper_info['url']),
-            'Year': year,
-            'Source': "AAMAS",
-            'URL': paper_info['url']
-        }
-        return details
+        """Creates the paper record with abstract from PDF."""
+        return PaperRecord(
+            title=self.clean_title(paper_info['title']),
+            url=paper_info['url'],
+            abstract=self.extract_abstract_from_pdf(paper_info['url']),
+            source="AAMAS",
+            year=year
+        )
 
 class IJCAIScraper(BaseScraper):
     def extract_paper_links(self, proceedings_html, proceedings_url):
@@ -227,86 +294,55 @@ class IJCAIScraper(BaseScraper):
         if not paper_html:
             return None
 
-        soup = BeautifulSoup(paper_html, 'html.parser')
-        details = {}
-
-        title_tag = soup.find('meta', attrs={'name': 'citation_title'})
-        if title_tag and 'content' in title_tag.attrs:
-            details['Title'] = title_tag['content']
-        else:
-            details['Title'] = "N/A"
-
-        abstract = ""
-        abstract_tag = soup.find('div', class_='col-md-12')
-        if abstract_tag:
-            abstract = abstract_tag.get_text(separator=" ", strip=True)
-        details['Abstract'] = abstract
-
-        details['Source'] = "IJCAI"
+        page = self.parsed('parse_page', paper_html, lambda: self.parse_page(paper_html))
+        details = PaperRecord(title=page['title'], url=paper_url, abstract=page['abstract'], source="IJCAI")
 
         year_match = re.search(r'/proceedings/(\d{4})/', paper_url)
         if year_match:
-            details['Year'] = int(year_match.group(1))
-        else:
-            details['Year'] = "N/A"
-            
-        details['URL'] = paper_url
+            details.year = int(year_match.group(1))
 
         return details
 
-class AISTATSScraper(BaseScraper):
-    def extract_paper_links(self, proceedings_html, proceedings_url):
-        """Extracts paper abstract page links from AISTATS proceedings page."""
-        soup = BeautifulSoup(proceedings_html, 'html.parser')
-        paper_links = []
-        for paper_div in soup.find_all('div', class_=self.paper_wrapper_class):
-            abs_link = paper_div.find('a', string=re.compile(r'abs', re.I))
-            if abs_link and 'href' in abs_link.attrs:
-                paper_url = urljoin(self.base_url, abs_link['href'])
-                paper_links.append(paper_url)
-
-        return paper_links
-
-    def extract_paper_details(self, paper_url, year):
-        """Extracts paper details from AISTATS paper abstract page."""
-        paper_html = self.fetch_html(paper_url)
-        if not paper_html:
-            return None
-
+    def parse_page(self, paper_html):
+        """Title and abstract of an IJCAI paper details page."""
         soup = BeautifulSoup(paper_html, 'html.parser')
-        details = {}
+        page = {'title': "N/A", 'abstract': ""}
 
-        title_tag = soup.find('h1')
-        if title_tag:
-            details['Title'] = title_tag.get_text(strip=True)
-        else:
-            details['Title'] = "N/A"
+        title_tag = soup.find('meta', attrs={'name': 'citation_title'})
+        if title_tag and 'content' in title_tag.attrs:
+            page['title'] = title_tag['content']
 
-        abstract = ""
-        abstract_tag = soup.find('div', id='abstract')
+        abstract_tag = soup.find('div', class_='col-md-12')
         if abstract_tag:
-            abstract = abstract_tag.get_text(separator=" ", strip=True)
-        details['Abstract'] = abstract
-
-        info_tag = soup.find('div', id='info')
-        if info_tag:
-            year_match = re.search(r',\s*(\d{4})\.', info_tag.get_text())
-            if year_match:
-                details['Year'] = int(year_match.group(1))
-            else:
-                details['Year'] = "N/A"
-        else:
-            details['Year'] = "N/A"
+            page['abstract'] = abstract_tag.get_text(separator=" ", strip=True)
+        return page
+
+class PMLRScraper(BaseScraper):
+    """
+    ICML and AISTATS, both published as PMLR volumes.
+
+    A volume's bibliography holds the title, year and abstract of every paper,
+    so a year takes two requests: the volume index and its bibliography.
+    Papers of the index missing from the bibliography are fetched from their
+    abs page.
+    """
+    def list_papers(self, year):
+        """Abs page links of the volume, with papers found in the volume bibliography replaced by their details."""
+        paper_links = super().list_papers(year)
+        template = self.config.get("bibliography_url_template")
+        if not paper_links or not template:
+            return paper_links
+        volume = self.config["year_mapping"].get(str(year))
+        bibliography = fetch_volume(template.format(volume=volume))
+        # Matched papers keep the index link as their URL, so they match earlier runs in the frontier
+        paper_details = [dict(bibliography[url_key(paper_url)], url=paper_url) if url_key(paper_url) in bibliography else paper_url
+                         for paper_url in paper_links]
+        missing = sum(isinstance(paper_info, str) for paper_info in paper_details)
+        logging.info(f"{len(paper_details) - missing} of {len(paper_details)} {self.venue_display_name} {year} papers read from the volume bibliography.")
+        return paper_details
 
-        details['Source'] = "AISTATS"
-        
-        details['URL'] = paper_url
-        
-        return details
-    
-class ICMLScraper(BaseScraper):
     def extract_paper_links(self, proceedings_html, proceedings_url):
-        """Extracts paper abstract page links from ICML proceedings page."""
+        """Extracts paper abstract page links from a PMLR volume page."""
         soup = BeautifulSoup(proceedings_html, 'html.parser')
         paper_links = []
         for paper_div in soup.find_all('div', class_=self.paper_wrapper_class):
@@ -317,42 +353,50 @@ class ICMLScraper(BaseScraper):
 
         return paper_links
 
-    def extract_paper_details(self, paper_url, year):
-        """Extracts paper details from ICML paper abstract page."""
+    def extract_paper_details(self, paper_info, year):
+        """Paper details from the volume bibliography, or else from the paper's abs page."""
+        if isinstance(paper_info, dict):
+            return PaperRecord(
+                title=paper_info['title'],
+                url=paper_info['url'],
+                abstract=paper_info['abstract'],
+                source=self.venue_name,
+                year=paper_info['year'] or year
+            )
+
+        paper_url = paper_info
         paper_html = self.fetch_html(paper_url)
         if not paper_html:
             return None
 
+        page = self.parsed('parse_page', paper_html, lambda: self.parse_page(paper_html))
+        return PaperRecord(title=page['title'], url=paper_url, abstract=page['abstract'], source=self.venue_name, year=page['year'])
+
+    def parse_page(self, paper_html):
+        """Title, abstract and year of a PMLR abs page."""
         soup = BeautifulSoup(paper_html, 'html.parser')
-        details = {}
+        page = {'title': "N/A", 'abstract': "", 'year': None}
 
         title_tag = soup.find('h1')
         if title_tag:
-            details['Title'] = title_tag.get_text(strip=True)
-        else:
-            details['Title'] = "N/A"
+            page['title'] = title_tag.get_text(strip=True)
 
-        abstract = ""
         abstract_tag = soup.find('div', id='abstract')
         if abstract_tag:
-            abstract = abstract_tag.get_text(separator=" ", strip=True)
-        details['Abstract'] = abstract
+            page['abstract'] = abstract_tag.get_text(separator=" ", strip=True)
 
         info_tag = soup.find('div', id='info')
         if info_tag:
             year_match = re.search(r',\s*(\d{4})\.', info_tag.get_text())
             if year_match:
-                details['Year'] = int(year_match.group(1))
-            else:
-                details['Year'] = "N/A"
-        else:
-            details['Year'] = "N/A"
+                page['year'] = int(year_match.group(1))
+        return page
 
-        details['Source'] = "ICML"
-        
-        details['URL'] = paper_url
-        
-        return details
+class AISTATSScraper(PMLRScraper):
+    pass
+
+class ICMLScraper(PMLRScraper):
+    pass
 
 class ICLRScraper(BaseScraper):
     def __init__(self, venue_name, config):
@@ -361,24 +405,13 @@ class ICLRScraper(BaseScraper):
         self.base_api_url = "https://dblp.uni-trier.de/search/publ/api"
         self.max_retries = 3
         self.base_delay = 0.5  # Base delay between requests in seconds
+        self.openreview = OpenReviewClient()
 
     def fetch_with_retry(self, url, max_retries=3, initial_delay=5):
-        """Fetch URL with exponential backoff retry logic"""
-        for attempt in range(max_retries):
-            try:
-                response = requests.get(url, headers=HEADERS, timeout=10)
-                response.raise_for_status()
-                return response.text
-            except requests.exceptions.HTTPError as e:
-                if e.response.status_code == 429:  # Too Many Requests
-                    delay = initial_delay * (2 ** attempt)  # Exponential backoff
-                    logging.warning(f"Rate limited. Waiting {delay} seconds before retry...")
-                    time.sleep(delay)
-                    continue
-                raise
-            except Exception as e:
-                logging.error(f"Error fetching {url}: {e}")
-                raise
+        """Fetch URL through the shared retry layer (jittered backoff, Retry-After, circuit breaker)"""
+        response = resilient_get(url, max_retries=max_retries, base_delay=initial_delay, headers=HEADERS, timeout=10)
+        response.raise_for_status()
+        return response.text
 
     def construct_search_query(self, year):
         """
@@ -418,7 +451,7 @@ class ICLRScraper(BaseScraper):
             logging.info(f"Fetching from API: {api_url}")
             
             try:
-                response = requests.get(api_url, headers=HEADERS, timeout=10)
+                response = resilient_get(api_url, headers=HEADERS, timeout=10)
                 response.raise_for_status()
                 data = response.json()
                 
@@ -455,7 +488,7 @@ class ICLRScraper(BaseScraper):
                     logging.info(f"Successfully fetched all {total_fetched} papers for ICLR {year}")
                     break
                     
-                time.sleep(self.base_delay)
+                METRICS.sleep(self.base_delay, self.venue_display_name)
                 
             except Exception as e:
                 logging.error(f"Error fetching DBLP API results for ICLR {year}: {e}")
@@ -463,8 +496,35 @@ class ICLRScraper(BaseScraper):
                 
         return all_papers
 
+    def list_papers(self, year):
+        """DBLP listing of the year, with abstracts joined in from the OpenReview notes API in bulk."""
+        paper_details = super().list_papers(year)
+        if not paper_details or not OPENREVIEW.get('enabled', True):
+            return paper_details
+        by_forum, by_title = self.openreview.abstracts(year)
+        joined = 0
+        for paper_info in paper_details:
+            match = by_forum.get(forum_id(paper_info['url'])) or by_title.get(title_key(paper_info['title']))
+            if match:
+                paper_info['abstract'] = match['abstract'].strip()
+                joined += 1
+        logging.info(f"Joined OpenReview abstracts to {joined} of {len(paper_details)} ICLR {year} papers.")
+        return paper_details
+
+    def paper_info(self, title, url):
+        return {'title': title, 'url': url}
+
     def extract_paper_details(self, paper_info, year):
         """Extracts paper details including abstract from OpenReview with retry logic."""
+        if paper_info.get('abstract'):
+            # Already joined from the bulk OpenReview listing, no page to fetch
+            return PaperRecord(
+                title=self.clean_title(paper_info['title']),
+                url=paper_info['url'],
+                abstract=paper_info['abstract'],
+                source='ICLR',
+                year=year
+            )
         try:
             # Fetch the OpenReview page with retry logic
             paper_html = self.fetch_with_retry(
@@ -476,29 +536,26 @@ class ICLRScraper(BaseScraper):
             if not paper_html:
                 return None
 
-            soup = BeautifulSoup(paper_html, 'html.parser')
-            
-            details = {
-                'Title': self.clean_title(paper_info['title']),
-                'Year': year,
-                'Source': 'ICLR',
-                'URL': paper_info['url']
-            }
-            
-            # Extract abstract from the meta tag with name="citation_abstract"
-            abstract_meta = soup.find('meta', attrs={'name': 'citation_abstract'})
-            
-            if abstract_meta and 'content' in abstract_meta.attrs:
-                details['Abstract'] = abstract_meta['content'].strip()
-            else:
-                details['Abstract'] = "Abstract not found"
-            
-            # Add delay between requests to respect rate limits
-            time.sleep(self.base_delay)
+            details = PaperRecord(
+                title=self.clean_title(paper_info['title']),
+                url=paper_info['url'],
+                abstract=self.parsed('parse_page', paper_html, lambda: self.parse_page(paper_html)),
+                source='ICLR',
+                year=year
+            )
             
+            # Request pacing is left to the adaptive limiter of openreview.net
             return details
             
         except Exception as e:
             logging.error(f"Error extracting paper details from OpenReview {paper_info['url']}: {e}")
             return None
+
+    def parse_page(self, paper_html):
+        """Abstract of an OpenReview forum page, from its citation_abstract meta tag."""
+        soup = BeautifulSoup(paper_html, 'html.parser')
+        abstract_meta = soup.find('meta', attrs={'name': 'citation_abstract'})
+        if abstract_meta and 'content' in abstract_meta.attrs:
+            return abstract_meta['content'].strip()
+        return ABSTRACT_NOT_FOUND
             
\ No newline at end of file
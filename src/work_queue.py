@@ -0,0 +1,164 @@
+# work_queue.py
+import sqlite3
+import json
+import time
+import os
+import socket
+from contextlib import contextmanager
+
+class LeaseQueue:
+    """
+    Shared work queue with leases, backed by a SQLite file.
+
+    Any number of worker processes (on one machine, or on several machines sharing
+    the file over a filesystem with working locks) can `claim` a task. A claimed
+    task is leased for `lease_seconds`. The worker extends the lease with
+    `heartbeat` while it works. If the lease runs out, for example because the
+    worker died, the task becomes claimable again, until it has been leased
+    `max_attempts` times; then it is parked as 'failed', so a task that kills its
+    worker is not handed out forever. Tasks are unique per (kind, payload), so
+    planning the same crawl twice does not duplicate work.
+    """
+    def __init__(self, path, max_attempts=3):
+        self.path = path
+        self.max_attempts = max_attempts
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self.connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS tasks (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    kind TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    priority REAL NOT NULL DEFAULT 0,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    owner TEXT,
+                    lease_expires REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    UNIQUE(kind, payload)
+                )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS tasks_status ON tasks(status, priority)")
+
+    @contextmanager
+    def connect(self):
+        conn = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def enqueue(self, kind, payload, priority=0):
+        """Add a task unless an identical one exists. Returns True if it was added."""
+        with self.connect() as conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO tasks (kind, payload, priority) VALUES (?, ?, ?)",
+                (kind, json.dumps(payload, sort_keys=True), priority)
+            )
+            return cursor.rowcount > 0
+
+    def claim(self, owner, lease_seconds=300, task_id=None):
+        """
+        Lease the next pending (or abandoned) task to `owner`, or task `task_id`
+        if it is still claimable.
+
+        Returns (task_id, kind, payload), or None when nothing is claimable.
+        """
+        now = time.time()
+        only, params = ("", (now,)) if task_id is None else (" AND id = ?", (now, task_id))
+        with self.connect() as conn:
+            # IMMEDIATE takes the write lock up front, so two workers never claim the same row
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    """UPDATE tasks SET status = 'failed', lease_expires = NULL,
+                                        error = 'lease expired after ' || attempts || ' attempts'
+                       WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?""",
+                    (now, self.max_attempts)
+                )
+                row = conn.execute(
+                    f"""SELECT id, kind, payload FROM tasks
+                       WHERE (status = 'pending' OR (status = 'leased' AND lease_expires < ?)){only}
+                       ORDER BY priority DESC, id LIMIT 1""",
+                    params
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                conn.execute(
+                    """UPDATE tasks SET status = 'leased', owner = ?, lease_expires = ?, attempts = attempts + 1
+                       WHERE id = ?""",
+                    (owner, now + lease_seconds, row[0])
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return row[0], row[1], json.loads(row[2])
+
+    def heartbeat(self, task_id, owner, lease_seconds=300):
+        """Extend a lease. Returns False if the task is no longer held by `owner`."""
+        with self.connect() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET lease_expires = ? WHERE id = ? AND owner = ? AND status = 'leased'",
+                (time.time() + lease_seconds, task_id, owner)
+            )
+            return cursor.rowcount > 0
+
+    def complete(self, task_id, owner):
+        with self.connect() as conn:
+            conn.execute(
+                "UPDATE tasks SET status = 'done', lease_expires = NULL, error = NULL WHERE id = ? AND owner = ?",
+                (task_id, owner)
+            )
+
+    def fail(self, task_id, owner, error):
+        """Return a failed task to the queue, or park it once it ran out of attempts."""
+        with self.connect() as conn:
+            conn.execute(
+                """UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                                    lease_expires = NULL, error = ?
+                   WHERE id = ? AND owner = ?""",
+                (self.max_attempts, str(error), task_id, owner)
+            )
+
+    def release(self, task_id, owner):
+        """Give back a task that was stopped before it finished; it stays pending and keeps its attempts."""
+        with self.connect() as conn:
+            conn.execute(
+                """UPDATE tasks SET status = 'pending', owner = NULL, lease_expires = NULL, attempts = MAX(attempts - 1, 0)
+                   WHERE id = ? AND owner = ? AND status = 'leased'""",
+                (task_id, owner)
+            )
+
+    def claimable(self):
+        """(task_id, kind, payload) of every task a worker could claim now, in claim order."""
+        with self.connect() as conn:
+            rows = conn.execute(
+                """SELECT id, kind, payload FROM tasks
+                   WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ? AND attempts < ?)
+                   ORDER BY priority DESC, id""",
+                (time.time(), self.max_attempts)
+            ).fetchall()
+        return [(task_id, kind, json.loads(payload)) for task_id, kind, payload in rows]
+
+    def set_priorities(self, priorities):
+        """Reorder tasks: `priorities` maps task ids to their new priority (higher is claimed first)."""
+        with self.connect() as conn:
+            conn.executemany("UPDATE tasks SET priority = ? WHERE id = ?",
+                             [(priority, task_id) for task_id, priority in priorities.items()])
+
+    def counts(self):
+        """Number of tasks per status."""
+        with self.connect() as conn:
+            return dict(conn.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall())
+
+    def is_drained(self):
+        counts = self.counts()
+        return counts.get('pending', 0) == 0 and counts.get('leased', 0) == 0
+
+def default_owner():
+    """Worker identity: host name and process id."""
+    return f"{socket.gethostname()}:{os.getpid()}"
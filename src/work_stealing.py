@@ -0,0 +1,103 @@
+# work_stealing.py
+import heapq
+import itertools
+import logging
+import threading
+from collections import defaultdict
+from urllib.parse import urlparse
+
+from .concurrency import MAX_WORKERS, get_limiter
+from .metrics import METRICS
+
+def host_of(url):
+    return urlparse(url).netloc.lower()
+
+def limiter_cap(host):
+    """Current adaptive concurrency limit of `host`."""
+    return int(get_limiter(f"https://{host}/").limit)
+
+class WorkStealingPool:
+    """
+    Runs units of work on `workers` threads, with one queue per host.
+
+    Each host's queue is ordered by estimated cost, largest first. A worker
+    keeps taking units from the host it last worked on, so its connections stay
+    warm. Once that queue is empty or the host is at its cap, it steals from the
+    host with the most queued work. The cap is the host's current adaptive
+    limit, so workers are not parked behind one busy host while other hosts
+    still have work. Units may submit further units while they run; `run`
+    returns once every unit has finished.
+    """
+    def __init__(self, workers=MAX_WORKERS, cap=limiter_cap, wait_interval=1.0):
+        self.workers = workers
+        self.cap = cap
+        self.wait_interval = wait_interval
+        self.steals = 0
+        self._queues = defaultdict(list)      # host -> heap of (-cost, seq, func, args)
+        self._queued_cost = defaultdict(float)
+        self._running = defaultdict(int)
+        self._outstanding = 0
+        self._seq = itertools.count()
+        self._condition = threading.Condition()
+
+    def submit(self, host, cost, func, *args):
+        """Queue `func(*args)` for `host` with an estimated `cost` in seconds."""
+        with self._condition:
+            heapq.heappush(self._queues[host], (-cost, next(self._seq), func, args))
+            self._queued_cost[host] += cost
+            self._outstanding += 1
+            self._condition.notify()
+
+    def queued(self):
+        """Estimated seconds of queued work per host."""
+        with self._condition:
+            return {host: cost for host, cost in self._queued_cost.items() if self._queues[host]}
+
+    def _take(self, home):
+        # Called with the lock held
+        open_hosts = [host for host, queue in self._queues.items() if queue and self._running[host] < max(1, self.cap(host))]
+        if not open_hosts:
+            return None
+        if home in open_hosts:
+            host = home
+        else:
+            host = max(open_hosts, key=self._queued_cost.__getitem__)
+            if home is not None:
+                self.steals += 1
+        neg_cost, _, func, args = heapq.heappop(self._queues[host])
+        self._queued_cost[host] += neg_cost
+        self._running[host] += 1
+        return host, func, args
+
+    def _work(self):
+        home = None
+        while True:
+            with self._condition:
+                task = self._take(home)
+                while task is None:
+                    if self._outstanding == 0:
+                        return
+                    # Woken by a finished unit; the timeout catches limits that grew meanwhile
+                    self._condition.wait(timeout=self.wait_interval)
+                    task = self._take(home)
+            host, func, args = task
+            try:
+                func(*args)
+            except Exception as e:
+                logging.error(f"Work unit {getattr(func, '__name__', func)} for {host} failed: {e}")
+            finally:
+                with self._condition:
+                    self._running[host] -= 1
+                    self._outstanding -= 1
+                    self._condition.notify_all()
+            home = host
+
+    def run(self):
+        """Work until every submitted unit (and every unit they submit) has finished."""
+        with METRICS.timer('work_stealing'):
+            threads = [threading.Thread(target=self._work, daemon=True) for _ in range(self.workers)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        logging.info(f"Work-stealing pool finished with {self.steals} steals across {len(self._queues)} hosts.")